@@ -0,0 +1,102 @@
+import os
+import threading
+from collections import OrderedDict
+from typing import Iterator
+
+from gemini_client import key_fingerprint
+
+DEFAULT_ANTHROPIC_MODEL = os.environ.get("ANTHROPIC_MODEL", "claude-3-5-haiku-latest")
+MAX_OUTPUT_TOKENS = 4096
+MAX_POOLED_KEYS = 32
+
+
+class _Usage:
+    """Anthropic token counts under the names ``usage_from_response`` reads."""
+
+    def __init__(self, usage):
+        self.prompt_token_count = getattr(usage, "input_tokens", 0) or 0
+        self.candidates_token_count = getattr(usage, "output_tokens", 0) or 0
+        self.total_token_count = self.prompt_token_count + self.candidates_token_count
+
+
+class _Chunk:
+    __slots__ = ("text",)
+
+    def __init__(self, text: str):
+        self.text = text
+
+
+class AnthropicResponse:
+    def __init__(self, message):
+        self.text = "".join(block.text for block in message.content if getattr(block, "type", "") == "text")
+        self.usage_metadata = _Usage(message.usage)
+
+
+class AnthropicStream:
+    """Yields text chunks like a streamed Gemini response; usage is filled in at the end."""
+
+    def __init__(self, manager):
+        self._manager = manager
+        self.usage_metadata = None
+
+    def __iter__(self) -> Iterator[_Chunk]:
+        with self._manager as stream:
+            for text in stream.text_stream:
+                yield _Chunk(text)
+            self.usage_metadata = _Usage(stream.get_final_message().usage)
+
+
+class AnthropicModel:
+    def __init__(self, client, model_name: str, system_instruction: str):
+        self._client = client
+        self.model_name = model_name
+        self.system_instruction = system_instruction
+
+    def generate_content(self, prompt: str, stream: bool = False, generation_config=None):
+        # generation_config only carries Gemini's JSON response mode; the
+        # system instruction already asks for JSON only.
+        request = dict(
+            model=self.model_name, max_tokens=MAX_OUTPUT_TOKENS, system=self.system_instruction,
+            messages=[{"role": "user", "content": prompt}],
+        )
+        if stream:
+            return AnthropicStream(self._client.messages.stream(**request))
+        return AnthropicResponse(self._client.messages.create(**request))
+
+
+class AnthropicClientPool:
+    """Per-key Anthropic clients behind the ``GeminiClientPool`` interface.
+
+    ``model_name`` from the caller names a Gemini model, so it is replaced
+    by this pool's own model.
+    """
+
+    def __init__(self, model_name: str = DEFAULT_ANTHROPIC_MODEL, max_keys: int = MAX_POOLED_KEYS):
+        self.model_name = model_name
+        self.max_keys = max_keys
+        self._clients: "OrderedDict[str, object]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def model(self, api_key: str, model_name: str, system_instruction: str) -> AnthropicModel:
+        return AnthropicModel(self._client_for(api_key), self.model_name, system_instruction)
+
+    def _client_for(self, api_key: str):
+        fp = key_fingerprint(api_key)
+        with self._lock:
+            client = self._clients.get(fp)
+            if client is None:
+                import anthropic  # only needed once an Anthropic provider is configured
+
+                client = anthropic.Anthropic(api_key=api_key, max_retries=0)
+                self._clients[fp] = client
+                while len(self._clients) > self.max_keys:
+                    self._clients.popitem(last=False)
+            self._clients.move_to_end(fp)
+            return client
+
+    def invalidate(self, api_key: str) -> None:
+        with self._lock:
+            self._clients.pop(key_fingerprint(api_key), None)
+
+    def __len__(self) -> int:
+        return len(self._clients)
@@ -1,9 +1,32 @@
 import streamlit as st
-import google.generativeai as genai
+import copy
 import json
-import re
+import os
+import time
 from datetime import datetime
 
+from gemini_client import GeminiClientPool
+from job_queue import Job, JobQueue, QueueFull
+from kit_cache import KitCache
+from kit_core import (
+    DEFAULT_N_BEH, DEFAULT_N_TECH, EXAMPLE_ROLES, LEVELS, N_BEH_RANGE, N_TECH_RANGE, kit_fingerprint, validate_inputs,
+)
+from kit_export import EXPORT_FORMATS, export_bytes, export_filename
+from kit_history import KitHistory
+from kit_render import (
+    beh_card_html, question_label, rubric_card_html,
+    scoring_template, stat_chip_html, tech_card_html, tip_card_html,
+)
+from kit_service import KitRequest, KitResult, KitService, regenerate_key
+from kit_stream import KitStreamParser
+from kit_warmup import CatalogStore, CatalogWarmer
+from question_bank import QuestionBank
+from rate_limit import RateLimitExceeded, RateLimiter
+from scorecards import RECOMMENDATIONS, SCORE_RANGE, ScoreStore, criterion_means, interviewer_drift, panel_summary
+from telemetry import METRICS, serve_metrics, span
+from token_usage import UsageLedger
+from provider_router import ProviderConfigError, ProviderRouter, router_from_env
+
 # ─────────────────────────────────────────────
 # Page Config
 # ─────────────────────────────────────────────
@@ -17,8 +40,7 @@ st.set_page_config(
 # ─────────────────────────────────────────────
 # Custom CSS
 # ─────────────────────────────────────────────
-st.markdown("""
-<style>
+APP_CSS = """
     .stApp { background-color: #0f1117; }
     [data-testid="stSidebar"] {
         background: linear-gradient(180deg, #1a1d2e 0%, #12151f 100%);
@@ -59,19 +81,21 @@ st.markdown("""
     }
     #MainMenu, footer { visibility: hidden; }
     header[data-testid="stHeader"] { background:rgba(0,0,0,0); }
-</style>
-""", unsafe_allow_html=True)
+"""
+
+if "css_injected" not in st.session_state:
+    # The next full rerun drops this element, so the styles are appended to
+    # <head>, where they outlive it; later reruns skip resending the sheet.
+    st.html(
+        f"<script>const s = document.createElement('style'); s.textContent = {json.dumps(APP_CSS)};"
+        " document.head.appendChild(s);</script>",
+        unsafe_allow_javascript=True,
+    )
+    st.session_state.css_injected = True
 
 # ─────────────────────────────────────────────
 # Constants
 # ─────────────────────────────────────────────
-EXAMPLE_ROLES = [
-    "Backend Engineer", "Frontend Engineer", "Full Stack Engineer",
-    "Data Scientist", "ML Engineer", "DevOps Engineer",
-    "Product Manager", "SEO Specialist", "Mobile Developer (iOS/Android)",
-    "Security Engineer", "QA Engineer", "Cloud Architect",
-]
-
 LEVEL_COLORS = {"Junior": "badge-junior", "Mid-Level": "badge-mid", "Senior": "badge-senior"}
 
 # ─────────────────────────────────────────────
@@ -81,160 +105,177 @@ if "kit" not in st.session_state:
     st.session_state.kit = None
 if "api_key" not in st.session_state:
     st.session_state.api_key = ""
+if "regen_round" not in st.session_state:
+    st.session_state.regen_round = 0
+if "job_id" not in st.session_state:
+    st.session_state.job_id = None
+if "regen_job_id" not in st.session_state:
+    st.session_state.regen_job_id = None
+    st.session_state.regen_notices = []
+if "notices" not in st.session_state:
+    st.session_state.notices = []
+if "kit_id" not in st.session_state:
+    st.session_state.kit_id = None
+if "history_cursors" not in st.session_state:
+    st.session_state.history_cursors = [None]
+    st.session_state.history_filters = None
 
 # ─────────────────────────────────────────────
 # Helpers
 # ─────────────────────────────────────────────
-def extract_json(raw: str) -> dict:
-    cleaned = re.sub(r"```(?:json)?", "", raw).replace("```", "").strip()
-    try:
-        return json.loads(cleaned)
-    except json.JSONDecodeError:
-        match = re.search(r"\{.*\}", cleaned, re.DOTALL)
-        if match:
-            return json.loads(match.group())
-        raise ValueError("Could not parse AI response as JSON. Please retry.")
-
-def call_gemini(prompt: str) -> str:
-    genai.configure(api_key=st.session_state.api_key)
-    model = genai.GenerativeModel(
-        model_name="gemini-2.0-flash",
-        system_instruction=(
-            "You are an expert technical recruiter and engineering interview specialist. "
-            "Generate highly structured, role-specific interview content. "
-            "Always respond with valid, parseable JSON only — no prose, no markdown fences, no preamble. "
-            "Every question must be directly relevant to the specified role and experience level."
+@st.cache_resource
+def get_kit_cache() -> KitCache:
+    return KitCache()
+
+@st.cache_resource
+def get_client_pool() -> ProviderRouter:
+    return router_from_env(GeminiClientPool(), get_rate_limiter())
+
+@st.cache_resource
+def get_question_bank() -> QuestionBank:
+    return QuestionBank()
+
+@st.cache_resource
+def get_rate_limiter() -> RateLimiter:
+    return RateLimiter()
+
+@st.cache_resource
+def get_usage_ledger() -> UsageLedger:
+    return UsageLedger()
+
+@st.cache_resource
+def get_metrics_server(port: int):
+    return serve_metrics(port)
+
+if os.environ.get("METRICS_PORT"):
+    get_metrics_server(int(os.environ["METRICS_PORT"]))
+
+def series_name(name: str, labels: dict) -> str:
+    if not labels:
+        return name
+    return name + "{" + ",".join(f"{k}={v}" for k, v in labels.items()) + "}"
+
+def render_admin_panel():
+    snapshot = METRICS.snapshot()
+    with st.expander("📈 Performance (admin)"):
+        if not snapshot["spans"]:
+            st.caption("No timings recorded yet.")
+            return
+        st.dataframe([
+            {"span": series_name(s["span"], s["labels"]), "count": s["count"],
+             "p50 ms": round(s["p50_ms"], 1), "p95 ms": round(s["p95_ms"], 1), "mean ms": round(s["mean_ms"], 1)}
+            for s in snapshot["spans"]
+        ], hide_index=True)
+        st.dataframe([
+            {"counter": series_name(c["counter"], c["labels"]), "value": c["value"]}
+            for c in snapshot["counters"]
+        ], hide_index=True)
+        st.dataframe([
+            {"provider": h["provider"], "healthy": h["healthy"], "samples": h["samples"],
+             "p50 s": h["p50"], "p95 s": h["p95"], "error rate": round(h["error_rate"], 2)}
+            for h in get_client_pool().health()
+        ], hide_index=True)
+        st.download_button(
+            "⬇️ Prometheus metrics", METRICS.prometheus(), file_name="metrics.txt",
+            mime="text/plain", on_click="ignore",
         )
+
+@st.cache_resource
+def get_job_queue() -> JobQueue:
+    return JobQueue()
+
+@st.cache_resource
+def get_kit_history() -> KitHistory:
+    return KitHistory()
+
+@st.cache_resource
+def get_score_store() -> ScoreStore:
+    return ScoreStore()
+
+@st.cache_resource
+def get_catalog_store() -> CatalogStore:
+    return CatalogStore()
+
+@st.cache_resource
+def get_catalog_warmer():
+    # Warm-up spends quota in the background, so it only runs with its own key.
+    api_key = os.environ.get("KIT_WARMUP_API_KEY")
+    if not api_key:
+        return None
+    return CatalogWarmer(get_catalog_store(), api_key, get_client_pool(), get_rate_limiter()).start()
+
+try:
+    get_client_pool()
+except ProviderConfigError as e:
+    st.error(f"⚠️ {e}")
+    st.stop()
+get_catalog_warmer()
+
+# Jobs run on shared worker threads, so the service is resolved here, in the
+# session's script thread, and passed into the job.
+@st.cache_resource
+def get_kit_service() -> KitService:
+    return KitService(
+        get_client_pool(), get_kit_cache(), get_rate_limiter(), get_usage_ledger(),
+        get_question_bank(), get_kit_history(), get_catalog_store(),
     )
-    response = model.generate_content(prompt)
-    return response.text
-
-def validate_inputs(role: str, level: str) -> tuple:
-    if not role.strip():
-        return False, "Please enter a job role."
-    if len(role.strip()) < 3:
-        return False, "Job role must be at least 3 characters."
-    if level not in ["Junior", "Mid-Level", "Senior"]:
-        return False, "Please select a valid experience level."
-    return True, ""
-
-def normalize_role(role: str) -> str:
-    return role.strip().title()
-
-def build_prompt(role: str, level: str, focus: str, n_tech: int, n_beh: int) -> str:
-    level_guidance = {
-        "Junior":    "Focus on fundamentals, core concepts, basic debugging, and simple problem solving.",
-        "Mid-Level": "Focus on applied knowledge, trade-offs, debugging real scenarios, and collaboration.",
-        "Senior":    "Focus on system design, architecture decisions, scalability, mentorship, and strategic thinking.",
-    }[level]
-
-    focus_clause = f" with special focus on: {focus}." if focus.strip() else "."
-
-    return f"""Generate a complete interview kit for:
-- Role: {role}
-- Experience Level: {level}
-- Special Focus: {focus if focus.strip() else "None"}{focus_clause}
-- Calibration: {level_guidance}
-
-Return ONLY this exact JSON structure (no extra text, no markdown, no backticks):
-
-{{
-  "role": "{role}",
-  "level": "{level}",
-  "technical_questions": [
-    {{
-      "id": 1,
-      "question": "...",
-      "rationale": "Why this question matters for the role and level",
-      "expected_topics": ["topic1", "topic2"],
-      "difficulty": "Easy"
-    }}
-  ],
-  "behavioral_questions": [
-    {{
-      "id": 1,
-      "question": "...",
-      "competency": "Communication",
-      "rationale": "Why this competency matters at this level"
-    }}
-  ],
-  "evaluation_rubric": [
-    {{
-      "criterion": "Technical Accuracy",
-      "weight": "30%",
-      "strong": "What a strong answer looks like",
-      "average": "What an average answer looks like",
-      "weak": "What a weak answer looks like",
-      "scoring_tip": "Quick tip for the interviewer"
-    }},
-    {{
-      "criterion": "Depth of Understanding",
-      "weight": "25%",
-      "strong": "...", "average": "...", "weak": "...", "scoring_tip": "..."
-    }},
-    {{
-      "criterion": "Problem-Solving Approach",
-      "weight": "25%",
-      "strong": "...", "average": "...", "weak": "...", "scoring_tip": "..."
-    }},
-    {{
-      "criterion": "Communication Clarity",
-      "weight": "20%",
-      "strong": "...", "average": "...", "weak": "...", "scoring_tip": "..."
-    }}
-  ],
-  "interview_tips": [
-    "Tip 1", "Tip 2", "Tip 3"
-  ]
-}}
-
-Generate exactly {n_tech} technical questions and {n_beh} behavioral questions."""
-
-def build_regen_prompt(role, level, q_type, old_question, focus):
-    return f"""Regenerate a single {q_type} interview question for:
-- Role: {role}
-- Level: {level}
-- Focus: {focus if focus else "None"}
-- Old question (must be different): {old_question}
-
-Return ONLY a single JSON object, no extra text:
-{"{'id': 1, 'question': '...', 'rationale': '...', 'expected_topics': ['...'], 'difficulty': 'Easy|Medium|Hard'}" if q_type == "technical" else "{'id': 1, 'question': '...', 'competency': '...', 'rationale': '...'}"}"""
-
-def build_markdown_export(kit: dict) -> str:
-    ts = datetime.now().strftime("%B %d, %Y at %H:%M")
-    lines = [
-        f"# Interview Kit: {kit['role']} ({kit['level']})",
-        f"*Generated on {ts}*\n", "---\n",
-        "## 🔧 Technical Questions\n",
-    ]
-    for i, q in enumerate(kit.get("technical_questions", []), 1):
-        lines += [
-            f"### Q{i}. {q['question']}",
-            f"- **Difficulty:** {q.get('difficulty','—')}",
-            f"- **Rationale:** {q.get('rationale','—')}",
-            f"- **Expected Topics:** {', '.join(q.get('expected_topics', []))}\n",
-        ]
-    lines += ["---\n", "## 💬 Behavioral Questions\n"]
-    for i, q in enumerate(kit.get("behavioral_questions", []), 1):
-        lines += [
-            f"### Q{i}. {q['question']}",
-            f"- **Competency:** {q.get('competency','—')}",
-            f"- **Rationale:** {q.get('rationale','—')}\n",
-        ]
-    lines += ["---\n", "## 📊 Evaluation Rubric\n"]
-    for r in kit.get("evaluation_rubric", []):
-        lines += [
-            f"### {r['criterion']} (Weight: {r.get('weight','—')})",
-            f"- ✅ **Strong:** {r['strong']}",
-            f"- 🟡 **Average:** {r['average']}",
-            f"- ❌ **Weak:** {r['weak']}",
-            f"- 💡 **Tip:** {r.get('scoring_tip','—')}\n",
-        ]
-    if kit.get("interview_tips"):
-        lines += ["---\n", "## 💡 Interviewer Tips\n"]
-        for tip in kit["interview_tips"]:
-            lines.append(f"- {tip}")
-    return "\n".join(lines)
+
+def open_history_kit(kit_id: int):
+    kit = get_kit_history().load(kit_id)
+    if kit is None:
+        st.session_state.notices = [("warning", "That kit is no longer in the history.")]
+        return
+    st.session_state.kit = kit
+    st.session_state.kit_id = kit_id
+    st.session_state.regen_round += 1
+    summary = get_kit_history().summary(kit_id)
+    st.session_state.notices = [("caption", f"🗂️ Opened {summary.role} ({summary.level}), version {summary.version}.")]
+
+def page_history(step: int):
+    cursors = st.session_state.history_cursors
+    if step > 0:
+        cursors.append(st.session_state.history_next)
+    elif len(cursors) > 1:
+        cursors.pop()
+
+def render_history():
+    history = get_kit_history()
+    with st.expander(f"🗂️ Kit history ({history.stats()['kits']})"):
+        text = st.text_input("Search questions, topics, competencies", key="history_text")
+        facets = history.facets()
+        c1, c2 = st.columns(2)
+        role = c1.selectbox("Role", ["Any"] + facets["roles"], key="history_role")
+        level = c2.selectbox("Level", ["Any"] + LEVELS, key="history_level")
+        difficulty = c1.selectbox("Difficulty", ["Any"] + facets["difficulties"], key="history_difficulty")
+        competency = c2.selectbox("Competency", ["Any"] + facets["competencies"], key="history_competency")
+        all_versions = st.checkbox("Show every version", key="history_all_versions")
+
+        filters = (text, role, level, difficulty, competency, all_versions)
+        if filters != st.session_state.history_filters:
+            st.session_state.history_filters = filters
+            st.session_state.history_cursors = [None]
+        any_ = lambda v: None if v == "Any" else v
+        page = history.search(
+            text, any_(role), any_(level), any_(difficulty), any_(competency),
+            latest_only=not all_versions, cursor=st.session_state.history_cursors[-1],
+        )
+        st.session_state.history_next = page.next_cursor
+        if not page.items:
+            st.caption("No saved kits match.")
+        for item in page.items:
+            focus = f" · {item.focus}" if item.focus else ""
+            when = datetime.fromtimestamp(item.created).strftime("%b %d, %H:%M")
+            st.button(
+                f"{item.role} · {item.level}{focus} · v{item.version} · {when}",
+                key=f"history_open_{item.id}", on_click=open_history_kit, args=(item.id,),
+                type="primary" if item.id == st.session_state.kit_id else "secondary",
+                width="stretch",
+            )
+        n1, n2 = st.columns(2)
+        n1.button("‹ Newer", key="history_newer", on_click=page_history, args=(-1,),
+                  disabled=len(st.session_state.history_cursors) == 1)
+        n2.button("Older ›", key="history_older", on_click=page_history, args=(1,),
+                  disabled=page.next_cursor is None)
 
 # ─────────────────────────────────────────────
 # Sidebar
@@ -257,6 +298,8 @@ with st.sidebar:
         placeholder="AIzaSy...",
     )
     if api_key_input:
+        if st.session_state.api_key and api_key_input != st.session_state.api_key:
+            get_client_pool().invalidate(st.session_state.api_key)
         st.session_state.api_key = api_key_input
 
     st.markdown("---")
@@ -273,7 +316,7 @@ with st.sidebar:
 
     level_input = st.radio(
         "Experience Level *",
-        ["Junior", "Mid-Level", "Senior"],
+        LEVELS,
         horizontal=False,
     )
 
@@ -283,8 +326,28 @@ with st.sidebar:
     )
 
     st.markdown("### ⚙️ Output Settings")
-    n_tech = st.slider("Technical questions", 3, 10, 6)
-    n_beh  = st.slider("Behavioral questions", 2, 8, 4)
+    n_tech = st.slider("Technical questions", *N_TECH_RANGE, DEFAULT_N_TECH)
+    n_beh  = st.slider("Behavioral questions", *N_BEH_RANGE, DEFAULT_N_BEH)
+    gen_mode = st.radio(
+        "Generation mode",
+        ["⚡ Streaming", "🔀 Parallel sections", "📦 Single request"],
+        help=(
+            "Streaming shows each question as soon as it is written. "
+            "Parallel sections requests questions, behaviorals and rubric concurrently."
+        ),
+    )
+    use_bank = st.checkbox(
+        "♻️ Reuse matching questions from the bank", value=True,
+        help="Fill slots with previously generated questions for this role and level; only the rest is requested.",
+    )
+    compact_prompts = st.checkbox(
+        "🗜️ Compact prompts", value=False,
+        help="Shorter prompts and Gemini's JSON response mode: same kit, fewer input tokens.",
+    )
+    fresh_generation = st.checkbox(
+        "🆕 Fresh generation", value=False,
+        help="Always call the model: skip precomputed catalog kits, banked questions and cached responses.",
+    )
 
     st.markdown("---")
     generate_btn = st.button(
@@ -295,6 +358,29 @@ with st.sidebar:
     if not st.session_state.api_key:
         st.warning("↑ Enter your free Gemini API key above to begin.")
 
+    cache_stats = get_kit_cache().stats()
+    st.caption(
+        f"🗄️ Kit cache: {cache_stats['hits']} hits · {cache_stats['misses']} misses "
+        f"· {cache_stats['disk_entries']} stored"
+    )
+    st.caption(f"♻️ Question bank: {get_question_bank().stats()['total']} questions")
+    catalog_stats = get_catalog_store().stats()
+    st.caption(f"⚡ Precomputed catalog: {catalog_stats['stored']}/{catalog_stats['catalog']} kits")
+    jobs = get_job_queue().stats()
+    if jobs["running"] or jobs["queued"]:
+        st.caption(f"🧵 Jobs: {jobs['running']} running · {jobs['queued']} queued")
+    usage = get_usage_ledger().summary()
+    if usage["calls"]:
+        st.caption(
+            f"🔢 Tokens: {usage['prompt_tokens']:,} in · {usage['output_tokens']:,} out "
+            f"over {usage['calls']} calls · avg {usage['avg_seconds']:.1f}s"
+        )
+
+    if st.query_params.get("admin") == "1" or os.environ.get("KIT_ADMIN"):
+        render_admin_panel()
+
+    render_history()
+
 # ─────────────────────────────────────────────
 # Header
 # ─────────────────────────────────────────────
@@ -305,70 +391,282 @@ st.markdown("---")
 # ─────────────────────────────────────────────
 # Generation
 # ─────────────────────────────────────────────
+JOB_POLL_SECONDS = 0.5
+
+GENERATION_MODES = {"⚡ Streaming": "stream", "🔀 Parallel sections": "parallel", "📦 Single request": "single"}
+
+def generation_notices(result: KitResult, request: KitRequest) -> list:
+    notices = [("success", "✅ Interview kit generated successfully!")]
+    if result.source == "catalog":
+        notices.append(("caption", f"⚡ Precomputed catalog kit from {format_age(result.catalog_age)} ago. "
+                                   "Tick 🆕 Fresh generation for a new one."))
+    elif result.source == "bank":
+        notices.append(("caption", f"♻️ Reused {result.reused} of {request.n_tech + request.n_beh} "
+                                   "questions from the question bank."))
+    elif result.issues:
+        notices.append(("caption", "🩹 Re-requested only the invalid parts: " + "; ".join(result.issues)))
+    return notices
+
+def generate_kit_job(job: Job, service: KitService, request: KitRequest, api_key: str) -> dict:
+    """Worker side of a generation: no Streamlit calls, everything it needs is passed in."""
+    # Streamed chunks are published on the job, where polling sessions render them.
+    result = service.generate(request, api_key, on_chunk=job.append_progress)
+    return {"kit": result.kit, "kit_id": result.kit_id, "notices": generation_notices(result, request)}
+
+def regenerate_job(
+    job: Job, service: KitService, kit: dict, parent_id, q_type: str, indices: list, api_key: str,
+) -> dict:
+    result = service.regenerate(kit, q_type, indices, api_key, parent_id=parent_id)
+    return {"kit": result.kit, "kit_id": result.kit_id, "notices": []}
+
+def format_age(seconds: float) -> str:
+    if seconds < 3600:
+        return f"{max(1, int(seconds // 60))} min"
+    if seconds < 86400:
+        return f"{int(seconds // 3600)} h"
+    return f"{int(seconds // 86400)} d"
+
+def error_notice(e: Exception) -> tuple:
+    err_msg = str(e)
+    if isinstance(e, (RateLimitExceeded, QueueFull)):
+        return "warning", f"⏳ {err_msg}"
+    if "API_KEY_INVALID" in err_msg or "invalid" in err_msg.lower():
+        return "error", "❌ Invalid Gemini API key. Please check and try again."
+    if "quota" in err_msg.lower():
+        return "error", "❌ Free quota still exceeded after several retries. Wait a minute and retry."
+    return "error", f"❌ {err_msg}"
+
+def submit_job(key: str, fn, *args, kind: str) -> None:
+    """Queue ``fn`` (or join an identical in-flight job) and poll it from this session."""
+    try:
+        job = get_job_queue().submit(key, fn, *args, kind=kind)
+    except QueueFull as e:
+        st.session_state.notices = [error_notice(e)]
+        return
+    st.session_state.job_id = job.id
+    st.session_state.notices = []
+
+def job_shared(job: Job) -> str:
+    return f" · shared by {job.subscribers} requests" if job.subscribers > 1 else ""
+
+def render_stream_preview(text: str):
+    parser = KitStreamParser()
+    found = {"technical_questions": [], "behavioral_questions": []}
+    for section, q in parser.feed(text):
+        found[section].append(q)
+    for title, section, card in (
+        ("### 🔧 Technical Questions", "technical_questions", tech_card_html),
+        ("### 💬 Behavioral Questions", "behavioral_questions", beh_card_html),
+    ):
+        st.markdown(title)
+        for idx, q in enumerate(found[section]):
+            with st.expander(question_label(idx, q)):
+                st.markdown(card(idx, q), unsafe_allow_html=True)
+
+@st.fragment(run_every=JOB_POLL_SECONDS)
+def job_status():
+    """Polls this session's job; a rerun or another session's identical request never restarts it."""
+    job = get_job_queue().get(st.session_state.job_id)
+    if job is None:
+        st.session_state.job_id = None
+        st.rerun()
+    if not job.done:
+        with st.spinner(f"Generating interview kit… ({job.status}, {job.elapsed():.0f}s{job_shared(job)})"):
+            render_stream_preview(job.progress_text())
+        return
+
+    st.session_state.job_id = None
+    if job.error is not None:
+        st.session_state.notices = [error_notice(job.error)]
+    else:
+        # Coalesced sessions share the result object; each gets its own copy.
+        st.session_state.kit = copy.deepcopy(job.result["kit"])
+        st.session_state.kit_id = job.result["kit_id"]
+        st.session_state.notices = job.result["notices"]
+    st.rerun()
+
 if generate_btn:
     valid, err = validate_inputs(role_input, level_input)
     if not valid:
         st.error(f"⚠️ {err}")
     else:
-        normalized = normalize_role(role_input)
-        with st.spinner(f"Generating interview kit for **{normalized}** ({level_input})…"):
-            try:
-                prompt = build_prompt(normalized, level_input, focus_input, n_tech, n_beh)
-                raw = call_gemini(prompt)
-                kit = extract_json(raw)
-                kit["_focus"] = focus_input
-                st.session_state.kit = kit
-                st.success("✅ Interview kit generated successfully!")
-            except Exception as e:
-                err_msg = str(e)
-                if "API_KEY_INVALID" in err_msg or "invalid" in err_msg.lower():
-                    st.error("❌ Invalid Gemini API key. Please check and try again.")
-                elif "quota" in err_msg.lower():
-                    st.error("❌ Free quota exceeded. Wait a minute and retry.")
-                else:
-                    st.error(f"❌ {err_msg}")
+        request = KitRequest(
+            role_input, level_input, focus_input, n_tech, n_beh,
+            GENERATION_MODES[gen_mode], use_bank, compact_prompts, fresh_generation,
+        ).normalized()
+        # A regenerate still running would overwrite the new kit when it lands.
+        st.session_state.regen_job_id = None
+        service = get_kit_service()
+        stored = service.lookup_catalog(request)
+        if stored is not None:
+            st.session_state.kit = stored.kit
+            st.session_state.kit_id = stored.kit_id
+            st.session_state.job_id = None
+            st.session_state.notices = generation_notices(stored, request)
+        else:
+            submit_job(request.key(st.session_state.api_key), generate_kit_job, service, request, st.session_state.api_key, kind="generate")
+
+if st.session_state.job_id:
+    job_status()
+
+for level, msg in st.session_state.notices:
+    getattr(st, level)(msg)
+st.session_state.notices = []
 
 # ─────────────────────────────────────────────
 # Output
 # ─────────────────────────────────────────────
-if st.session_state.kit:
+def submit_regenerate(q_type: str, indices: list):
     kit = st.session_state.kit
-
+    try:
+        job = get_job_queue().submit(
+            regenerate_key(kit_fingerprint(kit), q_type, indices, st.session_state.api_key),
+            regenerate_job,
+            get_kit_service(), kit, st.session_state.kit_id, q_type, indices, st.session_state.api_key,
+            kind="regenerate",
+        )
+    except QueueFull as e:
+        st.session_state.regen_notices = [error_notice(e)]
+    else:
+        st.session_state.regen_job_id = job.id
+        st.session_state.regen_notices = []
+
+def poll_regenerate():
+    """This session's running regenerate job, after applying it to the kit if it finished."""
+    job = get_job_queue().get(st.session_state.regen_job_id)
+    if job is not None and not job.done:
+        return job
+    st.session_state.regen_job_id = None
+    if job is None:
+        return None
+    if job.error is not None:
+        st.session_state.regen_notices = [("error", f"Regeneration failed: {job.error}")]
+    else:
+        st.session_state.kit = copy.deepcopy(job.result["kit"])
+        st.session_state.kit_id = job.result["kit_id"]
+        # New widget keys clear the selection for the next round.
+        st.session_state.regen_round += 1
+    return None
+
+def regen_selector(q_type: str, questions: list):
+    c1, c2 = st.columns([3, 1])
+    with c1:
+        selected = st.multiselect(
+            "Select questions to replace",
+            list(range(len(questions))),
+            format_func=lambda i: question_label(i, questions[i]),
+            key=f"regen_sel_{q_type}_{st.session_state.regen_round}",
+            placeholder="Pick one or more questions…",
+        )
+    with c2:
+        st.markdown("<br>", unsafe_allow_html=True)
+        clicked = st.button(
+            f"🔄 Regenerate selected ({len(selected)})",
+            key=f"regen_many_{q_type}", disabled=not selected,
+        )
+    if clicked:
+        submit_regenerate(q_type, selected)
+
+def render_scoring(kit: dict, kit_id: int):
+    summary = get_kit_history().summary(kit_id)
+    if summary is None:
+        return
+    # Scorecards follow the kit's lineage, so regenerating questions keeps the panel.
+    lineage = summary.lineage
+    store = get_score_store()
+    try:
+        rubric = store.register(lineage, kit)
+    except ValueError as e:
+        st.caption(str(e))
+        return
+    low, high = SCORE_RANGE
+    with st.form(f"scorecard_{lineage}"):
+        c1, c2 = st.columns(2)
+        candidate = c1.text_input("Candidate")
+        interviewer = c2.text_input("Interviewer")
+        scores = {
+            criterion: st.slider(f"{criterion} · {weight:.0%}", low, high, (low + high) // 2, key=f"score_{lineage}_{i}")
+            for i, (criterion, weight) in enumerate(zip(rubric.criteria, rubric.weights))
+        }
+        recommendation = st.radio("Recommendation", RECOMMENDATIONS, index=None, horizontal=True)
+        notes = st.text_area("Notes", height=80)
+        saved = st.form_submit_button("💾 Save scorecard")
+    if saved:
+        try:
+            store.record(lineage, candidate, interviewer, scores, recommendation or "", notes)
+            total = float(rubric.weights @ list(scores.values()))
+            st.success(f"Saved {interviewer.strip()}'s scorecard for {candidate.strip()}: {total:.2f} / {high}.")
+        except ValueError as e:
+            st.error(f"⚠️ {e}")
+
+    panel = store.matrix(lineage=lineage)
+    if not len(panel):
+        return
+    st.markdown("#### 👥 Panel")
+    means = criterion_means(panel)
+    st.dataframe([
+        {"candidate": s.candidate, "interviewers": s.interviewers, "weighted mean": round(s.mean, 2),
+         "variance": round(s.variance, 3), "range": f"{s.low:.2f}–{s.high:.2f}",
+         **{c: round(float(means[i, j]), 2) for j, c in enumerate(rubric.criteria)},
+         "votes": ", ".join(f"{n} {r}" for r, n in s.recommendations.items())}
+        for i, s in sorted(enumerate(panel_summary(panel)), key=lambda x: -x[1].mean)
+    ], hide_index=True)
+    drift = [d for d in interviewer_drift(panel) if d.scorecards]
+    if drift:
+        st.caption("Calibration drift: each interviewer's average distance from the rest of the panel "
+                   "(positive = scores higher).")
+        st.dataframe([
+            {"interviewer": d.interviewer, "compared": d.scorecards, "drift": round(d.drift, 2),
+             "spread": round(d.spread, 2)}
+            for d in sorted(drift, key=lambda d: -abs(d.drift))
+        ], hide_index=True)
+
+def render_kit_header(kit: dict):
     # Stats bar
     r1, r2, r3, r4 = st.columns(4)
     with r1:
-        st.markdown(f"""<div class="stat-chip">
-            <div class="label">ROLE</div>
-            <div class="value" style="font-size:13px;margin-top:4px">{kit.get('role','—')}</div>
-        </div>""", unsafe_allow_html=True)
+        st.markdown(stat_chip_html("ROLE", kit.get('role','—'), "font-size:13px;margin-top:4px"),
+                    unsafe_allow_html=True)
     with r2:
         badge = LEVEL_COLORS.get(kit.get("level",""), "badge-mid")
-        st.markdown(f"""<div class="stat-chip">
-            <div class="label">LEVEL</div>
-            <div class="value"><span class="difficulty-badge {badge}">{kit.get('level','—')}</span></div>
-        </div>""", unsafe_allow_html=True)
+        st.markdown(stat_chip_html(
+            "LEVEL", f'<span class="difficulty-badge {badge}">{kit.get("level","—")}</span>'
+        ), unsafe_allow_html=True)
     with r3:
-        st.markdown(f"""<div class="stat-chip">
-            <div class="label">TECHNICAL Qs</div>
-            <div class="value">{len(kit.get('technical_questions',[]))}</div>
-        </div>""", unsafe_allow_html=True)
+        st.markdown(stat_chip_html("TECHNICAL Qs", len(kit.get('technical_questions',[]))),
+                    unsafe_allow_html=True)
     with r4:
-        st.markdown(f"""<div class="stat-chip">
-            <div class="label">BEHAVIORAL Qs</div>
-            <div class="value">{len(kit.get('behavioral_questions',[]))}</div>
-        </div>""", unsafe_allow_html=True)
+        st.markdown(stat_chip_html("BEHAVIORAL Qs", len(kit.get('behavioral_questions',[]))),
+                    unsafe_allow_html=True)
 
     st.markdown("<br>", unsafe_allow_html=True)
 
-    # Download button
-    md_export = build_markdown_export(kit)
-    filename = f"interview_kit_{kit.get('role','role').replace(' ','_')}_{kit.get('level','')}.md"
-    st.download_button(
-        label="⬇️ Download Interview Kit (Markdown)",
-        data=md_export,
-        file_name=filename,
-        mime="text/markdown",
-    )
+    # Downloads are rendered only when clicked, then cached by kit content.
+    for col, (fmt, spec) in zip(st.columns(len(EXPORT_FORMATS)), EXPORT_FORMATS.items()):
+        with col:
+            st.download_button(
+                label=f"⬇️ {spec.label}",
+                data=lambda fmt=fmt: export_bytes(kit, fmt),
+                file_name=export_filename(kit, fmt),
+                mime=spec.mime,
+                key=f"download_{fmt}",
+                on_click="ignore",
+            )
+
+@st.fragment
+def render_kit():
+    # Set by the script body, so False on the kit view's own reruns.
+    full_run = st.session_state.pop("kit_full_run", False)
+    job = poll_regenerate() if st.session_state.regen_job_id else None
+    if job is not None:
+        st.info(f"🔄 Regenerating questions… ({job.status}, {job.elapsed():.0f}s{job_shared(job)})")
+    for level, msg in st.session_state.regen_notices:
+        getattr(st, level)(msg)
+    st.session_state.regen_notices = []
+
+    kit = st.session_state.kit
+    with span("render", section="header"):
+        render_kit_header(kit)
 
     st.markdown("---")
 
@@ -380,19 +678,14 @@ if st.session_state.kit:
     ])
 
     # ── Technical Questions ──────────────────
-    with tab_tech:
+    with tab_tech, span("render", section="technical"):
         st.markdown("### 🔧 Technical Questions")
+        regen_selector("technical", kit.get("technical_questions", []))
         for idx, q in enumerate(kit.get("technical_questions", [])):
-            diff = q.get("difficulty", "Medium")
-            badge_cls = {"Easy":"badge-junior","Medium":"badge-mid","Hard":"badge-senior"}.get(diff,"badge-mid")
             topics_str = " · ".join(q.get("expected_topics", []))
 
-            with st.expander(f"Q{idx+1}. {q['question'][:90]}{'…' if len(q['question'])>90 else ''}"):
-                st.markdown(f"""<div class="question-card">
-                    <div class="question-num">Question {idx+1}</div>
-                    <div class="question-text">{q['question']}</div>
-                    <span class="difficulty-badge {badge_cls}">{diff}</span>
-                </div>""", unsafe_allow_html=True)
+            with st.expander(question_label(idx, q)):
+                st.markdown(tech_card_html(idx, q), unsafe_allow_html=True)
 
                 c1, c2 = st.columns(2)
                 with c1:
@@ -402,109 +695,40 @@ if st.session_state.kit:
                         st.markdown(f"**🏷️ Expected Topics:** `{topics_str}`")
 
                 if st.button("🔄 Regenerate this question", key=f"regen_tech_{idx}"):
-                    with st.spinner("Regenerating…"):
-                        try:
-                            raw = call_gemini(build_regen_prompt(
-                                kit["role"], kit["level"], "technical",
-                                q["question"], kit.get("_focus","")
-                            ))
-                            new_q = extract_json(raw)
-                            new_q["id"] = q.get("id", idx+1)
-                            st.session_state.kit["technical_questions"][idx] = new_q
-                            st.rerun()
-                        except Exception as e:
-                            st.error(f"Regeneration failed: {e}")
+                    submit_regenerate("technical", [idx])
 
     # ── Behavioral Questions ─────────────────
-    with tab_beh:
+    with tab_beh, span("render", section="behavioral"):
         st.markdown("### 💬 Behavioral Questions")
-        COMP_COLORS = {
-            "Communication":"#4ade80","Ownership":"#fb923c",
-            "Collaboration":"#38bdf8","Conflict Resolution":"#f472b6",
-            "Leadership":"#a78bfa","Growth Mindset":"#fbbf24",
-        }
+        regen_selector("behavioral", kit.get("behavioral_questions", []))
         for idx, q in enumerate(kit.get("behavioral_questions", [])):
-            comp = q.get("competency","General")
-            comp_color = COMP_COLORS.get(comp,"#94a3b8")
-            with st.expander(f"Q{idx+1}. {q['question'][:90]}{'…' if len(q['question'])>90 else ''}"):
-                st.markdown(f"""<div class="question-card">
-                    <div class="question-num">Behavioral Question {idx+1}</div>
-                    <div class="question-text">{q['question']}</div>
-                    <span class="difficulty-badge" style="background:#1a1a2e;color:{comp_color};
-                          border:1px solid {comp_color};">{comp}</span>
-                </div>""", unsafe_allow_html=True)
+            with st.expander(question_label(idx, q)):
+                st.markdown(beh_card_html(idx, q), unsafe_allow_html=True)
                 st.markdown(f"**🎯 Competency Rationale:** {q.get('rationale','—')}")
 
                 if st.button("🔄 Regenerate this question", key=f"regen_beh_{idx}"):
-                    with st.spinner("Regenerating…"):
-                        try:
-                            raw = call_gemini(build_regen_prompt(
-                                kit["role"], kit["level"], "behavioral",
-                                q["question"], kit.get("_focus","")
-                            ))
-                            new_q = extract_json(raw)
-                            new_q["id"] = q.get("id", idx+1)
-                            st.session_state.kit["behavioral_questions"][idx] = new_q
-                            st.rerun()
-                        except Exception as e:
-                            st.error(f"Regeneration failed: {e}")
+                    submit_regenerate("behavioral", [idx])
 
     # ── Evaluation Rubric ────────────────────
-    with tab_rubric:
+    with tab_rubric, span("render", section="rubric"):
         st.markdown("### 📊 Evaluation Rubric")
         st.markdown("*Use this rubric to score candidate responses consistently.*")
         for r in kit.get("evaluation_rubric", []):
-            st.markdown(f"""
-            <div style="background:#1e2235;border:1px solid #3a3f5c;border-radius:12px;
-                        padding:20px;margin-bottom:16px;">
-                <div style="display:flex;justify-content:space-between;align-items:center;
-                            border-bottom:1px solid #3a3f5c;padding-bottom:10px;margin-bottom:14px;">
-                    <span style="font-size:16px;font-weight:700;color:#e2e8f0;">{r['criterion']}</span>
-                    <span style="background:#252840;border:1px solid #4f46e5;border-radius:20px;
-                                 padding:4px 12px;font-size:12px;color:#818cf8;font-weight:600;">
-                        Weight: {r.get('weight','—')}
-                    </span>
-                </div>
-                <table class="rubric-table">
-                    <thead><tr>
-                        <th style="width:33%">✅ Strong Response</th>
-                        <th style="width:33%">🟡 Average Response</th>
-                        <th style="width:33%">❌ Weak Response</th>
-                    </tr></thead>
-                    <tbody><tr>
-                        <td class="strong-cell">{r.get('strong','—')}</td>
-                        <td class="average-cell">{r.get('average','—')}</td>
-                        <td class="weak-cell">{r.get('weak','—')}</td>
-                    </tr></tbody>
-                </table>
-                <div style="margin-top:12px;padding:8px 14px;background:#252840;border-radius:8px;
-                            border-left:3px solid #6366f1;">
-                    <span style="font-size:12px;color:#94a3b8;">💡 Tip: </span>
-                    <span style="font-size:13px;color:#cbd5e1;">{r.get('scoring_tip','—')}</span>
-                </div>
-            </div>
-            """, unsafe_allow_html=True)
+            st.markdown(rubric_card_html(r), unsafe_allow_html=True)
+
+        if st.session_state.kit_id is not None:
+            st.markdown("#### 🧮 Score a Candidate")
+            render_scoring(kit, st.session_state.kit_id)
 
         # Scoring template
         st.markdown("#### 📝 Quick Scoring Template")
-        score_md = f"## Candidate Evaluation — {kit.get('role','')} ({kit.get('level','')})\n\n"
-        score_md += "| Criterion | Weight | Score (1–5) | Notes |\n|---|---|---|---|\n"
-        for r in kit.get("evaluation_rubric", []):
-            score_md += f"| {r['criterion']} | {r.get('weight','—')} | _ | |\n"
-        score_md += "\n**Recommendation:** ☐ Strong Hire  ☐ Hire  ☐ No Hire  ☐ Strong No Hire\n"
-        st.code(score_md, language="markdown")
+        st.code(scoring_template(kit), language="markdown")
 
     # ── Interviewer Tips ─────────────────────
-    with tab_tips:
+    with tab_tips, span("render", section="tips"):
         st.markdown("### 💡 Role-Specific Tips")
-        icons = ["💡","📌","⚡","🎯","🔍"]
         for i, tip in enumerate(kit.get("interview_tips", [])):
-            st.markdown(f"""<div style="display:flex;gap:14px;align-items:flex-start;
-                background:#1e2235;border:1px solid #3a3f5c;border-radius:10px;
-                padding:14px 18px;margin-bottom:10px;">
-                <span style="font-size:20px;min-width:28px;">{icons[i % len(icons)]}</span>
-                <span style="color:#e2e8f0;font-size:14px;line-height:1.6;">{tip}</span>
-            </div>""", unsafe_allow_html=True)
+            st.markdown(tip_card_html(i, tip), unsafe_allow_html=True)
 
         st.markdown("---")
         st.markdown("#### 🧭 General Best Practices")
@@ -522,6 +746,17 @@ if st.session_state.kit:
                 <span style="color:#cbd5e1;font-size:13px;">{text}</span>
             </div>""", unsafe_allow_html=True)
 
+    # The kit view polls its own regenerate job, so only it reruns.
+    if st.session_state.regen_job_id or st.session_state.regen_notices:
+        if job is not None:
+            time.sleep(JOB_POLL_SECONDS)
+        # A fragment-scoped rerun is refused while the whole script is running.
+        st.rerun(scope="app" if full_run else "fragment")
+
+if st.session_state.kit:
+    st.session_state.kit_full_run = True
+    render_kit()
+
 else:
     st.markdown("""
     <div style="text-align:center;padding:60px 20px;">
@@ -0,0 +1,285 @@
+"""Headless batch generation of interview kits.
+
+Usage:
+    python batch.py manifest.csv --out kits/ --api-key KEY [--api-key KEY2 ...]
+
+The manifest is CSV or JSONL with columns ``role``, ``level`` and optional
+``focus``, ``n_tech``, ``n_beh`` and ``id`` (letters, digits, ``.``, ``_``
+and ``-``; unique). Each row produces ``<id>.json`` and ``<id>.md`` in the
+output directory. Completed rows are
+appended to ``checkpoint.jsonl`` so an interrupted run resumes where it
+stopped; ``summary.json`` reports the outcome of every row. ``--zip``
+bundles every generated kit into one archive in the chosen ``--formats``.
+"""
+import argparse
+import csv
+import hashlib
+import json
+import os
+import re
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass
+from typing import Iterator, List, Optional, Tuple
+
+from gemini_client import GeminiClientPool
+from kit_cache import KitCache
+from kit_core import (
+    DEFAULT_N_BEH, DEFAULT_N_TECH, N_BEH_RANGE, N_TECH_RANGE, build_markdown_export, normalize_role, validate_inputs,
+)
+from kit_export import EXPORT_FORMATS, write_zip
+from kit_service import KitRequest, KitService
+from provider_router import ProviderConfigError, router_from_env
+from rate_limit import DEFAULT_RPM, RateLimiter
+from token_usage import UsageLedger
+
+DEFAULT_WORKERS = 4
+CHECKPOINT_FILE = "checkpoint.jsonl"
+SUMMARY_FILE = "summary.json"
+# Row ids name the output files, so they must stay inside the output directory.
+ROW_ID_PATTERN = re.compile(r"[A-Za-z0-9._-]+")
+
+
+@dataclass
+class BatchRow:
+    row_id: str
+    role: str
+    level: str
+    focus: str = ""
+    n_tech: int = DEFAULT_N_TECH
+    n_beh: int = DEFAULT_N_BEH
+    error: str = ""  # why the row cannot be generated, set by the manifest loader
+
+
+def _slug(text: str) -> str:
+    return re.sub(r"[^a-z0-9]+", "-", text.lower()).strip("-")
+
+
+def _count(record: dict, name: str, default: int, bounds: Tuple[int, int]) -> Tuple[int, str]:
+    """``(value, error)`` for a question-count cell; blank cells take ``default``."""
+    raw = record.get(name)
+    if raw is None or str(raw).strip() == "":
+        return default, ""
+    low, high = bounds
+    try:
+        value = float(str(raw).strip())
+    except ValueError:
+        return default, f"{name} must be a whole number from {low} to {high}, got {raw!r}"
+    if not value.is_integer() or not low <= value <= high:
+        return default, f"{name} must be a whole number from {low} to {high}, got {raw!r}"
+    return int(value), ""
+
+
+def _row_from_record(record: dict) -> BatchRow:
+    role = normalize_role(str(record.get("role") or ""))
+    level = str(record.get("level") or "").strip()
+    focus = str(record.get("focus") or "").strip()
+    n_tech, tech_error = _count(record, "n_tech", DEFAULT_N_TECH, N_TECH_RANGE)
+    n_beh, beh_error = _count(record, "n_beh", DEFAULT_N_BEH, N_BEH_RANGE)
+    valid, error = validate_inputs(role, level)
+    row_id = str(record.get("id") or "").strip()
+    id_error = ""
+    if row_id and (not ROW_ID_PATTERN.fullmatch(row_id) or ".." in row_id or row_id.startswith(".")):
+        id_error = (f"id may only use letters, digits, '.', '_' and '-', and may not start with '.' "
+                    f"or contain '..'; got {row_id!r}")
+        row_id = ""
+    error = "; ".join(e for e in ("" if valid else error, tech_error, beh_error, id_error) if e)
+    if not row_id:
+        counts = f"{record.get('n_tech')}|{record.get('n_beh')}" if error else f"{n_tech}|{n_beh}"
+        digest = hashlib.sha1(f"{role}|{level}|{focus}|{counts}".encode("utf-8")).hexdigest()[:8]
+        row_id = f"{_slug(role)}_{_slug(level)}_{digest}"
+    return BatchRow(row_id, role, level, focus, n_tech, n_beh, error)
+
+
+def load_manifest(path: str) -> List[BatchRow]:
+    with open(path, newline="", encoding="utf-8") as f:
+        if path.endswith((".jsonl", ".ndjson")):
+            records = [json.loads(line) for line in f if line.strip()]
+        else:
+            records = list(csv.DictReader(f))
+    rows, seen = [], set()
+    for number, record in enumerate(records, 1):
+        record = record if isinstance(record, dict) else {}
+        row = _row_from_record(record)
+        if row.row_id in seen:
+            if str(record.get("id") or "").strip() and not row.error:
+                row.error = f"duplicate id {row.row_id!r}"
+            # Repeated rows still need their own files and result entries.
+            base, n = row.row_id, 2
+            while row.row_id in seen:
+                row.row_id, n = f"{base}_{n}", n + 1
+        seen.add(row.row_id)
+        rows.append(row)
+    return rows
+
+
+def _write_atomic(path: str, data: str) -> None:
+    tmp = f"{path}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.write(data)
+    os.replace(tmp, path)
+
+
+class Checkpoint:
+    def __init__(self, out_dir: str):
+        self.path = os.path.join(out_dir, CHECKPOINT_FILE)
+        self._lock = threading.Lock()
+        self.done = {}
+        if os.path.exists(self.path):
+            with open(self.path, encoding="utf-8") as f:
+                for line in f:
+                    if line.strip():
+                        entry = json.loads(line)
+                        self.done[entry["row_id"]] = entry
+
+    def record(self, result: dict) -> None:
+        with self._lock:
+            self.done[result["row_id"]] = result
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(result) + "\n")
+                f.flush()
+                os.fsync(f.fileno())
+
+
+def run_row(row: BatchRow, api_key: str, service: KitService, out_dir: str, compact: bool = False) -> dict:
+    result = {"row_id": row.row_id, "role": row.role, "level": row.level, "focus": row.focus}
+    if row.error:
+        return dict(result, status="invalid", error=row.error)
+
+    started = time.monotonic()
+    request = KitRequest(row.role, row.level, row.focus, row.n_tech, row.n_beh, use_bank=False, compact=compact)
+    try:
+        generated = service.generate(request, api_key)
+    except Exception as e:
+        return dict(result, status="failed", error=f"{type(e).__name__}: {e}",
+                    seconds=round(time.monotonic() - started, 3))
+
+    kit, issues = generated.kit, generated.issues
+    _write_atomic(os.path.join(out_dir, f"{row.row_id}.json"), json.dumps(kit, indent=2, ensure_ascii=False))
+    _write_atomic(os.path.join(out_dir, f"{row.row_id}.md"), build_markdown_export(kit))
+    return dict(
+        result, status="ok", repaired=issues,
+        technical=len(kit.get("technical_questions", [])),
+        behavioral=len(kit.get("behavioral_questions", [])),
+        seconds=round(time.monotonic() - started, 3),
+    )
+
+
+def run_batch(
+    rows: List[BatchRow],
+    api_keys: List[str],
+    out_dir: str,
+    workers: int = DEFAULT_WORKERS,
+    rpm: float = DEFAULT_RPM,
+    cache: Optional[KitCache] = None,
+    resume: bool = True,
+    compact: bool = False,
+    log=print,
+) -> dict:
+    os.makedirs(out_dir, exist_ok=True)
+    checkpoint = Checkpoint(out_dir)
+    # Headless runs can afford to wait out the queue rather than fail rows.
+    limiter = RateLimiter(rpm, max_wait=float("inf"))
+    ledger = UsageLedger()
+    service = KitService(router_from_env(GeminiClientPool(), limiter), cache, limiter, ledger)
+
+    pending = [r for r in rows if not (resume and checkpoint.done.get(r.row_id, {}).get("status") == "ok")]
+    skipped = len(rows) - len(pending)
+    log(f"{len(rows)} rows, {skipped} already done, {len(pending)} to generate")
+
+    results = {}
+    started = time.monotonic()
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = {
+            executor.submit(
+                run_row, row, api_keys[i % len(api_keys)], service, out_dir, compact,
+            ): row
+            for i, row in enumerate(pending)
+        }
+        for fut in as_completed(futures):
+            result = fut.result()
+            results[result["row_id"]] = result
+            if result["status"] == "ok":
+                checkpoint.record(result)
+            log(f"[{result['status']:>7}] {result['row_id']} {result.get('error', '')}".rstrip())
+
+    rows_report = [results.get(r.row_id) or checkpoint.done.get(r.row_id) for r in rows]
+    summary = {
+        "total": len(rows),
+        "ok": sum(1 for r in rows_report if r and r["status"] == "ok"),
+        "failed": sum(1 for r in rows_report if r and r["status"] == "failed"),
+        "invalid": sum(1 for r in rows_report if r and r["status"] == "invalid"),
+        "resumed": skipped,
+        "seconds": round(time.monotonic() - started, 3),
+        "usage": ledger.summary(),
+        "rows": rows_report,
+    }
+    _write_atomic(os.path.join(out_dir, SUMMARY_FILE), json.dumps(summary, indent=2, ensure_ascii=False))
+    return summary
+
+
+def iter_batch_kits(rows: List[BatchRow], out_dir: str) -> Iterator[Tuple[str, dict]]:
+    """``(row_id, kit)`` for every generated row, read from disk one at a time."""
+    for row in rows:
+        path = os.path.join(out_dir, f"{row.row_id}.json")
+        if os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                yield row.row_id, json.load(f)
+
+
+def export_batch_zip(rows: List[BatchRow], out_dir: str, zip_path: str, formats: List[str]) -> int:
+    tmp = f"{zip_path}.tmp"
+    with open(tmp, "wb") as f:
+        count = write_zip(iter_batch_kits(rows, out_dir), f, formats)
+    os.replace(tmp, zip_path)
+    return count
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Generate interview kits from a CSV/JSONL manifest.")
+    parser.add_argument("manifest")
+    parser.add_argument("--out", default="kits")
+    parser.add_argument("--api-key", action="append", dest="api_keys",
+                        help="Gemini API key; repeat to spread rows across keys (default: $GEMINI_API_KEY)")
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS)
+    parser.add_argument("--rpm", type=float, default=DEFAULT_RPM, help="requests per minute per key")
+    parser.add_argument("--no-cache", action="store_true")
+    parser.add_argument("--no-resume", action="store_true")
+    parser.add_argument("--compact", action="store_true", help="use compact prompts and JSON response mode")
+    parser.add_argument("--zip", dest="zip_path", help="also bundle every generated kit into this zip file")
+    parser.add_argument("--formats", default=",".join(EXPORT_FORMATS),
+                        help=f"comma-separated formats for --zip (from: {', '.join(EXPORT_FORMATS)})")
+    args = parser.parse_args(argv)
+
+    formats = [f.strip() for f in args.formats.split(",") if f.strip()]
+    unknown = [f for f in formats if f not in EXPORT_FORMATS]
+    if unknown or not formats:
+        parser.error(f"unknown export format(s): {', '.join(unknown) or '(none given)'}")
+
+    api_keys = args.api_keys or [k for k in os.environ.get("GEMINI_API_KEY", "").split(",") if k]
+    if not api_keys:
+        parser.error("no API key given (use --api-key or set GEMINI_API_KEY)")
+
+    rows = load_manifest(args.manifest)
+    try:
+        summary = run_batch(
+            rows, api_keys, args.out,
+            workers=args.workers, rpm=args.rpm,
+            cache=None if args.no_cache else KitCache(),
+            resume=not args.no_resume,
+            compact=args.compact,
+        )
+    except ProviderConfigError as e:
+        parser.error(str(e))
+    print(f"Done: {summary['ok']} ok, {summary['failed']} failed, {summary['invalid']} invalid "
+          f"in {summary['seconds']}s, {summary['usage']['total_tokens']:,} tokens")
+    if args.zip_path:
+        count = export_batch_zip(rows, args.out, args.zip_path, formats)
+        print(f"Exported {count} kits to {args.zip_path} ({', '.join(formats)})")
+    return 0 if summary["failed"] == 0 else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
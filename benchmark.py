@@ -0,0 +1,379 @@
+"""Offline performance benchmarks against a deterministic Gemini stand-in.
+
+Usage:
+    python benchmark.py [--out report.json] [--runs 50] [--sessions 1000]
+                        [--latency 0.05 --jitter 0.02 --truncation-rate 0.1 --error-rate 0.02]
+                        [--recordings responses.jsonl] [--only generate,extract_json]
+                        [--baseline old_report.json --tolerance 0.25]
+    python benchmark.py --record responses.jsonl --api-key KEY [--runs 3]
+
+Benchmarks never touch the network: model calls go through ``FakeGeminiPool``,
+which replays recorded responses (or synthesises valid kits) with the given
+latency, jitter, truncation and error rates. The report is JSON; with
+``--baseline`` every timing that got worse by more than ``--tolerance`` is
+listed and the exit status is 1.
+
+``--record`` runs the generate and regenerate workloads once against the
+real API instead and appends every response to a JSONL file for
+``--recordings`` to replay.
+"""
+import argparse
+import io
+import json
+import os
+import platform
+import random
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict
+from datetime import datetime, timezone
+from typing import Callable, Dict, List
+
+import numpy as np
+
+import kit_core as core
+import kit_render
+from fake_gemini import FakeBackend, FakeConfig, FakeGeminiPool, RecordingPool, load_recordings, synthesize
+from gemini_client import GeminiClientPool
+from json_extract import JSON_BACKEND, extract_json, extract_json_with_repairs
+from kit_core import EXAMPLE_ROLES, LEVELS, build_markdown_export, build_prompt, build_section_prompts
+from kit_export import EXPORT_FORMATS, export_bytes
+from kit_regen import regenerate_questions
+from kit_schema import repair_kit
+from kit_stream import KitStreamParser
+from parallel_kit import generate_sections, merge_sections
+from token_usage import UsageLedger
+
+BENCHMARKS = ("generate", "regenerate", "extract_json", "export", "render")
+FAKE_API_KEY = "offline-benchmark"
+DEFAULT_RUNS = 50
+DEFAULT_SESSIONS = 1000
+DEFAULT_WORKERS = 16
+MIN_SAMPLE_SECONDS = 0.2
+# Medians and throughputs only: means and tails are too noisy to gate on.
+LOWER_IS_BETTER = ("p50_ms",)
+HIGHER_IS_BETTER = ("ops_per_second", "mb_per_second", "sessions_per_second")
+
+
+# ─────────────────────────────────────────────
+# Helpers
+# ─────────────────────────────────────────────
+def summarize(seconds: List[float]) -> dict:
+    if not seconds:
+        return {"n": 0}
+    ms = np.asarray(seconds) * 1000.0
+    return {
+        "n": len(ms),
+        "mean_ms": round(float(ms.mean()), 4),
+        "p50_ms": round(float(np.percentile(ms, 50)), 4),
+        "p95_ms": round(float(np.percentile(ms, 95)), 4),
+        "max_ms": round(float(ms.max()), 4),
+    }
+
+
+def timed(fn: Callable[[], object]) -> float:
+    started = time.perf_counter()
+    fn()
+    return time.perf_counter() - started
+
+
+def throughput(fn: Callable[[], object], size_bytes: int = 0) -> dict:
+    """Call ``fn`` repeatedly for at least ``MIN_SAMPLE_SECONDS``."""
+    samples = []
+    started = time.perf_counter()
+    while not samples or time.perf_counter() - started < MIN_SAMPLE_SECONDS:
+        samples.append(timed(fn))
+    stats = summarize(samples)
+    elapsed = sum(samples)
+    stats["ops_per_second"] = round(len(samples) / elapsed, 1)
+    if size_bytes:
+        stats["mb_per_second"] = round(size_bytes * len(samples) / elapsed / 1e6, 2)
+    return stats
+
+
+def sample_kit(rng: random.Random, n_tech: int = 6, n_beh: int = 4) -> dict:
+    role, level = rng.choice(EXAMPLE_ROLES), rng.choice(LEVELS)
+    return synthesize(build_prompt(role, level, "", n_tech, n_beh), rng)
+
+
+# ─────────────────────────────────────────────
+# Benchmarks
+# ─────────────────────────────────────────────
+def bench_generate(pool, runs: int, workers: int, seed: int, api_key: str = FAKE_API_KEY) -> dict:
+    """End-to-end kit generation (request, parse, targeted repair) per mode."""
+    ledger = UsageLedger()
+
+    def fetch(prompt: str) -> dict:
+        return core.call_gemini_json(prompt, api_key, pool, None, None, ledger)
+
+    def stream(prompt: str) -> dict:
+        parser = KitStreamParser()
+        for chunk in core.stream_gemini(prompt, api_key, pool, None, None, ledger):
+            parser.feed(chunk)
+        return extract_json(parser.text)
+
+    def parallel(role, level, n_tech, n_beh) -> dict:
+        return merge_sections(role, level, generate_sections(
+            build_section_prompts(role, level, "", n_tech, n_beh), fetch,
+        ))
+
+    def one(mode: str, i: int) -> float:
+        rng = random.Random(f"{seed}:{mode}:{i}")
+        role, level = rng.choice(EXAMPLE_ROLES), rng.choice(LEVELS)
+        n_tech, n_beh = rng.randint(3, 10), rng.randint(2, 8)
+        prompt = build_prompt(role, level, "", n_tech, n_beh)
+
+        def run():
+            if mode == "parallel":
+                kit = parallel(role, level, n_tech, n_beh)
+            else:
+                kit = stream(prompt) if mode == "stream" else fetch(prompt)
+            repair_kit(kit, role, level, "", n_tech, n_beh, fetch)
+
+        return timed(run)
+
+    results = {}
+    for mode in ("single", "stream", "parallel"):
+        latencies, failures = [], 0
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = [executor.submit(one, mode, i) for i in range(runs)]
+            for fut in futures:
+                try:
+                    latencies.append(fut.result())
+                except Exception:
+                    failures += 1
+        results[mode] = dict(summarize(latencies), failures=failures)
+    results["usage"] = ledger.summary()
+    return results
+
+
+def bench_regenerate(pool, runs: int, seed: int, api_key: str = FAKE_API_KEY) -> dict:
+    def fetch(prompt: str) -> dict:
+        return core.call_gemini_json(prompt, api_key, pool)
+
+    rng = random.Random(seed)
+    results = {}
+    for q_type, indices in (("technical", [0]), ("technical", [0, 2, 4]), ("behavioral", [1])):
+        latencies, failures = [], 0
+        for _ in range(runs):
+            kit = sample_kit(rng)
+            try:
+                latencies.append(timed(lambda: regenerate_questions(kit, q_type, indices, fetch)))
+            except Exception:
+                failures += 1
+        results[f"{q_type}_x{len(indices)}"] = dict(summarize(latencies), failures=failures)
+    return results
+
+
+def _payloads(seed: int) -> Dict[str, str]:
+    rng = random.Random(seed)
+    large = json.dumps(sample_kit(rng, n_tech=200, n_beh=200), indent=2)
+    small = json.dumps(sample_kit(rng), indent=2)
+    return {
+        "clean_small": small,
+        "clean_large": large,
+        "fenced_prose_large": f"Here is your kit:\n```json\n{large}\n```\nLet me know if you need more.",
+        "trailing_commas_large": large.replace("\n    }", ",\n    }").replace("\n  ]", ",\n  ]"),
+        "single_quotes_small": small.replace('"', "'"),
+        "truncated_large": large[:int(len(large) * 0.9)],
+    }
+
+
+def bench_extract_json(seed: int) -> dict:
+    results = {"backend": JSON_BACKEND}
+    for name, payload in _payloads(seed).items():
+        try:
+            _, repairs = extract_json_with_repairs(payload)
+        except ValueError:
+            results[name] = {"error": "unparseable"}
+            continue
+        stats = throughput(lambda: extract_json(payload), len(payload.encode("utf-8")))
+        results[name] = dict(stats, bytes=len(payload), repairs=repairs)
+    return results
+
+
+def bench_export(seed: int) -> dict:
+    rng = random.Random(seed)
+    kits = {"standard": sample_kit(rng), "large": sample_kit(rng, n_tech=100, n_beh=100)}
+    results = {}
+    for size, kit in kits.items():
+        results[f"build_markdown_export_{size}"] = throughput(lambda: build_markdown_export(kit))
+        for fmt, spec in EXPORT_FORMATS.items():
+            results[f"{fmt}_{size}"] = throughput(lambda: spec.write(kit, io.BytesIO()))
+        export_bytes(kit, "pdf")
+        results[f"export_bytes_cached_{size}"] = throughput(lambda: export_bytes(kit, "pdf"))
+    return results
+
+
+def render_session(kit: dict) -> int:
+    """Everything the kit view renders for one session; returns the HTML size."""
+    size = 0
+    size += len(kit_render.stat_chip_html("ROLE", kit.get("role", "—"), "font-size:13px;margin-top:4px"))
+    size += len(kit_render.stat_chip_html("TECHNICAL Qs", len(kit.get("technical_questions", []))))
+    size += len(kit_render.stat_chip_html("BEHAVIORAL Qs", len(kit.get("behavioral_questions", []))))
+    for idx, q in enumerate(kit.get("technical_questions", [])):
+        size += len(kit_render.question_label(idx, q)) + len(kit_render.tech_card_html(idx, q))
+    for idx, q in enumerate(kit.get("behavioral_questions", [])):
+        size += len(kit_render.question_label(idx, q)) + len(kit_render.beh_card_html(idx, q))
+    for r in kit.get("evaluation_rubric", []):
+        size += len(kit_render.rubric_card_html(r))
+    for i, tip in enumerate(kit.get("interview_tips", [])):
+        size += len(kit_render.tip_card_html(i, tip))
+    size += len(kit_render.scoring_template(kit))
+    return size
+
+
+def bench_render(sessions: int, workers: int, seed: int) -> dict:
+    """Render the kit view for ``sessions`` concurrent sessions, cold and then warm."""
+    rng = random.Random(seed)
+    kits = [sample_kit(rng) for _ in range(sessions)]
+    kit_render.clear_caches()
+    results = {}
+    for phase in ("cold", "warm"):
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            latencies = list(executor.map(lambda k: timed(lambda: render_session(k)), kits))
+        wall = time.perf_counter() - started
+        results[phase] = dict(
+            summarize(latencies),
+            wall_seconds=round(wall, 4),
+            sessions_per_second=round(sessions / wall, 1),
+        )
+    return results
+
+
+# ─────────────────────────────────────────────
+# Recording
+# ─────────────────────────────────────────────
+def record_responses(pool, path: str, api_key: str, runs: int, seed: int = 0, log=print) -> dict:
+    """Run the model-backed benchmarks once through ``pool``, appending every response to ``path``."""
+    recording = RecordingPool(pool, path)
+    results = {}
+    for name, bench in (
+        ("generate", lambda: bench_generate(recording, runs, 1, seed, api_key)),
+        ("regenerate", lambda: bench_regenerate(recording, runs, seed, api_key)),
+    ):
+        log(f"recording {name}…")
+        results[name] = bench()
+    return results
+
+
+# ─────────────────────────────────────────────
+# Report
+# ─────────────────────────────────────────────
+def find_regressions(report: dict, baseline: dict, tolerance: float, path: str = "") -> List[str]:
+    found = []
+    for key, value in report.items():
+        old = baseline.get(key) if isinstance(baseline, dict) else None
+        where = f"{path}.{key}" if path else key
+        if isinstance(value, dict):
+            found += find_regressions(value, old or {}, tolerance, where)
+        elif isinstance(value, (int, float)) and isinstance(old, (int, float)) and old > 0:
+            if key in LOWER_IS_BETTER and value > old * (1 + tolerance):
+                found.append(f"{where}: {old} -> {value}")
+            elif key in HIGHER_IS_BETTER and value < old * (1 - tolerance):
+                found.append(f"{where}: {old} -> {value}")
+    return found
+
+
+def run_benchmarks(
+    config: FakeConfig,
+    only=BENCHMARKS,
+    runs: int = DEFAULT_RUNS,
+    sessions: int = DEFAULT_SESSIONS,
+    workers: int = DEFAULT_WORKERS,
+    recordings=None,
+    log=print,
+) -> dict:
+    backend = FakeBackend(config, recordings)
+    pool = FakeGeminiPool(backend)
+    results = {}
+    for name in only:
+        log(f"running {name}…")
+        started = time.perf_counter()
+        if name == "generate":
+            results[name] = bench_generate(pool, runs, workers, config.seed)
+        elif name == "regenerate":
+            results[name] = bench_regenerate(pool, runs, config.seed)
+        elif name == "extract_json":
+            results[name] = bench_extract_json(config.seed)
+        elif name == "export":
+            results[name] = bench_export(config.seed)
+        elif name == "render":
+            results[name] = bench_render(sessions, workers, config.seed)
+        log(f"  {name} done in {time.perf_counter() - started:.2f}s")
+    return {
+        "meta": {
+            "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "json_backend": JSON_BACKEND,
+        },
+        "config": dict(asdict(config), runs=runs, sessions=sessions, workers=workers,
+                       recordings=bool(recordings)),
+        "fake_backend": dict(backend.counters),
+        "results": results,
+    }
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Run offline performance benchmarks.")
+    parser.add_argument("--out", default="benchmark_report.json")
+    parser.add_argument("--only", default=",".join(BENCHMARKS),
+                        help=f"comma-separated subset of: {', '.join(BENCHMARKS)}")
+    parser.add_argument("--runs", type=int, default=DEFAULT_RUNS, help="generations per mode")
+    parser.add_argument("--sessions", type=int, default=DEFAULT_SESSIONS, help="simulated sessions to render")
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS)
+    parser.add_argument("--latency", type=float, default=0.0, help="simulated model latency in seconds")
+    parser.add_argument("--jitter", type=float, default=0.0)
+    parser.add_argument("--truncation-rate", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--recordings", help="JSONL of recorded responses to replay")
+    parser.add_argument("--record", metavar="PATH",
+                        help="call the real API and append its responses to PATH instead of benchmarking")
+    parser.add_argument("--api-key", default=os.environ.get("GEMINI_API_KEY"),
+                        help="key for --record (default: $GEMINI_API_KEY)")
+    parser.add_argument("--baseline", help="earlier report to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed slowdown vs the baseline")
+    args = parser.parse_args(argv)
+
+    only = [b.strip() for b in args.only.split(",") if b.strip()]
+    unknown = [b for b in only if b not in BENCHMARKS]
+    if unknown:
+        parser.error(f"unknown benchmark(s): {', '.join(unknown)}")
+
+    if args.record:
+        if not args.api_key:
+            parser.error("--record needs --api-key or $GEMINI_API_KEY")
+        record_responses(GeminiClientPool(), args.record, args.api_key, args.runs, args.seed)
+        print(f"Responses appended to {args.record}")
+        return 0
+
+    config = FakeConfig(
+        latency=args.latency, jitter=args.jitter, truncation_rate=args.truncation_rate,
+        error_rate=args.error_rate, seed=args.seed,
+    )
+    report = run_benchmarks(
+        config, only, args.runs, args.sessions, args.workers,
+        load_recordings(args.recordings) if args.recordings else None,
+    )
+
+    status = 0
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            regressions = find_regressions(report["results"], json.load(f).get("results", {}), args.tolerance)
+        report["regressions"] = regressions
+        for line in regressions:
+            print(f"REGRESSION {line}")
+        status = 1 if regressions else 0
+
+    with open(args.out, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"Report written to {args.out}")
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main())
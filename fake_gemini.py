@@ -0,0 +1,293 @@
+"""Deterministic stand-in for the Gemini backend, for offline benchmarks.
+
+``FakeGeminiPool`` has the same interface as ``GeminiClientPool``, so it can
+be passed anywhere the core expects a pool. Its models replay recorded
+responses (or synthesise valid kits) with configurable latency, jitter,
+truncation and error rates, all driven by a seeded RNG.
+"""
+import json
+import random
+import re
+import threading
+import time
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterator, List, Optional
+
+from rate_limit import estimate_tokens
+
+TOPICS = (
+    "caching", "concurrency", "observability", "schema design", "API versioning",
+    "incident response", "load testing", "data modelling", "deployment pipelines", "security reviews",
+)
+COMPETENCIES = ("Communication", "Ownership", "Collaboration", "Conflict Resolution", "Leadership", "Growth Mindset")
+DIFFICULTIES = ("Easy", "Medium", "Hard")
+RUBRIC = (("Technical Accuracy", "30%"), ("Depth of Understanding", "25%"),
+          ("Problem-Solving Approach", "25%"), ("Communication Clarity", "20%"))
+
+_ROLE = re.compile(r'"role": "([^"]+)"|role "([^"]+)"|- Role: (.+)|for: ([^,\n]+), (?:Junior|Mid-Level|Senior)')
+_LEVEL = re.compile(r'"level": "([^"]+)"|level "([^"]+)"|- Level: (.+)')
+_N_TECH = re.compile(r"technical_questions: (\d+) x|exactly (\d+) technical")
+_N_BEH = re.compile(r"behavioral_questions: (\d+) x|(\d+) behavioral questions")
+_REGEN = re.compile(r"^Regenerate (\d+) (technical|behavioral)")
+
+
+class FakeGeminiError(Exception):
+    def __init__(self, code: int, message: str):
+        super().__init__(f"{code} {message}")
+        self.code = code
+
+
+@dataclass
+class FakeConfig:
+    latency: float = 0.0
+    jitter: float = 0.0
+    truncation_rate: float = 0.0
+    error_rate: float = 0.0
+    error_code: int = 503
+    chunk_size: int = 200
+    seed: int = 0
+
+
+# ─────────────────────────────────────────────
+# Responses
+# ─────────────────────────────────────────────
+class _Usage:
+    def __init__(self, prompt_tokens: int, output_tokens: int):
+        self.prompt_token_count = prompt_tokens
+        self.candidates_token_count = output_tokens
+        self.total_token_count = prompt_tokens + output_tokens
+
+
+class FakeResponse:
+    def __init__(self, text: str, prompt_tokens: int, chunks: Optional[List[str]] = None,
+                 chunk_delay: float = 0.0, sleep: Callable[[float], None] = time.sleep):
+        self.text = text
+        self.usage_metadata = _Usage(prompt_tokens, estimate_tokens(text))
+        self._chunks = chunks or [text]
+        self._chunk_delay = chunk_delay
+        self._sleep = sleep
+
+    def __iter__(self) -> Iterator["FakeResponse"]:
+        for chunk in self._chunks:
+            if self._chunk_delay:
+                self._sleep(self._chunk_delay)
+            piece = FakeResponse.__new__(FakeResponse)
+            piece.text = chunk
+            yield piece
+
+
+def prompt_kind(prompt: str) -> str:
+    first = prompt.split("\n", 1)[0].lower()
+    if first.startswith("regenerate"):
+        return "regen"
+    if "rubric" in first:
+        return "rubric"
+    for kind in ("technical", "behavioral"):
+        if f"{kind} interview questions" in first:
+            return kind
+    return "kit"
+
+
+def _first(pattern: re.Pattern, text: str, default):
+    m = pattern.search(text)
+    if not m:
+        return default
+    return next(g for g in m.groups() if g is not None).strip()
+
+
+def _technical(rng: random.Random, role: str, n: int) -> List[dict]:
+    return [{
+        "id": i,
+        "question": f"How would you handle {rng.choice(TOPICS)} for a {role} team shipping feature #{rng.randrange(10_000)}?",
+        "rationale": f"Checks practical judgement about {rng.choice(TOPICS)}.",
+        "expected_topics": rng.sample(TOPICS, 3),
+        "difficulty": rng.choice(DIFFICULTIES),
+    } for i in range(1, n + 1)]
+
+
+def _behavioral(rng: random.Random, n: int) -> List[dict]:
+    return [{
+        "id": i,
+        "question": f"Tell me about a time you worked through {rng.choice(TOPICS)} under pressure (case {rng.randrange(10_000)}).",
+        "competency": rng.choice(COMPETENCIES),
+        "rationale": "Shows how the candidate behaves when stakes are high.",
+    } for i in range(1, n + 1)]
+
+
+def _rubric() -> dict:
+    return {
+        "evaluation_rubric": [
+            {"criterion": c, "weight": w, "strong": "Clear, correct and well-reasoned.",
+             "average": "Mostly correct with gaps.", "weak": "Vague or incorrect.",
+             "scoring_tip": "Probe for concrete examples."}
+            for c, w in RUBRIC
+        ],
+        "interview_tips": ["Let the candidate think aloud.", "Ask for trade-offs.", "Keep timing consistent."],
+    }
+
+
+def synthesize(prompt: str, rng: random.Random) -> dict:
+    """A schema-valid answer to ``prompt`` built from its role, level and counts."""
+    kind = prompt_kind(prompt)
+    role = _first(_ROLE, prompt, "Software Engineer")
+    if kind == "regen":
+        n, q_type = _REGEN.match(prompt).groups()
+        items = _technical(rng, role, int(n)) if q_type == "technical" else _behavioral(rng, int(n))
+        return {"questions": items}
+    if kind == "technical":
+        return {"technical_questions": _technical(rng, role, int(_first(_N_TECH, prompt, 6)))}
+    if kind == "behavioral":
+        return {"behavioral_questions": _behavioral(rng, int(_first(_N_BEH, prompt, 4)))}
+    if kind == "rubric":
+        return _rubric()
+    kit = {"role": role, "level": _first(_LEVEL, prompt, "Mid-Level")}
+    kit["technical_questions"] = _technical(rng, role, int(_first(_N_TECH, prompt, 6)))
+    kit["behavioral_questions"] = _behavioral(rng, int(_first(_N_BEH, prompt, 4)))
+    kit.update(_rubric())
+    return kit
+
+
+def load_recordings(path: str) -> Dict[str, List[str]]:
+    """Recorded responses from a JSONL file of ``{"kind": ..., "text": ...}`` lines."""
+    recordings: Dict[str, List[str]] = {}
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                entry = json.loads(line)
+                recordings.setdefault(entry["kind"], []).append(entry["text"])
+    return recordings
+
+
+# ─────────────────────────────────────────────
+# Backend
+# ─────────────────────────────────────────────
+class FakeBackend:
+    """Shared response source: one seeded RNG stream per call, in call order."""
+
+    def __init__(self, config: FakeConfig = None, recordings: Optional[Dict[str, List[str]]] = None,
+                 sleep: Callable[[float], None] = time.sleep):
+        self.config = config or FakeConfig()
+        self.recordings = recordings or {}
+        self.sleep = sleep
+        self._calls = 0
+        self._lock = threading.Lock()
+        self.counters = {"calls": 0, "errors": 0, "truncated": 0, "replayed": 0}
+
+    def _next_rng(self) -> random.Random:
+        with self._lock:
+            self._calls += 1
+            self.counters["calls"] += 1
+            return random.Random(f"{self.config.seed}:{self._calls}")
+
+    def _count(self, name: str) -> None:
+        with self._lock:
+            self.counters[name] += 1
+
+    def respond(self, prompt: str, stream: bool = False) -> FakeResponse:
+        cfg = self.config
+        rng = self._next_rng()
+        delay = max(0.0, cfg.latency + rng.uniform(-cfg.jitter, cfg.jitter))
+        if rng.random() < cfg.error_rate:
+            self._count("errors")
+            self.sleep(delay)
+            raise FakeGeminiError(cfg.error_code, "Service Unavailable (simulated)")
+
+        recorded = self.recordings.get(prompt_kind(prompt))
+        if recorded:
+            self._count("replayed")
+            text = rng.choice(recorded)
+        else:
+            text = json.dumps(synthesize(prompt, rng), indent=2)
+        if rng.random() < cfg.truncation_rate:
+            self._count("truncated")
+            text = text[:int(len(text) * rng.uniform(0.5, 0.95))]
+
+        prompt_tokens = estimate_tokens(prompt)
+        if not stream:
+            self.sleep(delay)
+            return FakeResponse(text, prompt_tokens)
+        size = max(1, cfg.chunk_size)
+        chunks = [text[i:i + size] for i in range(0, len(text), size)] or [""]
+        return FakeResponse(text, prompt_tokens, chunks, delay / len(chunks), self.sleep)
+
+
+class FakeModel:
+    def __init__(self, backend: FakeBackend, model_name: str, system_instruction: str):
+        self.backend = backend
+        self.model_name = model_name
+        self.system_instruction = system_instruction
+
+    def generate_content(self, prompt: str, stream: bool = False, generation_config=None) -> FakeResponse:
+        return self.backend.respond(prompt, stream)
+
+
+class FakeGeminiPool:
+    """Drop-in for ``GeminiClientPool`` that never touches the network."""
+
+    def __init__(self, backend: FakeBackend):
+        self.backend = backend
+
+    def model(self, api_key: str, model_name: str, system_instruction: str) -> FakeModel:
+        return FakeModel(self.backend, model_name, system_instruction)
+
+    def invalidate(self, api_key: str) -> None:
+        pass
+
+    def __len__(self) -> int:
+        return 1
+
+
+# ─────────────────────────────────────────────
+# Recording
+# ─────────────────────────────────────────────
+class _RecordedStream:
+    def __init__(self, response, on_done: Callable[[str], None]):
+        self._response = response
+        self._on_done = on_done
+
+    @property
+    def usage_metadata(self):
+        return self._response.usage_metadata
+
+    def __iter__(self):
+        parts = []
+        for chunk in self._response:
+            parts.append(chunk.text)
+            yield chunk
+        self._on_done("".join(parts))
+
+
+class _RecordingModel:
+    def __init__(self, model, sink: Callable[[str, str], None]):
+        self._model = model
+        self._sink = sink
+
+    def generate_content(self, prompt: str, stream: bool = False, generation_config=None):
+        response = self._model.generate_content(prompt, stream=stream, generation_config=generation_config)
+        kind = prompt_kind(prompt)
+        if stream:
+            return _RecordedStream(response, lambda text: self._sink(kind, text))
+        self._sink(kind, response.text)
+        return response
+
+
+class RecordingPool:
+    """Wraps a real pool and appends every response to a JSONL file for replay."""
+
+    def __init__(self, pool, path: str):
+        self._pool = pool
+        self._path = path
+        self._lock = threading.Lock()
+
+    def _write(self, kind: str, text: str) -> None:
+        with self._lock, open(self._path, "a", encoding="utf-8") as f:
+            f.write(json.dumps({"kind": kind, "text": text}, ensure_ascii=False) + "\n")
+
+    def model(self, api_key: str, model_name: str, system_instruction: str):
+        return _RecordingModel(self._pool.model(api_key, model_name, system_instruction), self._write)
+
+    def invalidate(self, api_key: str) -> None:
+        self._pool.invalidate(api_key)
+
+    def __len__(self) -> int:
+        return len(self._pool)
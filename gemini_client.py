@@ -0,0 +1,68 @@
+import hashlib
+import threading
+from collections import OrderedDict
+
+import google.generativeai as genai
+from google.ai import generativelanguage as glm
+
+MAX_POOLED_KEYS = 32
+
+
+def key_fingerprint(api_key: str) -> str:
+    return hashlib.sha256(api_key.encode("utf-8")).hexdigest()[:16]
+
+
+class GeminiClientPool:
+    """Process-wide registry of configured Gemini models.
+
+    Each API key gets its own transport client, so sessions using different
+    keys never touch the global ``genai.configure`` state.
+    """
+
+    def __init__(self, max_keys: int = MAX_POOLED_KEYS):
+        self.max_keys = max_keys
+        self._clients: "OrderedDict[str, glm.GenerativeServiceClient]" = OrderedDict()
+        self._models: dict = {}
+        self._lock = threading.Lock()
+
+    def model(self, api_key: str, model_name: str, system_instruction: str) -> genai.GenerativeModel:
+        fp = key_fingerprint(api_key)
+        slot = (fp, model_name, system_instruction)
+        model = self._models.get(slot)
+        if model is not None:
+            return model
+
+        with self._lock:
+            model = self._models.get(slot)
+            if model is not None:
+                return model
+            model = genai.GenerativeModel(model_name=model_name, system_instruction=system_instruction)
+            # GenerativeModel lazily falls back to the globally configured client
+            # when _client is unset; pinning it keeps the key per-model.
+            model._client = self._client_for(api_key, fp)
+            self._models[slot] = model
+            return model
+
+    def _client_for(self, api_key: str, fp: str) -> glm.GenerativeServiceClient:
+        client = self._clients.get(fp)
+        if client is None:
+            client = glm.GenerativeServiceClient(client_options={"api_key": api_key})
+            self._clients[fp] = client
+            while len(self._clients) > self.max_keys:
+                old_fp, _ = self._clients.popitem(last=False)
+                self._drop_models(old_fp)
+        self._clients.move_to_end(fp)
+        return client
+
+    def _drop_models(self, fp: str) -> None:
+        for slot in [s for s in self._models if s[0] == fp]:
+            del self._models[slot]
+
+    def invalidate(self, api_key: str) -> None:
+        fp = key_fingerprint(api_key)
+        with self._lock:
+            self._clients.pop(fp, None)
+            self._drop_models(fp)
+
+    def __len__(self) -> int:
+        return len(self._clients)
@@ -0,0 +1,164 @@
+import itertools
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional
+
+from telemetry import METRICS, inc
+
+DEFAULT_MAX_WORKERS = int(os.environ.get("KIT_MAX_WORKERS", "4"))
+DEFAULT_MAX_PENDING = int(os.environ.get("KIT_MAX_PENDING", "32"))
+DEFAULT_KEEP_FINISHED = 256
+
+QUEUED, RUNNING, DONE, FAILED = "queued", "running", "done", "failed"
+
+
+class QueueFull(Exception):
+    pass
+
+
+class Job:
+    """One unit of work; shared by every caller that submitted the same key."""
+
+    def __init__(self, job_id: str, key: str, kind: str):
+        self.id = job_id
+        self.key = key
+        self.kind = kind
+        self.status = QUEUED
+        self.result = None
+        self.error: Optional[BaseException] = None
+        self.created = time.monotonic()
+        self.started: Optional[float] = None
+        self.finished: Optional[float] = None
+        self.subscribers = 1
+        self._progress: List[str] = []
+        self._done = threading.Event()
+        self._callbacks: List[Callable[["Job"], None]] = []
+        self._callbacks_lock = threading.Lock()
+
+    @property
+    def done(self) -> bool:
+        return self._done.is_set()
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        return self._done.wait(timeout)
+
+    def add_done_callback(self, fn: Callable[["Job"], None]) -> None:
+        """Call ``fn(job)`` once the job finishes, immediately if it already has.
+
+        Runs on the worker thread, so async callers should hand off with
+        ``loop.call_soon_threadsafe``.
+        """
+        with self._callbacks_lock:
+            if not self.done:
+                self._callbacks.append(fn)
+                return
+        fn(self)
+
+    def _finish(self) -> None:
+        with self._callbacks_lock:
+            self._done.set()
+            callbacks, self._callbacks = self._callbacks, []
+        for fn in callbacks:
+            fn(self)
+
+    # ── Progress ────────────────────────────
+    def append_progress(self, chunk: str) -> None:
+        self._progress.append(chunk)
+
+    def progress_text(self) -> str:
+        return "".join(self._progress)
+
+    def elapsed(self) -> float:
+        return (self.finished or time.monotonic()) - self.created
+
+
+class JobQueue:
+    """Process-wide worker pool with single-flight coalescing.
+
+    Submitting a key that is already queued or running returns the existing
+    job instead of starting another, so identical requests from different
+    sessions share one model call. At most ``max_workers`` jobs run at once
+    and at most ``max_pending`` may be waiting or running; beyond that
+    ``submit`` raises ``QueueFull``. Finished jobs stay pollable by id until
+    ``keep_finished`` newer ones have completed.
+    """
+
+    def __init__(
+        self,
+        max_workers: int = DEFAULT_MAX_WORKERS,
+        max_pending: int = DEFAULT_MAX_PENDING,
+        keep_finished: int = DEFAULT_KEEP_FINISHED,
+    ):
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self.keep_finished = keep_finished
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="kit-job")
+        self._ids = itertools.count(1)
+        self._inflight: Dict[str, Job] = {}
+        self._jobs: Dict[str, Job] = {}
+        self._finished: "OrderedDict[str, None]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {"submitted": 0, "coalesced": 0, "rejected": 0, "done": 0, "failed": 0}
+
+    def submit(self, key: str, fn: Callable, *args, kind: str = "job", **kwargs) -> Job:
+        """Run ``fn(job, *args, **kwargs)`` on the pool, or join the in-flight job for ``key``."""
+        with self._lock:
+            job = self._inflight.get(key)
+            if job is not None:
+                job.subscribers += 1
+                self._stats["coalesced"] += 1
+                inc("jobs", kind=kind, outcome="coalesced")
+                return job
+            if len(self._inflight) >= self.max_pending:
+                self._stats["rejected"] += 1
+                inc("jobs", kind=kind, outcome="rejected")
+                raise QueueFull(
+                    f"{len(self._inflight)} generations are already queued. Try again in a minute."
+                )
+            job = Job(f"{kind}-{next(self._ids)}", key, kind)
+            self._inflight[key] = job
+            self._jobs[job.id] = job
+            self._stats["submitted"] += 1
+        inc("jobs", kind=kind, outcome="submitted")
+        self._executor.submit(self._run, job, fn, args, kwargs)
+        return job
+
+    def _run(self, job: Job, fn: Callable, args: tuple, kwargs: dict) -> None:
+        job.started = time.monotonic()
+        job.status = RUNNING
+        METRICS.observe("job_queue_wait", job.started - job.created, kind=job.kind)
+        try:
+            with METRICS.span("job", kind=job.kind):
+                job.result = fn(job, *args, **kwargs)
+            job.status = DONE
+        except Exception as e:
+            job.error = e
+        finally:
+            if job.status != DONE:
+                job.status = FAILED
+            job.finished = time.monotonic()
+            with self._lock:
+                self._inflight.pop(job.key, None)
+                self._stats[job.status] += 1
+                self._finished[job.id] = None
+                while len(self._finished) > self.keep_finished:
+                    old_id, _ = self._finished.popitem(last=False)
+                    self._jobs.pop(old_id, None)
+            job._finish()
+
+    def get(self, job_id: str) -> Optional[Job]:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def stats(self) -> dict:
+        with self._lock:
+            stats = dict(self._stats)
+            stats["running"] = sum(1 for j in self._inflight.values() if j.status == RUNNING)
+            stats["queued"] = sum(1 for j in self._inflight.values() if j.status == QUEUED)
+        return stats
+
+    def shutdown(self, wait: bool = True) -> None:
+        self._executor.shutdown(wait=wait)
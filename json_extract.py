@@ -0,0 +1,173 @@
+import json
+import re
+from typing import List, Tuple
+
+from telemetry import inc, timed
+
+try:
+    import orjson
+
+    def _loads(text: str):
+        return orjson.loads(text)
+
+    JSON_BACKEND = "orjson"
+except ImportError:  # pragma: no cover - depends on the environment
+    _loads = json.loads
+    JSON_BACKEND = "json"
+
+PARSE_ERROR = "Could not parse AI response as JSON. Please retry."
+
+_STRUCTURAL = re.compile(r"""[{}\[\]"',]|\b(?:True|False|None)\b""")
+_DQ_BODY = re.compile(r'[^"\\\x00-\x1f]*')
+_SQ_BODY = re.compile(r"[^'\\\x00-\x1f]*")
+_DANGLING_KEY = re.compile(r'[{,]\s*"(?:[^"\\]|\\.)*"$')
+_LITERALS = {"True": "true", "False": "false", "None": "null"}
+_CONTROL_ESCAPES = {"\n": "\\n", "\r": "\\r", "\t": "\\t"}
+
+
+def _escape_control(c: str) -> str:
+    return _CONTROL_ESCAPES.get(c, f"\\u{ord(c):04x}")
+
+
+def _scan(raw: str, start: int) -> Tuple[str, List[str]]:
+    """Walk ``raw`` once from ``start`` to the end of the outermost object.
+
+    Returns the (possibly repaired) object text and the repairs applied.
+    Unchanged runs are copied as slices, so a clean response costs one scan.
+    """
+    n = len(raw)
+    out: List[str] = []
+    repairs: List[str] = []
+    stack: List[str] = []
+    copy_from = start
+    pending_comma = -1
+    open_string = False
+    i = start
+
+    def splice(at: int, resume: int, text: str, repair: str):
+        nonlocal copy_from
+        out.append(raw[copy_from:at])
+        out.append(text)
+        copy_from = resume
+        if repair not in repairs:
+            repairs.append(repair)
+
+    while i < n:
+        m = _STRUCTURAL.search(raw, i)
+        if m is None:
+            break
+        tok, j = m.group(), m.start()
+        i = m.end()
+
+        if tok in "{[":
+            stack.append("}" if tok == "{" else "]")
+        elif tok in "}]":
+            if pending_comma >= 0 and not raw[pending_comma + 1:j].strip():
+                splice(pending_comma, pending_comma + 1, "", "trailing_comma")
+            pending_comma = -1
+            if stack[-1] != tok:
+                if tok not in stack:
+                    splice(j, j + 1, "", "stray_closer")
+                    continue
+                missing = []
+                while stack[-1] != tok:
+                    missing.append(stack.pop())
+                splice(j, j, "".join(missing), "unbalanced")
+            stack.pop()
+            if not stack:
+                out.append(raw[copy_from:j + 1])
+                return "".join(out), repairs
+        elif tok == ",":
+            pending_comma = j
+        elif tok == '"':
+            k = i
+            while True:
+                k = _DQ_BODY.match(raw, k).end()
+                if k >= n:
+                    open_string = True
+                    break
+                c = raw[k]
+                if c == '"':
+                    k += 1
+                    break
+                if c == "\\":
+                    k += 2
+                    continue
+                splice(k, k + 1, _escape_control(c), "control_char")
+                k += 1
+            i = k
+        elif tok == "'":
+            k, body, closed = i, [], False
+            while True:
+                e = _SQ_BODY.match(raw, k).end()
+                body.append(raw[k:e].replace('"', '\\"'))
+                k = e
+                if k >= n:
+                    break
+                c = raw[k]
+                if c == "'":
+                    k += 1
+                    closed = True
+                    break
+                if c == "\\":
+                    nxt = raw[k + 1:k + 2]
+                    body.append("'" if nxt == "'" else raw[k:k + 2])
+                    k += 2
+                    continue
+                body.append(_escape_control(c))
+                k += 1
+            open_string = not closed
+            splice(j, k, '"' + "".join(body) + ('"' if closed else ""), "single_quotes")
+            i = k
+        else:
+            splice(j, i, _LITERALS[tok], "python_literal")
+
+    # Ran out of input with objects still open: close them.
+    text = "".join(out) + raw[copy_from:n]
+    if open_string:
+        if (len(text) - len(text.rstrip("\\"))) % 2:
+            text = text[:-1]
+        text += '"'
+    text = text.rstrip().rstrip(",").rstrip()
+    if text.endswith(":"):
+        text += " null"
+    elif stack and stack[-1] == "}" and _DANGLING_KEY.search(text):
+        text += ": null"
+    repairs.append("truncated")
+    return text + "".join(reversed(stack)), repairs
+
+
+@timed("extract_json")
+def extract_json_with_repairs(raw: str) -> Tuple[dict, List[str]]:
+    start = raw.find("{")
+    if start < 0:
+        raise ValueError(PARSE_ERROR)
+
+    # Fast path: a well-formed object, possibly wrapped in fences or prose,
+    # parses straight from its outer braces without the Python-level scan.
+    end = raw.rfind("}")
+    if end > start:
+        try:
+            obj = _loads(raw[start:end + 1])
+        except ValueError:
+            pass
+        else:
+            if isinstance(obj, dict):
+                inc("json_parses", path="fast")
+                return obj, []
+
+    text, repairs = _scan(raw, start)
+    try:
+        obj = _loads(text)
+    except ValueError:
+        raise ValueError(PARSE_ERROR) from None
+    if not isinstance(obj, dict):
+        raise ValueError(PARSE_ERROR)
+    inc("json_parses", path="repaired")
+    for repair in repairs:
+        inc("json_repairs", repair=repair)
+    return obj, repairs
+
+
+def extract_json(raw: str) -> dict:
+    return extract_json_with_repairs(raw)[0]
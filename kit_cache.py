@@ -0,0 +1,157 @@
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional
+
+DEFAULT_CACHE_PATH = os.environ.get("KIT_CACHE_PATH", os.path.join(".cache", "kit_cache.sqlite3"))
+DEFAULT_TTL_SECONDS = 7 * 24 * 3600
+DEFAULT_MEMORY_ENTRIES = 128
+DEFAULT_DISK_BYTES = 64 * 1024 * 1024
+
+
+def make_cache_key(prompt: str, model_name: str, system_instruction: str) -> str:
+    h = hashlib.sha256()
+    for part in (model_name, system_instruction, prompt):
+        h.update(part.encode("utf-8"))
+        h.update(b"\x00")
+    return h.hexdigest()
+
+
+class KitCache:
+    """Two-tier (in-process LRU + SQLite) cache for raw model responses.
+
+    Entries expire after ``ttl_seconds``; the disk tier is trimmed
+    oldest-access-first once it grows past ``max_disk_bytes``.
+    """
+
+    def __init__(
+        self,
+        path: str = DEFAULT_CACHE_PATH,
+        memory_entries: int = DEFAULT_MEMORY_ENTRIES,
+        ttl_seconds: float = DEFAULT_TTL_SECONDS,
+        max_disk_bytes: int = DEFAULT_DISK_BYTES,
+    ):
+        self.path = path
+        self.memory_entries = memory_entries
+        self.ttl_seconds = ttl_seconds
+        self.max_disk_bytes = max_disk_bytes
+        self._memory: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._counters = {
+            "memory_hits": 0, "disk_hits": 0, "misses": 0,
+            "writes": 0, "expired": 0, "evicted": 0,
+        }
+
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("""
+            CREATE TABLE IF NOT EXISTS entries (
+                key      TEXT PRIMARY KEY,
+                value    TEXT NOT NULL,
+                size     INTEGER NOT NULL,
+                created  REAL NOT NULL,
+                accessed REAL NOT NULL
+            )""")
+        self._db.execute("CREATE INDEX IF NOT EXISTS entries_accessed ON entries(accessed)")
+
+    # ── Lookup ──────────────────────────────
+    def get(self, key: str) -> Optional[str]:
+        now = time.time()
+        with self._lock:
+            hit = self._memory.get(key)
+            if hit is not None:
+                value, created = hit
+                if now - created <= self.ttl_seconds:
+                    self._memory.move_to_end(key)
+                    self._counters["memory_hits"] += 1
+                    return value
+                del self._memory[key]
+
+            row = self._db.execute(
+                "SELECT value, created FROM entries WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                self._counters["misses"] += 1
+                return None
+            value, created = row
+            if now - created > self.ttl_seconds:
+                self._db.execute("DELETE FROM entries WHERE key = ?", (key,))
+                self._counters["expired"] += 1
+                self._counters["misses"] += 1
+                return None
+
+            self._db.execute("UPDATE entries SET accessed = ? WHERE key = ?", (now, key))
+            self._remember(key, value, created)
+            self._counters["disk_hits"] += 1
+            return value
+
+    def put(self, key: str, value: str) -> None:
+        now = time.time()
+        size = len(value.encode("utf-8"))
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO entries (key, value, size, created, accessed) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (key, value, size, now, now),
+            )
+            self._remember(key, value, now)
+            self._counters["writes"] += 1
+            self._evict(now)
+
+    def discard(self, key: str) -> None:
+        with self._lock:
+            self._memory.pop(key, None)
+            self._db.execute("DELETE FROM entries WHERE key = ?", (key,))
+
+    def clear(self) -> None:
+        with self._lock:
+            self._memory.clear()
+            self._db.execute("DELETE FROM entries")
+
+    # ── Maintenance ─────────────────────────
+    def _remember(self, key: str, value: str, created: float) -> None:
+        self._memory[key] = (value, created)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_entries:
+            self._memory.popitem(last=False)
+
+    def _evict(self, now: float) -> None:
+        cur = self._db.execute("DELETE FROM entries WHERE created < ?", (now - self.ttl_seconds,))
+        self._counters["expired"] += max(cur.rowcount, 0)
+
+        total = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+        if total <= self.max_disk_bytes:
+            return
+        rows = self._db.execute("SELECT key, size FROM entries ORDER BY accessed ASC").fetchall()
+        doomed = []
+        for key, size in rows:
+            if total <= self.max_disk_bytes:
+                break
+            doomed.append((key,))
+            total -= size
+        self._db.executemany("DELETE FROM entries WHERE key = ?", doomed)
+        for (key,) in doomed:
+            self._memory.pop(key, None)
+        self._counters["evicted"] += len(doomed)
+
+    def stats(self) -> dict:
+        with self._lock:
+            count, size = self._db.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries"
+            ).fetchone()
+            stats = dict(self._counters)
+        hits = stats["memory_hits"] + stats["disk_hits"]
+        lookups = hits + stats["misses"]
+        stats.update(
+            hits=hits,
+            hit_rate=(hits / lookups) if lookups else 0.0,
+            memory_entries=len(self._memory),
+            disk_entries=count,
+            disk_bytes=size,
+        )
+        return stats
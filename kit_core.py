@@ -0,0 +1,461 @@
+import hashlib
+import json
+import os
+import time
+from datetime import datetime
+from typing import Iterator, List, Optional, Tuple
+
+from gemini_client import GeminiClientPool
+from json_extract import extract_json
+from kit_cache import KitCache, make_cache_key
+from rate_limit import RateLimiter, call_with_retry, estimate_tokens
+from telemetry import METRICS, inc, span, timed
+from token_usage import CallUsage, UsageLedger, usage_from_response
+
+# ─────────────────────────────────────────────
+# Constants
+# ─────────────────────────────────────────────
+EXAMPLE_ROLES = [
+    "Backend Engineer", "Frontend Engineer", "Full Stack Engineer",
+    "Data Scientist", "ML Engineer", "DevOps Engineer",
+    "Product Manager", "SEO Specialist", "Mobile Developer (iOS/Android)",
+    "Security Engineer", "QA Engineer", "Cloud Architect",
+]
+
+LEVELS = ["Junior", "Mid-Level", "Senior"]
+DEFAULT_N_TECH = 6
+DEFAULT_N_BEH = 4
+N_TECH_RANGE = (3, 10)
+N_BEH_RANGE = (2, 8)
+
+MODEL_NAME = os.environ.get("GEMINI_MODEL", "gemini-2.0-flash")
+SYSTEM_INSTRUCTION = (
+    "You are an expert technical recruiter and engineering interview specialist. "
+    "Generate highly structured, role-specific interview content. "
+    "Always respond with valid, parseable JSON only — no prose, no markdown fences, no preamble. "
+    "Every question must be directly relevant to the specified role and experience level."
+)
+
+# Compact mode: a one-line system instruction, key-list skeletons and
+# Gemini's JSON response mode instead of a pasted example document.
+COMPACT_SYSTEM_INSTRUCTION = (
+    "Expert technical recruiter. Write role- and level-specific interview content as JSON only."
+)
+COMPACT_GENERATION_CONFIG = {"response_mime_type": "application/json"}
+
+# Rough output size of a full kit, reserved against the tokens/min budget
+# until the response's usage metadata settles the real count.
+EXPECTED_OUTPUT_TOKENS = 2000
+
+# ─────────────────────────────────────────────
+# Helpers
+# ─────────────────────────────────────────────
+def validate_inputs(role: str, level: str) -> tuple:
+    if not role.strip():
+        return False, "Please enter a job role."
+    if len(role.strip()) < 3:
+        return False, "Job role must be at least 3 characters."
+    if level not in LEVELS:
+        return False, "Please select a valid experience level."
+    return True, ""
+
+def normalize_role(role: str) -> str:
+    return role.strip().title()
+
+LEVEL_GUIDANCE = {
+    "Junior":    "Focus on fundamentals, core concepts, basic debugging, and simple problem solving.",
+    "Mid-Level": "Focus on applied knowledge, trade-offs, debugging real scenarios, and collaboration.",
+    "Senior":    "Focus on system design, architecture decisions, scalability, mentorship, and strategic thinking.",
+}
+
+TECH_ITEM_SKELETON = """    {
+      "id": 1,
+      "question": "...",
+      "rationale": "Why this question matters for the role and level",
+      "expected_topics": ["topic1", "topic2"],
+      "difficulty": "Easy"
+    }"""
+
+BEH_ITEM_SKELETON = """    {
+      "id": 1,
+      "question": "...",
+      "competency": "Communication",
+      "rationale": "Why this competency matters at this level"
+    }"""
+
+RUBRIC_SKELETON = """[
+    {
+      "criterion": "Technical Accuracy",
+      "weight": "30%",
+      "strong": "What a strong answer looks like",
+      "average": "What an average answer looks like",
+      "weak": "What a weak answer looks like",
+      "scoring_tip": "Quick tip for the interviewer"
+    },
+    {
+      "criterion": "Depth of Understanding",
+      "weight": "25%",
+      "strong": "...", "average": "...", "weak": "...", "scoring_tip": "..."
+    },
+    {
+      "criterion": "Problem-Solving Approach",
+      "weight": "25%",
+      "strong": "...", "average": "...", "weak": "...", "scoring_tip": "..."
+    },
+    {
+      "criterion": "Communication Clarity",
+      "weight": "20%",
+      "strong": "...", "average": "...", "weak": "...", "scoring_tip": "..."
+    }
+  ]"""
+
+def kit_brief(role: str, level: str, focus: str) -> str:
+    focus_clause = f" with special focus on: {focus}." if focus.strip() else "."
+    return f"""- Role: {role}
+- Experience Level: {level}
+- Special Focus: {focus if focus.strip() else "None"}{focus_clause}
+- Calibration: {LEVEL_GUIDANCE[level]}"""
+
+@timed("build_prompt", mode="standard")
+def build_prompt(role: str, level: str, focus: str, n_tech: int, n_beh: int) -> str:
+    return f"""Generate a complete interview kit for:
+{kit_brief(role, level, focus)}
+
+Return ONLY this exact JSON structure (no extra text, no markdown, no backticks):
+
+{{
+  "role": "{role}",
+  "level": "{level}",
+  "technical_questions": [
+{TECH_ITEM_SKELETON}
+  ],
+  "behavioral_questions": [
+{BEH_ITEM_SKELETON}
+  ],
+  "evaluation_rubric": {RUBRIC_SKELETON},
+  "interview_tips": [
+    "Tip 1", "Tip 2", "Tip 3"
+  ]
+}}
+
+Generate exactly {n_tech} technical questions and {n_beh} behavioral questions."""
+
+def exclusion_clause(questions) -> str:
+    if not questions:
+        return ""
+    listed = "\n".join(f"- {q}" for q in questions)
+    return f"\n\nEvery question must be different from these existing questions:\n{listed}"
+
+def build_section_prompts(
+    role: str, level: str, focus: str, n_tech: int, n_beh: int, exclude: Optional[dict] = None,
+) -> dict:
+    exclude = exclude or {}
+    header = f"""for:
+{kit_brief(role, level, focus)}
+
+Return ONLY this exact JSON structure (no extra text, no markdown, no backticks):
+"""
+    return {
+        "technical": f"""Generate {n_tech} technical interview questions {header}
+{{
+  "technical_questions": [
+{TECH_ITEM_SKELETON}
+  ]
+}}
+
+Generate exactly {n_tech} technical questions.{exclusion_clause(exclude.get("technical"))}""",
+        "behavioral": f"""Generate {n_beh} behavioral interview questions {header}
+{{
+  "behavioral_questions": [
+{BEH_ITEM_SKELETON}
+  ]
+}}
+
+Generate exactly {n_beh} behavioral questions.{exclusion_clause(exclude.get("behavioral"))}""",
+        "rubric": f"""Generate an evaluation rubric and interviewer tips {header}
+{{
+  "evaluation_rubric": {RUBRIC_SKELETON},
+  "interview_tips": [
+    "Tip 1", "Tip 2", "Tip 3"
+  ]
+}}""",
+    }
+
+TECH_ITEM_KEYS = '{id, question, rationale, expected_topics: [str], difficulty: "Easy"|"Medium"|"Hard"}'
+BEH_ITEM_KEYS = "{id, question, competency, rationale}"
+RUBRIC_KEYS = (
+    'evaluation_rubric: 4 x {criterion, weight: "NN%" (summing to 100%), strong, average, weak, scoring_tip}, '
+    "interview_tips: 3+ strings"
+)
+
+def compact_brief(role: str, level: str, focus: str) -> str:
+    focus_clause = f" Focus: {focus.strip()}." if focus.strip() else ""
+    return f"{role}, {level}.{focus_clause} {LEVEL_GUIDANCE[level]}"
+
+@timed("build_prompt", mode="compact")
+def build_compact_prompt(role: str, level: str, focus: str, n_tech: int, n_beh: int) -> str:
+    """Same kit schema as ``build_prompt`` in roughly a fifth of the tokens."""
+    return f"""Interview kit for: {compact_brief(role, level, focus)}
+JSON object: role "{role}", level "{level}", technical_questions: {n_tech} x {TECH_ITEM_KEYS}, \
+behavioral_questions: {n_beh} x {BEH_ITEM_KEYS}, {RUBRIC_KEYS}."""
+
+def build_compact_section_prompts(
+    role: str, level: str, focus: str, n_tech: int, n_beh: int, exclude: Optional[dict] = None,
+) -> dict:
+    exclude = exclude or {}
+    brief = compact_brief(role, level, focus)
+    return {
+        "technical": f"""Technical interview questions for: {brief}
+JSON object: technical_questions: {n_tech} x {TECH_ITEM_KEYS}.{exclusion_clause(exclude.get("technical"))}""",
+        "behavioral": f"""Behavioral interview questions for: {brief}
+JSON object: behavioral_questions: {n_beh} x {BEH_ITEM_KEYS}.{exclusion_clause(exclude.get("behavioral"))}""",
+        "rubric": f"""Evaluation rubric and interviewer tips for: {brief}
+JSON object: {RUBRIC_KEYS}.""",
+    }
+
+REGEN_SKELETONS = {
+    "technical": '{"id": 1, "question": "...", "rationale": "...", "expected_topics": ["..."], "difficulty": "Easy|Medium|Hard"}',
+    "behavioral": '{"id": 1, "question": "...", "competency": "...", "rationale": "..."}',
+}
+
+def build_regen_prompt(role, level, q_type, old_questions, focus, exclude=()):
+    if isinstance(old_questions, str):
+        old_questions = [old_questions]
+    n = len(old_questions)
+    listed = "\n".join(f"{i}. {q}" for i, q in enumerate(old_questions, 1))
+    return f"""Regenerate {n} {q_type} interview question{"s" if n > 1 else ""} for:
+- Role: {role}
+- Level: {level}
+- Focus: {focus if focus else "None"}
+
+Questions to replace (each replacement must be different):
+{listed}{exclusion_clause(exclude)}
+
+Return ONLY a single JSON object, no extra text:
+{{"questions": [{REGEN_SKELETONS[q_type]}]}}
+
+Return exactly {n} question{"s" if n > 1 else ""}, in the same order as the questions they replace."""
+
+def iter_markdown_export(kit: dict) -> Iterator[str]:
+    """Lines of the Markdown export, produced one at a time."""
+    ts = datetime.now().strftime("%B %d, %Y at %H:%M")
+    yield f"# Interview Kit: {kit['role']} ({kit['level']})"
+    yield f"*Generated on {ts}*\n"
+    yield "---\n"
+    yield "## 🔧 Technical Questions\n"
+    for i, q in enumerate(kit.get("technical_questions", []), 1):
+        yield f"### Q{i}. {q['question']}"
+        yield f"- **Difficulty:** {q.get('difficulty','—')}"
+        yield f"- **Rationale:** {q.get('rationale','—')}"
+        yield f"- **Expected Topics:** {', '.join(q.get('expected_topics', []))}\n"
+    yield "---\n"
+    yield "## 💬 Behavioral Questions\n"
+    for i, q in enumerate(kit.get("behavioral_questions", []), 1):
+        yield f"### Q{i}. {q['question']}"
+        yield f"- **Competency:** {q.get('competency','—')}"
+        yield f"- **Rationale:** {q.get('rationale','—')}\n"
+    yield "---\n"
+    yield "## 📊 Evaluation Rubric\n"
+    for r in kit.get("evaluation_rubric", []):
+        yield f"### {r['criterion']} (Weight: {r.get('weight','—')})"
+        yield f"- ✅ **Strong:** {r['strong']}"
+        yield f"- 🟡 **Average:** {r['average']}"
+        yield f"- ❌ **Weak:** {r['weak']}"
+        yield f"- 💡 **Tip:** {r.get('scoring_tip','—')}\n"
+    if kit.get("interview_tips"):
+        yield "---\n"
+        yield "## 💡 Interviewer Tips\n"
+        for tip in kit["interview_tips"]:
+            yield f"- {tip}"
+
+@timed("build_markdown_export")
+def build_markdown_export(kit: dict) -> str:
+    return "\n".join(iter_markdown_export(kit))
+
+def build_scoring_template(kit: dict) -> str:
+    score_md = f"## Candidate Evaluation — {kit.get('role','')} ({kit.get('level','')})\n\n"
+    score_md += "| Criterion | Weight | Score (1–5) | Notes |\n|---|---|---|---|\n"
+    for r in kit.get("evaluation_rubric", []):
+        score_md += f"| {r['criterion']} | {r.get('weight','—')} | _ | |\n"
+    score_md += "\n**Recommendation:** ☐ Strong Hire  ☐ Hire  ☐ No Hire  ☐ Strong No Hire\n"
+    return score_md
+
+def kit_fingerprint(kit: dict) -> str:
+    """Content hash of a kit, stable across key order."""
+    blob = json.dumps(kit, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha1(blob.encode("utf-8")).hexdigest()
+
+# ─────────────────────────────────────────────
+# Gemini Calls
+# ─────────────────────────────────────────────
+def system_instruction(compact: bool = False) -> str:
+    return COMPACT_SYSTEM_INSTRUCTION if compact else SYSTEM_INSTRUCTION
+
+def prompt_mode(compact: bool = False) -> str:
+    return "compact" if compact else "standard"
+
+def kit_cache_key(prompt: str, compact: bool = False, scope: str = MODEL_NAME) -> str:
+    """Cache key for ``prompt`` answered by the model ``scope`` names."""
+    return make_cache_key(prompt, scope, system_instruction(compact))
+
+def cache_scopes(pool) -> List[str]:
+    """Models whose cached answers may serve a request on ``pool``, preferred first.
+
+    A ``ProviderRouter`` lists its persistent providers; a plain Gemini
+    pool only ever answers with ``MODEL_NAME``.
+    """
+    scopes = getattr(pool, "cache_scopes", None)
+    return scopes(MODEL_NAME) if scopes is not None else [MODEL_NAME]
+
+def _response_key(response, prompt: str, compact: bool) -> Optional[str]:
+    """Where to cache ``response``, or None when its provider must not be stored."""
+    if not getattr(response, "persistent", True):
+        return None
+    return kit_cache_key(prompt, compact, getattr(response, "cache_scope", MODEL_NAME))
+
+def lookup_cached(cache: KitCache, pool, prompt: str, compact: bool = False) -> Tuple[Optional[str], Optional[str]]:
+    """``(key, text)`` of the first cached answer to ``prompt``, or ``(None, None)``."""
+    for scope in cache_scopes(pool):
+        key = kit_cache_key(prompt, compact, scope)
+        text = cache.get(key)
+        if text is not None:
+            return key, text
+    return None, None
+
+def discard_cached(cache: KitCache, pool, prompt: str, compact: bool = False) -> None:
+    for scope in cache_scopes(pool):
+        cache.discard(kit_cache_key(prompt, compact, scope))
+
+def _request(
+    prompt: str,
+    api_key: str,
+    pool: GeminiClientPool,
+    limiter: Optional[RateLimiter],
+    stream: bool = False,
+    compact: bool = False,
+):
+    instruction = system_instruction(compact)
+    model = pool.model(api_key, MODEL_NAME, instruction)
+    estimate = estimate_tokens(instruction + prompt) + EXPECTED_OUTPUT_TOKENS
+    config = COMPACT_GENERATION_CONFIG if compact else None
+
+    def attempt():
+        if limiter is not None:
+            limiter.acquire(api_key, estimate)
+        inc("gemini_requests", mode=prompt_mode(compact), streamed=stream)
+        try:
+            return model.generate_content(prompt, stream=stream, generation_config=config)
+        except Exception as e:
+            inc("gemini_failures", error=type(e).__name__)
+            raise
+
+    try:
+        response = call_with_retry(attempt)
+    except Exception as e:
+        if "API_KEY_INVALID" in str(e):
+            pool.invalidate(api_key)
+        raise
+    return response, estimate
+
+def _settle_usage(
+    api_key: str,
+    estimate: int,
+    limiter: Optional[RateLimiter],
+    ledger: Optional[UsageLedger],
+    usage: CallUsage,
+) -> None:
+    if limiter is not None and usage.total_tokens:
+        limiter.settle(api_key, usage.total_tokens - estimate)
+    inc("gemini_tokens", usage.prompt_tokens, kind="prompt")
+    inc("gemini_tokens", usage.output_tokens, kind="output")
+    if ledger is not None:
+        ledger.record(usage)
+
+def _record_cached(ledger: Optional[UsageLedger], started: float, **flags) -> None:
+    inc("kit_cache_lookups", result="hit")
+    if ledger is not None:
+        ledger.record(CallUsage(0, 0, 0, time.monotonic() - started, cached=True, **flags))
+
+def call_gemini(
+    prompt: str,
+    api_key: str,
+    pool: GeminiClientPool,
+    cache: Optional[KitCache] = None,
+    limiter: Optional[RateLimiter] = None,
+    ledger: Optional[UsageLedger] = None,
+    compact: bool = False,
+) -> str:
+    with span("call_gemini", mode=prompt_mode(compact)):
+        started = time.monotonic()
+        if cache is not None:
+            _, cached = lookup_cached(cache, pool, prompt, compact)
+            if cached is not None:
+                _record_cached(ledger, started, compact=compact)
+                return cached
+            inc("kit_cache_lookups", result="miss")
+
+        response, estimate = _request(prompt, api_key, pool, limiter, compact=compact)
+        usage = usage_from_response(response, time.monotonic() - started, compact=compact)
+        _settle_usage(api_key, estimate, limiter, ledger, usage)
+
+        key = _response_key(response, prompt, compact) if cache is not None else None
+        if key is not None:
+            cache.put(key, response.text)
+        return response.text
+
+def stream_gemini(
+    prompt: str,
+    api_key: str,
+    pool: GeminiClientPool,
+    cache: Optional[KitCache] = None,
+    limiter: Optional[RateLimiter] = None,
+    ledger: Optional[UsageLedger] = None,
+    compact: bool = False,
+) -> Iterator[str]:
+    with span("stream_gemini", mode=prompt_mode(compact)):
+        started = time.monotonic()
+        if cache is not None:
+            _, cached = lookup_cached(cache, pool, prompt, compact)
+            if cached is not None:
+                _record_cached(ledger, started, compact=compact, streamed=True)
+                yield cached
+                return
+            inc("kit_cache_lookups", result="miss")
+
+        # Only the opening request is retried; once chunks have been yielded a
+        # failure has to surface to the caller.
+        response, estimate = _request(prompt, api_key, pool, limiter, stream=True, compact=compact)
+        parts, first_chunk = [], None
+        for chunk in response:
+            if first_chunk is None:
+                first_chunk = time.monotonic() - started
+                METRICS.observe("stream_first_chunk", first_chunk, mode=prompt_mode(compact))
+            parts.append(chunk.text)
+            yield chunk.text
+        usage = usage_from_response(
+            response, time.monotonic() - started,
+            compact=compact, streamed=True, first_chunk_seconds=first_chunk,
+        )
+        _settle_usage(api_key, estimate, limiter, ledger, usage)
+
+        key = _response_key(response, prompt, compact) if cache is not None else None
+        if key is not None:
+            cache.put(key, "".join(parts))
+
+def call_gemini_json(
+    prompt: str,
+    api_key: str,
+    pool: GeminiClientPool,
+    cache: Optional[KitCache] = None,
+    limiter: Optional[RateLimiter] = None,
+    ledger: Optional[UsageLedger] = None,
+    compact: bool = False,
+) -> dict:
+    raw = call_gemini(prompt, api_key, pool, cache, limiter, ledger, compact)
+    try:
+        return extract_json(raw)
+    except ValueError:
+        # Never keep serving a response we could not parse.
+        if cache is not None:
+            discard_cached(cache, pool, prompt, compact)
+        raise
@@ -0,0 +1,311 @@
+import csv
+import io
+import json
+import re
+import textwrap
+import threading
+import zipfile
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime
+from typing import BinaryIO, Callable, Iterable, Iterator, Optional, Sequence, Tuple
+from xml.sax.saxutils import escape
+
+from kit_core import iter_markdown_export, kit_fingerprint
+from kit_schema import parse_weight
+
+EXPORT_CACHE_SIZE = 32
+CSV_COLUMNS = ["Role", "Level", "Criterion", "Weight (%)", "Score (1-5)", "Notes"]
+
+
+# ─────────────────────────────────────────────
+# Document outline
+# ─────────────────────────────────────────────
+# PDF and DOCX share one flat outline of (style, text) lines so both
+# writers can emit the document while walking the kit once.
+def iter_outline(kit: dict) -> Iterator[Tuple[str, str]]:
+    yield "title", f"Interview Kit: {kit.get('role','')} ({kit.get('level','')})"
+    yield "note", f"Generated on {datetime.now().strftime('%B %d, %Y at %H:%M')}"
+    yield "heading", "Technical Questions"
+    for i, q in enumerate(kit.get("technical_questions", []), 1):
+        yield "question", f"Q{i}. {q['question']}"
+        yield "bullet", f"Difficulty: {q.get('difficulty','—')}"
+        yield "bullet", f"Rationale: {q.get('rationale','—')}"
+        yield "bullet", f"Expected Topics: {', '.join(q.get('expected_topics', []))}"
+    yield "heading", "Behavioral Questions"
+    for i, q in enumerate(kit.get("behavioral_questions", []), 1):
+        yield "question", f"Q{i}. {q['question']}"
+        yield "bullet", f"Competency: {q.get('competency','—')}"
+        yield "bullet", f"Rationale: {q.get('rationale','—')}"
+    yield "heading", "Evaluation Rubric"
+    for r in kit.get("evaluation_rubric", []):
+        yield "question", f"{r['criterion']} (Weight: {r.get('weight','—')})"
+        yield "bullet", f"Strong: {r.get('strong','—')}"
+        yield "bullet", f"Average: {r.get('average','—')}"
+        yield "bullet", f"Weak: {r.get('weak','—')}"
+        yield "bullet", f"Tip: {r.get('scoring_tip','—')}"
+    if kit.get("interview_tips"):
+        yield "heading", "Interviewer Tips"
+        for tip in kit["interview_tips"]:
+            yield "bullet", str(tip)
+
+
+# ─────────────────────────────────────────────
+# Text writers
+# ─────────────────────────────────────────────
+def _text_writer(out: BinaryIO) -> io.TextIOWrapper:
+    return io.TextIOWrapper(out, encoding="utf-8", newline="", write_through=True)
+
+
+def write_markdown(kit: dict, out: BinaryIO) -> None:
+    text = _text_writer(out)
+    for i, line in enumerate(iter_markdown_export(kit)):
+        text.write(line if i == 0 else "\n" + line)
+    text.detach()
+
+
+def canonical_kit(kit: dict) -> dict:
+    """The kit without app-private keys such as ``_focus``."""
+    return {k: v for k, v in kit.items() if not k.startswith("_")}
+
+
+def write_json(kit: dict, out: BinaryIO) -> None:
+    text = _text_writer(out)
+    encoder = json.JSONEncoder(sort_keys=True, ensure_ascii=False, indent=2)
+    for chunk in encoder.iterencode(canonical_kit(kit)):
+        text.write(chunk)
+    text.write("\n")
+    text.detach()
+
+
+def write_csv(kit: dict, out: BinaryIO) -> None:
+    """Scoring sheet: one row per rubric criterion, score and notes left blank."""
+    text = _text_writer(out)
+    writer = csv.writer(text)
+    writer.writerow(CSV_COLUMNS)
+    for r in kit.get("evaluation_rubric", []):
+        weight = parse_weight(r.get("weight"))
+        writer.writerow([
+            kit.get("role", ""), kit.get("level", ""), r.get("criterion", ""),
+            "" if weight is None else f"{weight:g}", "", "",
+        ])
+    text.detach()
+
+
+# ─────────────────────────────────────────────
+# PDF writer
+# ─────────────────────────────────────────────
+PDF_PAGE = (612, 792)
+PDF_MARGIN = 54
+PDF_STYLES = {
+    # style: (font, size, leading, wrap width in characters, indent)
+    "title":    ("F2", 16, 22, 60, 0),
+    "heading":  ("F2", 13, 20, 75, 0),
+    "question": ("F2", 10, 14, 95, 0),
+    "bullet":   ("F1", 10, 13, 90, 12),
+    "note":     ("F1", 9, 14, 100, 0),
+}
+_PDF_SPACE_BEFORE = {"heading": 10, "question": 6}
+
+
+def _pdf_text(text: str) -> str:
+    # The standard Helvetica font only covers WinAnsi; emoji and the like are dropped.
+    text = text.encode("cp1252", "ignore").decode("cp1252")
+    return text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+class _PdfStream:
+    """Writes numbered PDF objects straight to ``out`` and remembers their offsets."""
+
+    def __init__(self, out: BinaryIO):
+        self.out = out
+        self.pos = 0
+        self.offsets = {}
+
+    def raw(self, data: bytes) -> None:
+        self.out.write(data)
+        self.pos += len(data)
+
+    def obj(self, num: int, body: bytes) -> None:
+        self.offsets[num] = self.pos
+        self.raw(b"%d 0 obj\n" % num + body + b"\nendobj\n")
+
+
+def _pdf_pages(kit: dict) -> Iterator[list]:
+    """Lay the outline out into pages of (font, size, x, y, text) runs."""
+    width, height = PDF_PAGE
+    page, y = [], height - PDF_MARGIN
+    for style, text in iter_outline(kit):
+        font, size, leading, wrap, indent = PDF_STYLES[style]
+        y -= _PDF_SPACE_BEFORE.get(style, 0)
+        lines = textwrap.wrap(_pdf_text(text), wrap) or [""]
+        if style == "bullet":
+            lines = ["- " + lines[0]] + ["  " + line for line in lines[1:]]
+        for line in lines:
+            if y - leading < PDF_MARGIN:
+                yield page
+                page, y = [], height - PDF_MARGIN
+            y -= leading
+            page.append((font, size, PDF_MARGIN + indent, y, line))
+    yield page
+
+
+def write_pdf(kit: dict, out: BinaryIO) -> None:
+    """Plain-text PDF using the built-in Helvetica fonts; pages are written as laid out."""
+    pdf = _PdfStream(out)
+    pdf.raw(b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n")
+    pdf.obj(1, b"<< /Type /Catalog /Pages 2 0 R >>")
+    pdf.obj(3, b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /Encoding /WinAnsiEncoding >>")
+    pdf.obj(4, b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica-Bold /Encoding /WinAnsiEncoding >>")
+
+    kids, num = [], 5
+    for runs in _pdf_pages(kit):
+        content = b"".join(
+            b"BT /%s %d Tf %d %d Td (%s) Tj ET\n" % (font.encode(), size, x, y, text.encode("cp1252"))
+            for font, size, x, y, text in runs
+        )
+        pdf.obj(num, b"<< /Length %d >>\nstream\n" % len(content) + content + b"endstream")
+        pdf.obj(num + 1, (
+            b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 %d %d] "
+            b"/Resources << /Font << /F1 3 0 R /F2 4 0 R >> >> /Contents %d 0 R >>"
+        ) % (PDF_PAGE[0], PDF_PAGE[1], num))
+        kids.append(num + 1)
+        num += 2
+
+    pdf.obj(2, b"<< /Type /Pages /Kids [%s] /Count %d >>" % (
+        b" ".join(b"%d 0 R" % k for k in kids), len(kids)))
+    xref = pdf.pos
+    pdf.raw(b"xref\n0 %d\n0000000000 65535 f \n" % num)
+    for i in range(1, num):
+        pdf.raw(b"%010d 00000 n \n" % pdf.offsets[i])
+    pdf.raw(b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (num, xref))
+
+
+# ─────────────────────────────────────────────
+# DOCX writer
+# ─────────────────────────────────────────────
+DOCX_CONTENT_TYPES = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+    '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+    '<Default Extension="xml" ContentType="application/xml"/>'
+    '<Override PartName="/word/document.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.wordprocessingml.document.main+xml"/>'
+    '</Types>'
+)
+DOCX_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" '
+    'Target="word/document.xml"/>'
+    '</Relationships>'
+)
+DOCX_STYLES = {
+    # style: run properties (sizes are in half-points)
+    "title":    '<w:b/><w:sz w:val="36"/>',
+    "heading":  '<w:b/><w:sz w:val="28"/>',
+    "question": '<w:b/><w:sz w:val="22"/>',
+    "bullet":   '<w:sz w:val="21"/>',
+    "note":     '<w:i/><w:sz w:val="18"/>',
+}
+_XML_INVALID = re.compile(r"[\x00-\x08\x0b\x0c\x0e-\x1f]")
+
+
+def _docx_paragraph(style: str, text: str) -> str:
+    text = escape(_XML_INVALID.sub("", text))
+    indent = '<w:pPr><w:ind w:left="360"/></w:pPr>' if style == "bullet" else ""
+    if style == "bullet":
+        text = "• " + text
+    return (f'<w:p>{indent}<w:r><w:rPr>{DOCX_STYLES[style]}</w:rPr>'
+            f'<w:t xml:space="preserve">{text}</w:t></w:r></w:p>')
+
+
+def write_docx(kit: dict, out: BinaryIO) -> None:
+    """Minimal WordprocessingML package; the body is streamed paragraph by paragraph."""
+    with zipfile.ZipFile(out, "w", zipfile.ZIP_DEFLATED) as zf:
+        zf.writestr("[Content_Types].xml", DOCX_CONTENT_TYPES)
+        zf.writestr("_rels/.rels", DOCX_RELS)
+        with zf.open("word/document.xml", "w") as part:
+            text = _text_writer(part)
+            text.write('<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+                       '<w:document xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main">'
+                       '<w:body>')
+            for style, line in iter_outline(kit):
+                text.write(_docx_paragraph(style, line))
+            text.write("<w:sectPr/></w:body></w:document>")
+            text.detach()
+
+
+# ─────────────────────────────────────────────
+# Formats & cache
+# ─────────────────────────────────────────────
+@dataclass(frozen=True)
+class ExportFormat:
+    label: str
+    extension: str
+    mime: str
+    write: Callable[[dict, BinaryIO], None]
+
+
+EXPORT_FORMATS = {
+    "markdown": ExportFormat("Markdown", "md", "text/markdown", write_markdown),
+    "json": ExportFormat("JSON", "json", "application/json", write_json),
+    "csv": ExportFormat("Scoring sheet (CSV)", "csv", "text/csv", write_csv),
+    "pdf": ExportFormat("PDF", "pdf", "application/pdf", write_pdf),
+    "docx": ExportFormat(
+        "DOCX", "docx",
+        "application/vnd.openxmlformats-officedocument.wordprocessingml.document", write_docx,
+    ),
+}
+
+
+def export_filename(kit: dict, fmt: str) -> str:
+    return f"interview_kit_{kit.get('role','role').replace(' ','_')}_{kit.get('level','')}.{EXPORT_FORMATS[fmt].extension}"
+
+
+_exports: "OrderedDict[tuple, bytes]" = OrderedDict()
+_exports_lock = threading.Lock()
+
+
+def export_bytes(kit: dict, fmt: str) -> bytes:
+    """Render ``kit`` as ``fmt``, reusing the last rendering of identical content."""
+    key = (fmt, kit_fingerprint(kit))
+    with _exports_lock:
+        data = _exports.get(key)
+        if data is not None:
+            _exports.move_to_end(key)
+            return data
+    buf = io.BytesIO()
+    EXPORT_FORMATS[fmt].write(kit, buf)
+    data = buf.getvalue()
+    with _exports_lock:
+        _exports[key] = data
+        while len(_exports) > EXPORT_CACHE_SIZE:
+            _exports.popitem(last=False)
+    return data
+
+
+# ─────────────────────────────────────────────
+# Bulk export
+# ─────────────────────────────────────────────
+def write_zip(
+    kits: Iterable[Tuple[str, dict]],
+    out: BinaryIO,
+    formats: Optional[Sequence[str]] = None,
+) -> int:
+    """Zip ``(name, kit)`` pairs as ``<name>.<ext>`` entries, one kit at a time.
+
+    Each document is written straight into its zip entry, so memory use is
+    bounded by a single kit however many are exported. Returns the kit count.
+    """
+    formats = list(formats or EXPORT_FORMATS)
+    count = 0
+    with zipfile.ZipFile(out, "w", zipfile.ZIP_DEFLATED) as zf:
+        for name, kit in kits:
+            for fmt in formats:
+                spec = EXPORT_FORMATS[fmt]
+                with zf.open(f"{name}.{spec.extension}", "w", force_zip64=True) as entry:
+                    spec.write(kit, entry)
+            count += 1
+    return count
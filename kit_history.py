@@ -0,0 +1,237 @@
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+import uuid
+from dataclasses import dataclass
+from typing import List, Optional
+
+from kit_core import kit_fingerprint
+
+DEFAULT_HISTORY_PATH = os.environ.get("KIT_HISTORY_PATH", os.path.join(".cache", "kit_history.sqlite3"))
+DEFAULT_PAGE_SIZE = 10
+SUMMARY_COLUMNS = "id, lineage, version, role, level, focus, source, created, n_tech, n_beh"
+
+_WORD = re.compile(r"\w+", re.UNICODE)
+
+
+@dataclass
+class KitSummary:
+    id: int
+    lineage: str
+    version: int
+    role: str
+    level: str
+    focus: str
+    source: str
+    created: float
+    n_tech: int
+    n_beh: int
+
+
+@dataclass
+class HistoryPage:
+    items: List[KitSummary]
+    next_cursor: Optional[int]
+
+
+def _stored(kit: dict) -> dict:
+    return {k: v for k, v in kit.items() if not k.startswith("_")}
+
+
+def fts_query(text: str) -> str:
+    """Every word of ``text`` as a quoted prefix term, so user input is never FTS syntax."""
+    return " ".join(f'"{w}"*' for w in _WORD.findall(text))
+
+
+class KitHistory:
+    """Every kit a user has seen, versioned per regenerate, in SQLite.
+
+    Listing and search read only the summary columns; a kit's JSON is
+    loaded by primary key when it is opened. Question text, topics and
+    competencies are indexed with FTS5; role, level, difficulty and
+    competency filters use ordinary indexes.
+    """
+
+    def __init__(self, path: str = DEFAULT_HISTORY_PATH):
+        self.path = path
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.executescript("""
+            CREATE TABLE IF NOT EXISTS kits (
+                id          INTEGER PRIMARY KEY,
+                lineage     TEXT NOT NULL,
+                version     INTEGER NOT NULL,
+                is_latest   INTEGER NOT NULL,
+                role        TEXT NOT NULL,
+                role_key    TEXT NOT NULL,
+                level       TEXT NOT NULL,
+                focus       TEXT NOT NULL,
+                source      TEXT NOT NULL,
+                n_tech      INTEGER NOT NULL,
+                n_beh       INTEGER NOT NULL,
+                fingerprint TEXT NOT NULL UNIQUE,
+                created     REAL NOT NULL,
+                payload     TEXT NOT NULL,
+                UNIQUE (lineage, version)
+            );
+            CREATE INDEX IF NOT EXISTS kits_latest ON kits(is_latest, id);
+            CREATE INDEX IF NOT EXISTS kits_role_level ON kits(role_key, level, id);
+            CREATE TABLE IF NOT EXISTS kit_facets (
+                kit_id INTEGER NOT NULL,
+                kind   TEXT NOT NULL,
+                value  TEXT NOT NULL,
+                PRIMARY KEY (kind, value, kit_id)
+            ) WITHOUT ROWID;
+            CREATE VIRTUAL TABLE IF NOT EXISTS kit_text USING fts5(
+                questions, topics, competencies, tokenize = 'porter unicode61'
+            );
+        """)
+
+    # ── Writes ──────────────────────────────
+    def save(self, kit: dict, source: str = "generate", parent_id: Optional[int] = None) -> int:
+        """Store ``kit`` and return its id.
+
+        With ``parent_id`` the kit becomes the next version of the parent's
+        lineage; otherwise it starts a new one. A kit already stored
+        (same content) is not stored again.
+        """
+        stored = _stored(kit)
+        fingerprint = kit_fingerprint(stored)
+        technical = stored.get("technical_questions", [])
+        behavioral = stored.get("behavioral_questions", [])
+        questions = [q.get("question", "") for q in technical + behavioral]
+        topics = [str(t) for q in technical for t in q.get("expected_topics") or []]
+        competencies = sorted({str(q.get("competency")) for q in behavioral if q.get("competency")})
+        difficulties = sorted({str(q.get("difficulty")) for q in technical if q.get("difficulty")})
+        role = str(stored.get("role", ""))
+
+        with self._lock:
+            row = self._db.execute("SELECT id FROM kits WHERE fingerprint = ?", (fingerprint,)).fetchone()
+            if row is not None:
+                return row[0]
+            parent = None
+            if parent_id is not None:
+                parent = self._db.execute("SELECT lineage FROM kits WHERE id = ?", (parent_id,)).fetchone()
+            if parent is not None:
+                lineage = parent[0]
+                version = self._db.execute(
+                    "SELECT MAX(version) FROM kits WHERE lineage = ?", (lineage,)
+                ).fetchone()[0] + 1
+            else:
+                lineage, version = uuid.uuid4().hex[:12], 1
+
+            self._db.execute("BEGIN")
+            try:
+                self._db.execute("UPDATE kits SET is_latest = 0 WHERE lineage = ? AND is_latest = 1", (lineage,))
+                cur = self._db.execute(
+                    "INSERT INTO kits (lineage, version, is_latest, role, role_key, level, focus, source, "
+                    "n_tech, n_beh, fingerprint, created, payload) VALUES (?, ?, 1, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    (lineage, version, role, role.strip().lower(), str(stored.get("level", "")),
+                     str(kit.get("_focus", "")), source, len(technical), len(behavioral),
+                     fingerprint, time.time(), json.dumps(stored, ensure_ascii=False)),
+                )
+                kit_id = cur.lastrowid
+                self._db.executemany(
+                    "INSERT OR IGNORE INTO kit_facets (kit_id, kind, value) VALUES (?, ?, ?)",
+                    [(kit_id, "difficulty", d) for d in difficulties]
+                    + [(kit_id, "competency", c) for c in competencies],
+                )
+                self._db.execute(
+                    "INSERT INTO kit_text (rowid, questions, topics, competencies) VALUES (?, ?, ?, ?)",
+                    (kit_id, "\n".join(questions), " ".join(topics), " ".join(competencies)),
+                )
+                self._db.execute("COMMIT")
+            except Exception:
+                self._db.execute("ROLLBACK")
+                raise
+        return kit_id
+
+    # ── Reads ───────────────────────────────
+    def load(self, kit_id: int) -> Optional[dict]:
+        with self._lock:
+            row = self._db.execute("SELECT payload, focus FROM kits WHERE id = ?", (kit_id,)).fetchone()
+        if row is None:
+            return None
+        kit = json.loads(row[0])
+        kit["_focus"] = row[1]
+        return kit
+
+    def summary(self, kit_id: int) -> Optional[KitSummary]:
+        with self._lock:
+            row = self._db.execute(f"SELECT {SUMMARY_COLUMNS} FROM kits WHERE id = ?", (kit_id,)).fetchone()
+        return KitSummary(*row) if row else None
+
+    def versions(self, lineage: str) -> List[KitSummary]:
+        with self._lock:
+            rows = self._db.execute(
+                f"SELECT {SUMMARY_COLUMNS} FROM kits WHERE lineage = ? ORDER BY version", (lineage,)
+            ).fetchall()
+        return [KitSummary(*r) for r in rows]
+
+    def search(
+        self,
+        text: str = "",
+        role: Optional[str] = None,
+        level: Optional[str] = None,
+        difficulty: Optional[str] = None,
+        competency: Optional[str] = None,
+        latest_only: bool = True,
+        cursor: Optional[int] = None,
+        limit: int = DEFAULT_PAGE_SIZE,
+    ) -> HistoryPage:
+        """Newest first, ``limit`` at a time; pass ``next_cursor`` back for the following page."""
+        where, params = [], []
+        if latest_only:
+            where.append("is_latest = 1")
+        if role:
+            where.append("role_key = ?")
+            params.append(role.strip().lower())
+        if level:
+            where.append("level = ?")
+            params.append(level)
+        for kind, value in (("difficulty", difficulty), ("competency", competency)):
+            if value:
+                where.append("id IN (SELECT kit_id FROM kit_facets WHERE kind = ? AND value = ?)")
+                params += [kind, value]
+        query = fts_query(text)
+        if query:
+            where.append("id IN (SELECT rowid FROM kit_text WHERE kit_text MATCH ?)")
+            params.append(query)
+        if cursor is not None:
+            where.append("id < ?")
+            params.append(cursor)
+        sql = f"SELECT {SUMMARY_COLUMNS} FROM kits"
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        sql += " ORDER BY id DESC LIMIT ?"
+        with self._lock:
+            rows = self._db.execute(sql, params + [limit + 1]).fetchall()
+        items = [KitSummary(*r) for r in rows[:limit]]
+        return HistoryPage(items, items[-1].id if len(rows) > limit else None)
+
+    def facets(self) -> dict:
+        """Distinct filter values: roles, levels, difficulties and competencies."""
+        with self._lock:
+            roles = [r[0] for r in self._db.execute(
+                "SELECT role FROM kits WHERE id IN (SELECT MAX(id) FROM kits GROUP BY role_key) ORDER BY role"
+            )]
+            levels = [r[0] for r in self._db.execute("SELECT DISTINCT level FROM kits ORDER BY level")]
+            values = {"difficulty": [], "competency": []}
+            for kind, value in self._db.execute("SELECT DISTINCT kind, value FROM kit_facets ORDER BY kind, value"):
+                values[kind].append(value)
+        return {"roles": roles, "levels": levels,
+                "difficulties": values["difficulty"], "competencies": values["competency"]}
+
+    def stats(self) -> dict:
+        with self._lock:
+            kits, lineages = self._db.execute("SELECT COUNT(*), COUNT(DISTINCT lineage) FROM kits").fetchone()
+        return {"kits": kits, "lineages": lineages}
+
+    def close(self) -> None:
+        self._db.close()
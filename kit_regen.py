@@ -0,0 +1,35 @@
+from typing import Callable, List
+
+from kit_core import build_regen_prompt
+from kit_schema import question_problem
+
+
+def regenerate_questions(kit: dict, q_type: str, indices: List[int], fetch: Callable[[str], dict]) -> dict:
+    """Replace the questions at ``indices`` with one request.
+
+    Returns a new kit; the input is left untouched unless every selected
+    question received a valid replacement.
+    """
+    section = f"{q_type}_questions"
+    questions = kit.get(section, [])
+    indices = sorted(set(indices))
+    chosen = set(indices)
+    prompt = build_regen_prompt(
+        kit["role"], kit["level"], q_type,
+        [questions[i]["question"] for i in indices],
+        kit.get("_focus", ""),
+        exclude=[q["question"] for i, q in enumerate(questions) if i not in chosen],
+    )
+    data = fetch(prompt)
+    items = data["questions"] if isinstance(data.get("questions"), list) else [data]
+    replacements = [q for q in items if not question_problem(section, q)]
+    if len(replacements) < len(indices):
+        raise ValueError(
+            f"Got {len(replacements)} usable replacements for {len(indices)} questions. Please retry."
+        )
+
+    updated = list(questions)
+    for i, new_q in zip(indices, replacements):
+        new_q["id"] = questions[i].get("id", i + 1)
+        updated[i] = new_q
+    return dict(kit, **{section: updated})
@@ -0,0 +1,176 @@
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+from string import Template
+from typing import Callable
+
+from kit_core import build_scoring_template, kit_fingerprint
+
+FRAGMENT_CACHE_SIZE = 4096
+DOCUMENT_CACHE_SIZE = 64
+
+DIFFICULTY_BADGES = {"Easy": "badge-junior", "Medium": "badge-mid", "Hard": "badge-senior"}
+COMP_COLORS = {
+    "Communication":"#4ade80","Ownership":"#fb923c",
+    "Collaboration":"#38bdf8","Conflict Resolution":"#f472b6",
+    "Leadership":"#a78bfa","Growth Mindset":"#fbbf24",
+}
+TIP_ICONS = ["💡","📌","⚡","🎯","🔍"]
+
+# ─────────────────────────────────────────────
+# Templates
+# ─────────────────────────────────────────────
+# Parsed once at import; rendering is a single substitute() per fragment.
+STAT_CHIP = Template("""<div class="stat-chip">
+            <div class="label">$label</div>
+            <div class="value"$style>$value</div>
+        </div>""")
+
+TECH_CARD = Template("""<div class="question-card">
+                    <div class="question-num">Question $num</div>
+                    <div class="question-text">$question</div>
+                    <span class="difficulty-badge $badge_cls">$difficulty</span>
+                </div>""")
+
+BEH_CARD = Template("""<div class="question-card">
+                    <div class="question-num">Behavioral Question $num</div>
+                    <div class="question-text">$question</div>
+                    <span class="difficulty-badge" style="background:#1a1a2e;color:$color;
+                          border:1px solid $color;">$competency</span>
+                </div>""")
+
+RUBRIC_CARD = Template("""
+            <div style="background:#1e2235;border:1px solid #3a3f5c;border-radius:12px;
+                        padding:20px;margin-bottom:16px;">
+                <div style="display:flex;justify-content:space-between;align-items:center;
+                            border-bottom:1px solid #3a3f5c;padding-bottom:10px;margin-bottom:14px;">
+                    <span style="font-size:16px;font-weight:700;color:#e2e8f0;">$criterion</span>
+                    <span style="background:#252840;border:1px solid #4f46e5;border-radius:20px;
+                                 padding:4px 12px;font-size:12px;color:#818cf8;font-weight:600;">
+                        Weight: $weight
+                    </span>
+                </div>
+                <table class="rubric-table">
+                    <thead><tr>
+                        <th style="width:33%">✅ Strong Response</th>
+                        <th style="width:33%">🟡 Average Response</th>
+                        <th style="width:33%">❌ Weak Response</th>
+                    </tr></thead>
+                    <tbody><tr>
+                        <td class="strong-cell">$strong</td>
+                        <td class="average-cell">$average</td>
+                        <td class="weak-cell">$weak</td>
+                    </tr></tbody>
+                </table>
+                <div style="margin-top:12px;padding:8px 14px;background:#252840;border-radius:8px;
+                            border-left:3px solid #6366f1;">
+                    <span style="font-size:12px;color:#94a3b8;">💡 Tip: </span>
+                    <span style="font-size:13px;color:#cbd5e1;">$tip</span>
+                </div>
+            </div>
+            """)
+
+TIP_CARD = Template("""<div style="display:flex;gap:14px;align-items:flex-start;
+                background:#1e2235;border:1px solid #3a3f5c;border-radius:10px;
+                padding:14px 18px;margin-bottom:10px;">
+                <span style="font-size:20px;min-width:28px;">$icon</span>
+                <span style="color:#e2e8f0;font-size:14px;line-height:1.6;">$tip</span>
+            </div>""")
+
+
+# ─────────────────────────────────────────────
+# Item fragments
+# ─────────────────────────────────────────────
+# Each renderer is memoised on the item's own fields, so a rerun after
+# regenerating one question re-renders only that question's HTML.
+@lru_cache(maxsize=FRAGMENT_CACHE_SIZE)
+def _stat_chip(label: str, value: str, style: str) -> str:
+    return STAT_CHIP.substitute(label=label, value=value, style=style)
+
+
+@lru_cache(maxsize=FRAGMENT_CACHE_SIZE)
+def _tech_card(idx: int, question: str, difficulty: str) -> str:
+    return TECH_CARD.substitute(
+        num=idx + 1, question=question, difficulty=difficulty,
+        badge_cls=DIFFICULTY_BADGES.get(difficulty, "badge-mid"),
+    )
+
+
+@lru_cache(maxsize=FRAGMENT_CACHE_SIZE)
+def _beh_card(idx: int, question: str, competency: str) -> str:
+    return BEH_CARD.substitute(
+        num=idx + 1, question=question, competency=competency,
+        color=COMP_COLORS.get(competency, "#94a3b8"),
+    )
+
+
+@lru_cache(maxsize=FRAGMENT_CACHE_SIZE)
+def _rubric_card(criterion: str, weight: str, strong: str, average: str, weak: str, tip: str) -> str:
+    return RUBRIC_CARD.substitute(
+        criterion=criterion, weight=weight, strong=strong, average=average, weak=weak, tip=tip,
+    )
+
+
+@lru_cache(maxsize=FRAGMENT_CACHE_SIZE)
+def _tip_card(idx: int, tip: str) -> str:
+    return TIP_CARD.substitute(icon=TIP_ICONS[idx % len(TIP_ICONS)], tip=tip)
+
+
+def stat_chip_html(label: str, value, style: str = "") -> str:
+    return _stat_chip(label, str(value), f' style="{style}"' if style else "")
+
+
+def question_label(idx: int, q: dict) -> str:
+    return f"Q{idx+1}. {q['question'][:90]}{'…' if len(q['question'])>90 else ''}"
+
+
+def tech_card_html(idx: int, q: dict) -> str:
+    return _tech_card(idx, q["question"], str(q.get("difficulty", "Medium")))
+
+
+def beh_card_html(idx: int, q: dict) -> str:
+    return _beh_card(idx, q["question"], str(q.get("competency", "General")))
+
+
+def rubric_card_html(r: dict) -> str:
+    return _rubric_card(*(str(v) for v in (
+        r["criterion"], r.get("weight", "—"), r.get("strong", "—"),
+        r.get("average", "—"), r.get("weak", "—"), r.get("scoring_tip", "—"),
+    )))
+
+
+def tip_card_html(idx: int, tip: str) -> str:
+    return _tip_card(idx, str(tip))
+
+
+# ─────────────────────────────────────────────
+# Whole-kit documents
+# ─────────────────────────────────────────────
+_documents: "OrderedDict[tuple, str]" = OrderedDict()
+_documents_lock = threading.Lock()
+
+
+def _document(kind: str, kit: dict, build: Callable[[dict], str]) -> str:
+    key = (kind, kit_fingerprint(kit))
+    with _documents_lock:
+        text = _documents.get(key)
+        if text is not None:
+            _documents.move_to_end(key)
+            return text
+    text = build(kit)
+    with _documents_lock:
+        _documents[key] = text
+        while len(_documents) > DOCUMENT_CACHE_SIZE:
+            _documents.popitem(last=False)
+    return text
+
+
+def scoring_template(kit: dict) -> str:
+    return _document("scoring", kit, build_scoring_template)
+
+
+def clear_caches() -> None:
+    for fn in (_stat_chip, _tech_card, _beh_card, _rubric_card, _tip_card):
+        fn.cache_clear()
+    with _documents_lock:
+        _documents.clear()
@@ -0,0 +1,260 @@
+import re
+from dataclasses import dataclass
+from typing import Callable, List, Optional, Tuple, TypedDict
+
+from kit_core import build_compact_section_prompts, build_section_prompts
+from parallel_kit import generate_sections
+
+DIFFICULTIES = ("Easy", "Medium", "Hard")
+WEIGHT_TOLERANCE = 1.0
+REPAIR_ROUNDS = 2
+
+
+# ─────────────────────────────────────────────
+# Schema
+# ─────────────────────────────────────────────
+class TechnicalQuestion(TypedDict):
+    id: int
+    question: str
+    rationale: str
+    expected_topics: List[str]
+    difficulty: str
+
+
+class BehavioralQuestion(TypedDict):
+    id: int
+    question: str
+    competency: str
+    rationale: str
+
+
+class RubricCriterion(TypedDict):
+    criterion: str
+    weight: str
+    strong: str
+    average: str
+    weak: str
+    scoring_tip: str
+
+
+class InterviewKit(TypedDict, total=False):
+    role: str
+    level: str
+    technical_questions: List[TechnicalQuestion]
+    behavioral_questions: List[BehavioralQuestion]
+    evaluation_rubric: List[RubricCriterion]
+    interview_tips: List[str]
+    _focus: str
+
+
+@dataclass
+class KitIssue:
+    section: str
+    problem: str
+    index: Optional[int] = None
+
+    def __str__(self) -> str:
+        where = self.section if self.index is None else f"{self.section}[{self.index}]"
+        return f"{where}: {self.problem}"
+
+
+# ─────────────────────────────────────────────
+# Validation
+# ─────────────────────────────────────────────
+def parse_weight(weight) -> Optional[float]:
+    """'30%', '30', 30 or 0.3 -> 30.0; None when no number is present.
+
+    A bare number up to 1 is a fraction; anything with a % sign is taken
+    as written, so '1%' stays 1.
+    """
+    if isinstance(weight, (int, float)):
+        value, percent = float(weight), False
+    else:
+        text = str(weight or "")
+        match = re.search(r"\d+(?:\.\d+)?", text)
+        if not match:
+            return None
+        value, percent = float(match.group()), "%" in text
+    return value * 100 if not percent and 0 < value <= 1 else value
+
+
+def _is_text(value) -> bool:
+    return isinstance(value, str) and bool(value.strip())
+
+
+def _technical_problem(q) -> Optional[str]:
+    if not isinstance(q, dict) or not _is_text(q.get("question")):
+        return "missing question text"
+    if not _is_text(q.get("rationale")):
+        return "missing rationale"
+    topics = q.get("expected_topics")
+    if not isinstance(topics, list) or not all(isinstance(t, str) for t in topics):
+        return "expected_topics must be a list of strings"
+    if q.get("difficulty") not in DIFFICULTIES:
+        return f"difficulty must be one of {', '.join(DIFFICULTIES)}"
+    return None
+
+
+def _behavioral_problem(q) -> Optional[str]:
+    if not isinstance(q, dict) or not _is_text(q.get("question")):
+        return "missing question text"
+    if not _is_text(q.get("competency")):
+        return "missing competency"
+    if not _is_text(q.get("rationale")):
+        return "missing rationale"
+    return None
+
+
+def _criterion_problem(r) -> Optional[str]:
+    if not isinstance(r, dict):
+        return "not an object"
+    for field in ("criterion", "strong", "average", "weak"):
+        if not _is_text(r.get(field)):
+            return f"missing {field}"
+    if parse_weight(r.get("weight")) is None:
+        return "weight is not a number"
+    return None
+
+
+QUESTION_CHECKS = {
+    "technical_questions": _technical_problem,
+    "behavioral_questions": _behavioral_problem,
+}
+
+
+def question_problem(section: str, q) -> Optional[str]:
+    return QUESTION_CHECKS[section](q)
+
+
+def _question_issues(kit: dict, section: str, expected: int, check) -> List[KitIssue]:
+    items = kit.get(section)
+    if not isinstance(items, list):
+        return [KitIssue(section, "missing")]
+    issues = []
+    for i, q in enumerate(items):
+        problem = check(q)
+        if problem:
+            issues.append(KitIssue(section, problem, i))
+    valid = len(items) - len(issues)
+    if valid != expected:
+        issues.append(KitIssue(section, f"expected {expected} valid questions, got {valid}"))
+    return issues
+
+
+def validate_kit(kit: dict, n_tech: int, n_beh: int) -> List[KitIssue]:
+    issues = _question_issues(kit, "technical_questions", n_tech, _technical_problem)
+    issues += _question_issues(kit, "behavioral_questions", n_beh, _behavioral_problem)
+
+    rubric = kit.get("evaluation_rubric")
+    if not isinstance(rubric, list) or not rubric:
+        issues.append(KitIssue("evaluation_rubric", "missing"))
+    else:
+        bad = [KitIssue("evaluation_rubric", p, i) for i, r in enumerate(rubric) if (p := _criterion_problem(r))]
+        issues += bad
+        if not bad:
+            total = sum(parse_weight(r["weight"]) for r in rubric)
+            if abs(total - 100) > WEIGHT_TOLERANCE:
+                issues.append(KitIssue("evaluation_rubric", f"weights sum to {total:g}%, not 100%"))
+
+    tips = kit.get("interview_tips")
+    if not isinstance(tips, list) or not any(_is_text(t) for t in tips):
+        issues.append(KitIssue("interview_tips", "missing"))
+    return issues
+
+
+# ─────────────────────────────────────────────
+# Targeted repair
+# ─────────────────────────────────────────────
+class KitRepairError(ValueError):
+    """The kit was still invalid after its broken sections were re-requested."""
+
+    def __init__(self, issues: List[KitIssue]):
+        super().__init__("The kit is still incomplete after a repair: " + "; ".join(map(str, issues))
+                         + ". Please retry.")
+        self.issues = issues
+
+
+def _keep_valid(items, check, limit: int) -> list:
+    kept = [q for q in (items if isinstance(items, list) else []) if not check(q)]
+    return kept[:limit]
+
+
+def _renumber(items: list) -> list:
+    for i, q in enumerate(items, 1):
+        q["id"] = i
+    return items
+
+
+def _repair_once(
+    kit: dict, role: str, level: str, focus: str, n_tech: int, n_beh: int,
+    fetch: Callable[[str], dict], initializer, compact: bool,
+) -> dict:
+    for q in kit.get("technical_questions") or []:
+        if isinstance(q, dict) and isinstance(q.get("difficulty"), str):
+            q["difficulty"] = q["difficulty"].strip().title()
+
+    tech = _keep_valid(kit.get("technical_questions"), _technical_problem, n_tech)
+    beh = _keep_valid(kit.get("behavioral_questions"), _behavioral_problem, n_beh)
+    broken = {issue.section for issue in validate_kit(
+        dict(kit, technical_questions=tech, behavioral_questions=beh), n_tech, n_beh
+    )}
+
+    build = build_compact_section_prompts if compact else build_section_prompts
+    prompts = build(
+        role, level, focus, n_tech - len(tech), n_beh - len(beh),
+        exclude={
+            "technical": [q["question"] for q in tech],
+            "behavioral": [q["question"] for q in beh],
+        },
+    )
+    wanted = {}
+    if "technical_questions" in broken:
+        wanted["technical"] = prompts["technical"]
+    if "behavioral_questions" in broken:
+        wanted["behavioral"] = prompts["behavioral"]
+    if broken & {"evaluation_rubric", "interview_tips"}:
+        wanted["rubric"] = prompts["rubric"]
+    parts = generate_sections(wanted, fetch, initializer=initializer) if wanted else {}
+
+    repaired = dict(kit)
+    if "technical" in parts:
+        tech += _keep_valid(parts["technical"].get("technical_questions"), _technical_problem, n_tech - len(tech))
+    if "behavioral" in parts:
+        beh += _keep_valid(parts["behavioral"].get("behavioral_questions"), _behavioral_problem, n_beh - len(beh))
+    repaired["technical_questions"] = _renumber(tech)
+    repaired["behavioral_questions"] = _renumber(beh)
+    if "rubric" in parts:
+        for section in ("evaluation_rubric", "interview_tips"):
+            if section in broken and section in parts["rubric"]:
+                repaired[section] = parts["rubric"][section]
+    return repaired
+
+
+def repair_kit(
+    kit: dict,
+    role: str,
+    level: str,
+    focus: str,
+    n_tech: int,
+    n_beh: int,
+    fetch: Callable[[str], dict],
+    initializer: Callable[[], None] = None,
+    compact: bool = False,
+) -> Tuple[dict, List[KitIssue]]:
+    """Re-request only the invalid or missing parts of ``kit`` and splice them in.
+
+    Returns the repaired kit and the issues found before repair. Extra
+    questions are trimmed locally; nothing is fetched for a valid kit. The
+    spliced kit is validated again; parts that are still broken get up to
+    ``REPAIR_ROUNDS`` attempts in all, then ``KitRepairError`` is raised.
+    """
+    issues = validate_kit(kit, n_tech, n_beh)
+    if not issues:
+        return kit, issues
+    repaired, remaining = kit, issues
+    for _ in range(REPAIR_ROUNDS):
+        repaired = _repair_once(repaired, role, level, focus, n_tech, n_beh, fetch, initializer, compact)
+        remaining = validate_kit(repaired, n_tech, n_beh)
+        if not remaining:
+            return repaired, issues
+    raise KitRepairError(remaining)
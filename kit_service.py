@@ -0,0 +1,263 @@
+import json
+import time
+from dataclasses import asdict, dataclass, field
+from typing import Callable, List, Optional
+
+import kit_core as core
+from gemini_client import key_fingerprint
+from kit_cache import KitCache
+from kit_core import (
+    DEFAULT_N_BEH, DEFAULT_N_TECH, N_BEH_RANGE, N_TECH_RANGE, build_compact_prompt, build_compact_section_prompts, build_prompt,
+    build_section_prompts, extract_json, kit_cache_key, normalize_role, validate_inputs,
+)
+from kit_export import EXPORT_FORMATS, export_bytes, export_filename
+from kit_history import KitHistory
+from kit_regen import regenerate_questions
+from kit_schema import repair_kit
+from kit_warmup import CatalogStore, is_catalog_request
+from parallel_kit import generate_sections, merge_sections
+from provider_router import TrackingPool
+from question_bank import QuestionBank
+from rate_limit import RateLimiter
+from token_usage import UsageLedger
+
+MODES = ("stream", "parallel", "single")
+Q_TYPES = ("technical", "behavioral")
+
+
+class InvalidRequest(ValueError):
+    """The caller's input is wrong; retrying the same request will not help."""
+
+
+# ─────────────────────────────────────────────
+# Requests & results
+# ─────────────────────────────────────────────
+@dataclass
+class KitRequest:
+    role: str
+    level: str
+    focus: str = ""
+    n_tech: int = DEFAULT_N_TECH
+    n_beh: int = DEFAULT_N_BEH
+    mode: str = "single"
+    use_bank: bool = True
+    compact: bool = False
+    fresh: bool = False
+
+    @classmethod
+    def from_dict(cls, data) -> "KitRequest":
+        """Build and validate a request from decoded JSON; unknown fields are rejected."""
+        if not isinstance(data, dict):
+            raise InvalidRequest("a kit request must be a JSON object")
+        unknown = set(data) - set(cls.__dataclass_fields__)
+        if unknown:
+            raise InvalidRequest(f"unknown fields: {', '.join(sorted(unknown))}")
+        try:
+            return cls(**data).normalized()
+        except TypeError as e:
+            raise InvalidRequest(str(e)) from None
+
+    def normalized(self) -> "KitRequest":
+        """A copy with the role normalized; raises ``InvalidRequest`` on bad input."""
+        for name in ("role", "level", "focus", "mode"):
+            if not isinstance(getattr(self, name), str):
+                raise InvalidRequest(f"{name} must be a string")
+        for name in ("use_bank", "compact", "fresh"):
+            if not isinstance(getattr(self, name), bool):
+                raise InvalidRequest(f"{name} must be true or false")
+        valid, err = validate_inputs(self.role, self.level)
+        if not valid:
+            raise InvalidRequest(err)
+        for name, (low, high) in (("n_tech", N_TECH_RANGE), ("n_beh", N_BEH_RANGE)):
+            value = getattr(self, name)
+            if isinstance(value, bool) or not isinstance(value, int) or not low <= value <= high:
+                raise InvalidRequest(f"{name} must be an integer from {low} to {high}")
+        if self.mode not in MODES:
+            raise InvalidRequest(f"mode must be one of {', '.join(MODES)}")
+        return KitRequest(**dict(asdict(self), role=normalize_role(self.role), focus=self.focus.strip()))
+
+    def prompt(self) -> str:
+        build = build_compact_prompt if self.compact else build_prompt
+        return build(self.role, self.level, self.focus, self.n_tech, self.n_beh)
+
+    def key(self, api_key: str) -> str:
+        """Single-flight key: identical requests made with the same API key share one job."""
+        return (f"generate:{key_fingerprint(api_key)}:{kit_cache_key(self.prompt(), self.compact)}:"
+                f"{self.mode}:{self.use_bank}:{not self.fresh}")
+
+
+@dataclass
+class KitResult:
+    kit: dict
+    kit_id: Optional[int]  # None when the kit was not saved to history
+    source: str  # "generated", "bank" or "catalog"
+    reused: int = 0
+    issues: List[str] = field(default_factory=list)
+    catalog_age: Optional[float] = None
+
+    def to_dict(self) -> dict:
+        kit = {k: v for k, v in self.kit.items() if not k.startswith("_")}
+        return dict(asdict(self), kit=kit, focus=self.kit.get("_focus", ""))
+
+
+def regenerate_key(kit_ref, q_type: str, indices: List[int], api_key: str) -> str:
+    """Single-flight key for regenerating ``indices`` of the kit identified by ``kit_ref``."""
+    return f"regenerate:{key_fingerprint(api_key)}:{kit_ref}:{q_type}:{sorted(set(indices))}"
+
+
+def check_regenerate(kit: dict, q_type, indices) -> None:
+    """Raise ``InvalidRequest`` unless ``indices`` are positions in the ``q_type`` section."""
+    if q_type not in Q_TYPES:
+        raise InvalidRequest(f"q_type must be one of {', '.join(Q_TYPES)}")
+    count = len(kit.get(f"{q_type}_questions", []))
+    if not isinstance(indices, list) or not indices or any(
+        isinstance(i, bool) or not isinstance(i, int) or not 0 <= i < count for i in indices
+    ):
+        raise InvalidRequest(f"indices must be a non-empty list of positions from 0 to {count - 1}")
+
+
+# ─────────────────────────────────────────────
+# Service
+# ─────────────────────────────────────────────
+class KitService:
+    """Generate, regenerate and export kits without any UI.
+
+    The Streamlit app and the HTTP API both drive kits through one of
+    these, so caching, the question bank, the catalog and history behave
+    the same everywhere. Every method is blocking and thread-safe; callers
+    run them on a ``JobQueue``. ``bank``, ``history`` and ``catalog`` are
+    optional and skipped when None.
+    """
+
+    def __init__(
+        self,
+        pool,
+        cache: Optional[KitCache] = None,
+        limiter: Optional[RateLimiter] = None,
+        ledger: Optional[UsageLedger] = None,
+        bank: Optional[QuestionBank] = None,
+        history: Optional[KitHistory] = None,
+        catalog: Optional[CatalogStore] = None,
+    ):
+        self.pool = pool
+        self.cache = cache
+        self.limiter = limiter
+        self.ledger = ledger
+        self.bank = bank
+        self.history = history
+        self.catalog = catalog
+
+    # ── Model calls ─────────────────────────
+    # Each kit's calls go through a TrackingPool, so a kit any part of which
+    # came from a non-persistent provider is kept out of every store.
+    def _fetch(self, pool: TrackingPool, api_key: str, use_cache: bool, compact: bool) -> Callable[[str], dict]:
+        cache = self.cache if use_cache else None
+        return lambda prompt: core.call_gemini_json(
+            prompt, api_key, pool, cache, self.limiter, self.ledger, compact,
+        )
+
+    def _stream(self, pool: TrackingPool, api_key: str, use_cache: bool, compact: bool) -> Callable[[str], object]:
+        cache = self.cache if use_cache else None
+        return lambda prompt: core.stream_gemini(
+            prompt, api_key, pool, cache, self.limiter, self.ledger, compact,
+        )
+
+    def _save(self, kit: dict, source: str, parent_id: Optional[int] = None) -> Optional[int]:
+        return self.history.save(kit, source, parent_id=parent_id) if self.history is not None else None
+
+    # ── Generate ────────────────────────────
+    def lookup_catalog(self, request: KitRequest) -> Optional[KitResult]:
+        """The precomputed kit for a catalog request, unless ``fresh`` is set."""
+        if self.catalog is None or request.fresh:
+            return None
+        if not is_catalog_request(request.role, request.focus, request.n_tech, request.n_beh):
+            return None
+        stored = self.catalog.get(request.role, request.level)
+        if stored is None:
+            return None
+        kit, generated = stored
+        kit["_focus"] = ""
+        return KitResult(kit, self._save(kit, "catalog"), "catalog", catalog_age=time.time() - generated)
+
+    def generate(
+        self, request: KitRequest, api_key: str, on_chunk: Optional[Callable[[str], None]] = None,
+    ) -> KitResult:
+        """One kit for ``request``; in stream mode every raw chunk is passed to ``on_chunk``."""
+        hit = self.lookup_catalog(request)
+        if hit is not None:
+            return hit
+
+        r = request
+        use_cache = not r.fresh
+        pool = TrackingPool(self.pool)
+        fetch = self._fetch(pool, api_key, use_cache, r.compact)
+        prompt = r.prompt()
+        banked = self.bank.assemble(r.role, r.level, r.focus, r.n_tech, r.n_beh) if (
+            r.use_bank and not r.fresh and self.bank is not None
+        ) else None
+
+        if banked is not None:
+            # repair_kit below requests only the slots the bank could not fill.
+            kit = banked
+        elif r.mode == "parallel":
+            build_sections = build_compact_section_prompts if r.compact else build_section_prompts
+            kit = merge_sections(r.role, r.level, generate_sections(
+                build_sections(r.role, r.level, r.focus, r.n_tech, r.n_beh), fetch,
+            ))
+        elif r.mode == "stream":
+            parts = []
+            for chunk in self._stream(pool, api_key, use_cache, r.compact)(prompt):
+                parts.append(chunk)
+                if on_chunk is not None:
+                    on_chunk(chunk)
+            try:
+                kit = extract_json("".join(parts))
+            except ValueError:
+                if self.cache is not None:
+                    core.discard_cached(self.cache, pool, prompt, r.compact)
+                raise
+        else:
+            kit = fetch(prompt)
+
+        fetch_fresh = self._fetch(pool, api_key, False, r.compact)
+        kit, issues = repair_kit(kit, r.role, r.level, r.focus, r.n_tech, r.n_beh, fetch_fresh, compact=r.compact)
+        kit_id = None
+        if pool.persistent:
+            if issues and banked is None and r.mode != "parallel" and self.cache is not None:
+                # Serve the repaired kit next time instead of repairing again.
+                key, _ = core.lookup_cached(self.cache, pool, prompt, r.compact)
+                if key is not None:
+                    self.cache.put(key, json.dumps(kit))
+            if self.bank is not None:
+                self.bank.add_kit(kit, r.focus)
+            if self.catalog is not None and is_catalog_request(r.role, r.focus, r.n_tech, r.n_beh):
+                self.catalog.put(r.role, r.level, kit)
+            kit_id = self._save(kit, "generate")
+        kit["_focus"] = r.focus
+        reused = len(banked["technical_questions"]) + len(banked["behavioral_questions"]) if banked else 0
+        return KitResult(
+            kit, kit_id, "bank" if banked is not None else "generated",
+            reused=reused, issues=[str(i) for i in issues],
+        )
+
+    # ── Regenerate ──────────────────────────
+    def regenerate(
+        self, kit: dict, q_type: str, indices: List[int], api_key: str, parent_id: Optional[int] = None,
+    ) -> KitResult:
+        """Replace the questions at ``indices``; the result is the next version of ``parent_id``."""
+        check_regenerate(kit, q_type, indices)
+        pool = TrackingPool(self.pool)
+        kit = regenerate_questions(kit, q_type, indices, self._fetch(pool, api_key, False, False))
+        if not pool.persistent:
+            return KitResult(kit, None, "generated")
+        if self.bank is not None:
+            self.bank.add_kit(kit, kit.get("_focus", ""))
+        # Each regenerate is a new version of the kit it started from.
+        return KitResult(kit, self._save(kit, "regenerate", parent_id=parent_id), "generated")
+
+    # ── Export ──────────────────────────────
+    def export(self, kit: dict, fmt: str) -> tuple:
+        """``(data, filename, mime)`` for one of ``EXPORT_FORMATS``."""
+        if fmt not in EXPORT_FORMATS:
+            raise InvalidRequest(f"format must be one of {', '.join(EXPORT_FORMATS)}")
+        return export_bytes(kit, fmt), export_filename(kit, fmt), EXPORT_FORMATS[fmt].mime
@@ -0,0 +1,84 @@
+import json
+from typing import Iterable, Iterator, List, Tuple
+
+STREAMED_SECTIONS = ("technical_questions", "behavioral_questions")
+
+
+class KitStreamParser:
+    """Incremental scanner over a streamed kit response.
+
+    ``feed`` accepts raw text chunks and returns every element of the
+    question arrays that closed within them, as ``(section, item)`` pairs.
+    Anything before the first ``{`` (markdown fences, preamble) is ignored.
+    The full response stays available in ``text`` for the final parse.
+    """
+
+    def __init__(self, sections: Iterable[str] = STREAMED_SECTIONS):
+        self.sections = set(sections)
+        self.text = ""
+        self._pos = 0
+        self._stack: List[str] = []
+        self._in_string = False
+        self._escape = False
+        self._string_start = 0
+        self._last_string = ""
+        self._top_key = ""
+        self._item_start = -1
+
+    def feed(self, chunk: str) -> List[Tuple[str, dict]]:
+        self.text += chunk
+        done = []
+        text = self.text
+        for i in range(self._pos, len(text)):
+            c = text[i]
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif c == "\\":
+                    self._escape = True
+                elif c == '"':
+                    self._in_string = False
+                    if len(self._stack) == 1:
+                        self._last_string = text[self._string_start + 1:i]
+                continue
+
+            if not self._stack:
+                if c == "{":
+                    self._stack.append(c)
+                continue
+
+            if c == '"':
+                self._in_string = True
+                self._string_start = i
+            elif c == ":" and len(self._stack) == 1:
+                self._top_key = self._last_string
+            elif c in "{[":
+                if c == "{" and self._in_section_array():
+                    self._item_start = i
+                self._stack.append(c)
+            elif c in "}]":
+                self._stack.pop()
+                if c == "}" and self._item_start >= 0 and self._in_section_array():
+                    item = self._parse_item(text[self._item_start:i + 1])
+                    if item is not None:
+                        done.append((self._top_key, item))
+                    self._item_start = -1
+        self._pos = len(text)
+        return done
+
+    def _in_section_array(self) -> bool:
+        return self._stack == ["{", "["] and self._top_key in self.sections
+
+    @staticmethod
+    def _parse_item(raw: str):
+        try:
+            item = json.loads(raw)
+        except json.JSONDecodeError:
+            return None
+        return item if isinstance(item, dict) and "question" in item else None
+
+
+def iter_stream_items(chunks: Iterable[str], parser: KitStreamParser = None) -> Iterator[Tuple[str, dict]]:
+    parser = parser or KitStreamParser()
+    for chunk in chunks:
+        yield from parser.feed(chunk)
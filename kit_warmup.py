@@ -0,0 +1,272 @@
+"""Precompute kits for the quick-fill catalog (EXAMPLE_ROLES x LEVELS).
+
+Usage:
+    python kit_warmup.py --api-key KEY --once [--budget-kits 36]
+    python kit_warmup.py --api-key KEY [--interval 3600] [--budget-kits 6] [--budget-tokens 60000]
+
+Every catalog role and level gets a kit with the default question counts,
+stored in ``KIT_CATALOG_PATH``. Each cycle regenerates missing kits first,
+then kits older than ``--max-age``, and stops once either the kit or the
+token budget for the cycle is spent. The app serves these kits instantly
+when a catalog role is picked without a custom focus.
+"""
+import argparse
+import json
+import logging
+import os
+import sqlite3
+import sys
+import threading
+import time
+from dataclasses import dataclass
+from typing import List, Optional, Tuple
+
+from gemini_client import GeminiClientPool
+from kit_core import (
+    DEFAULT_N_BEH, DEFAULT_N_TECH, EXAMPLE_ROLES, LEVELS, build_compact_prompt, build_prompt, call_gemini_json,
+)
+from kit_schema import repair_kit
+from provider_router import ProviderConfigError, TrackingPool, router_from_env
+from rate_limit import DEFAULT_RPM, RateLimitExceeded, RateLimiter
+from telemetry import inc
+from token_usage import UsageLedger
+
+_log = logging.getLogger("interview_kit.warmup")
+
+DEFAULT_CATALOG_PATH = os.environ.get("KIT_CATALOG_PATH", os.path.join(".cache", "kit_catalog.sqlite3"))
+DEFAULT_MAX_AGE_SECONDS = 24 * 3600
+DEFAULT_INTERVAL_SECONDS = 3600
+DEFAULT_BUDGET_KITS = 6
+DEFAULT_BUDGET_TOKENS = 60_000
+
+
+def catalog_role(role: str) -> Optional[str]:
+    """The catalog spelling of ``role``, or None when it is not in the catalog."""
+    wanted = role.strip().lower()
+    return next((r for r in EXAMPLE_ROLES if r.lower() == wanted), None)
+
+
+def catalog_entries() -> List[Tuple[str, str]]:
+    return [(role, level) for role in EXAMPLE_ROLES for level in LEVELS]
+
+
+def is_catalog_request(role: str, focus: str, n_tech: int, n_beh: int) -> bool:
+    return (
+        catalog_role(role) is not None and not focus.strip()
+        and n_tech == DEFAULT_N_TECH and n_beh == DEFAULT_N_BEH
+    )
+
+
+class CatalogStore:
+    """Latest precomputed kit per catalog role and level, in SQLite."""
+
+    def __init__(self, path: str = DEFAULT_CATALOG_PATH):
+        self.path = path
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("""
+            CREATE TABLE IF NOT EXISTS catalog_kits (
+                role      TEXT NOT NULL,
+                level     TEXT NOT NULL,
+                kit       TEXT NOT NULL,
+                generated REAL NOT NULL,
+                PRIMARY KEY (role, level)
+            )""")
+
+    def get(self, role: str, level: str) -> Optional[Tuple[dict, float]]:
+        """The stored kit and the time it was generated."""
+        with self._lock:
+            row = self._db.execute(
+                "SELECT kit, generated FROM catalog_kits WHERE role = ? AND level = ?",
+                (role.strip().lower(), level),
+            ).fetchone()
+        inc("catalog_lookups", result="hit" if row else "miss")
+        if row is None:
+            return None
+        return json.loads(row[0]), row[1]
+
+    def put(self, role: str, level: str, kit: dict) -> None:
+        blob = json.dumps({k: v for k, v in kit.items() if not k.startswith("_")}, ensure_ascii=False)
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO catalog_kits (role, level, kit, generated) VALUES (?, ?, ?, ?)",
+                (role.strip().lower(), level, blob, time.time()),
+            )
+
+    def due(self, max_age: float = DEFAULT_MAX_AGE_SECONDS) -> List[Tuple[str, str]]:
+        """Catalog entries to (re)generate: missing ones first, then the stalest."""
+        with self._lock:
+            generated = dict(((r, lv), g) for r, lv, g in self._db.execute(
+                "SELECT role, level, generated FROM catalog_kits"
+            ))
+        cutoff = time.time() - max_age
+        missing, stale = [], []
+        for role, level in catalog_entries():
+            at = generated.get((role.lower(), level))
+            if at is None:
+                missing.append((role, level))
+            elif at < cutoff:
+                stale.append((at, role, level))
+        return missing + [(role, level) for _, role, level in sorted(stale)]
+
+    def stats(self) -> dict:
+        with self._lock:
+            stored, oldest = self._db.execute("SELECT COUNT(*), MIN(generated) FROM catalog_kits").fetchone()
+        return {
+            "stored": stored, "catalog": len(catalog_entries()),
+            "oldest_age_seconds": time.time() - oldest if oldest else None,
+        }
+
+    def close(self) -> None:
+        self._db.close()
+
+
+@dataclass
+class WarmupBudget:
+    kits: int = DEFAULT_BUDGET_KITS
+    tokens: int = DEFAULT_BUDGET_TOKENS
+
+
+def generate_catalog_kit(
+    role: str,
+    level: str,
+    api_key: str,
+    pool: GeminiClientPool,
+    limiter: Optional[RateLimiter] = None,
+    ledger: Optional[UsageLedger] = None,
+    compact: bool = False,
+) -> dict:
+    build = build_compact_prompt if compact else build_prompt
+    prompt = build(role, level, "", DEFAULT_N_TECH, DEFAULT_N_BEH)
+    tracked = TrackingPool(pool)
+    # Uncached on purpose: a refresh should produce a new kit, not replay the old response.
+    fetch = lambda p: call_gemini_json(p, api_key, tracked, None, limiter, ledger, compact)
+    kit, _ = repair_kit(fetch(prompt), role, level, "", DEFAULT_N_TECH, DEFAULT_N_BEH, fetch, compact=compact)
+    if not tracked.persistent:
+        raise ValueError("served by a non-persistent provider; not stored in the catalog")
+    return kit
+
+
+class CatalogWarmer:
+    """Keeps the catalog store filled and fresh, one kit at a time.
+
+    ``run_cycle`` spends at most ``budget.kits`` generations and about
+    ``budget.tokens`` tokens; ``start`` repeats it every ``interval`` seconds
+    on a daemon thread. Progress goes to ``log``, the
+    ``interview_kit.warmup`` logger by default.
+    """
+
+    def __init__(
+        self,
+        store: CatalogStore,
+        api_key: str,
+        pool: GeminiClientPool,
+        limiter: Optional[RateLimiter] = None,
+        budget: WarmupBudget = None,
+        max_age: float = DEFAULT_MAX_AGE_SECONDS,
+        interval: float = DEFAULT_INTERVAL_SECONDS,
+        compact: bool = False,
+        log=_log.info,
+    ):
+        self.store = store
+        self.api_key = api_key
+        self.pool = pool
+        self.limiter = limiter
+        self.budget = budget or WarmupBudget()
+        self.max_age = max_age
+        self.interval = interval
+        self.compact = compact
+        self.log = log
+        self.last_cycle: Optional[dict] = None
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def run_cycle(self) -> dict:
+        ledger = UsageLedger()
+        due = self.store.due(self.max_age)
+        summary = {"due": len(due), "generated": 0, "failed": 0, "stopped": "done"}
+        for role, level in due:
+            if summary["generated"] + summary["failed"] >= self.budget.kits:
+                summary["stopped"] = "kit budget"
+                break
+            if ledger.summary()["total_tokens"] >= self.budget.tokens:
+                summary["stopped"] = "token budget"
+                break
+            try:
+                kit = generate_catalog_kit(role, level, self.api_key, self.pool, self.limiter, ledger, self.compact)
+            except RateLimitExceeded as e:
+                summary["stopped"] = "rate limit"
+                self.log(f"warm-up paused: {e}")
+                break
+            except Exception as e:
+                summary["failed"] += 1
+                inc("catalog_warmups", outcome="failed")
+                self.log(f"warm-up failed for {role} ({level}): {type(e).__name__}: {e}")
+                continue
+            self.store.put(role, level, kit)
+            summary["generated"] += 1
+            inc("catalog_warmups", outcome="generated")
+            self.log(f"warmed {role} ({level})")
+        summary["tokens"] = ledger.summary()["total_tokens"]
+        self.last_cycle = dict(summary, finished=time.time())
+        return summary
+
+    def _loop(self) -> None:
+        while not self._stop.is_set():
+            try:
+                self.run_cycle()
+            except Exception as e:
+                self.log(f"warm-up cycle failed: {type(e).__name__}: {e}")
+            self._stop.wait(self.interval)
+
+    def start(self) -> "CatalogWarmer":
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._loop, name="kit-warmup", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._stop.set()
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Precompute kits for the quick-fill role catalog.")
+    parser.add_argument("--api-key", default=os.environ.get("KIT_WARMUP_API_KEY") or os.environ.get("GEMINI_API_KEY"),
+                        help="Gemini API key (default: $KIT_WARMUP_API_KEY, then $GEMINI_API_KEY)")
+    parser.add_argument("--store", default=DEFAULT_CATALOG_PATH)
+    parser.add_argument("--once", action="store_true", help="run a single cycle and exit")
+    parser.add_argument("--interval", type=float, default=DEFAULT_INTERVAL_SECONDS, help="seconds between cycles")
+    parser.add_argument("--max-age", type=float, default=DEFAULT_MAX_AGE_SECONDS,
+                        help="regenerate kits older than this many seconds")
+    parser.add_argument("--budget-kits", type=int, default=DEFAULT_BUDGET_KITS, help="kits per cycle")
+    parser.add_argument("--budget-tokens", type=int, default=DEFAULT_BUDGET_TOKENS, help="tokens per cycle")
+    parser.add_argument("--rpm", type=float, default=DEFAULT_RPM)
+    parser.add_argument("--compact", action="store_true", help="use compact prompts and JSON response mode")
+    args = parser.parse_args(argv)
+    if not args.api_key:
+        parser.error("no API key given (use --api-key or set KIT_WARMUP_API_KEY)")
+
+    limiter = RateLimiter(args.rpm, max_wait=float("inf"))
+    try:
+        pool = router_from_env(GeminiClientPool(), limiter)
+    except ProviderConfigError as e:
+        parser.error(str(e))
+    warmer = CatalogWarmer(
+        CatalogStore(args.store), args.api_key, pool, limiter,
+        WarmupBudget(args.budget_kits, args.budget_tokens),
+        max_age=args.max_age, interval=args.interval, compact=args.compact, log=print,
+    )
+    while True:
+        summary = warmer.run_cycle()
+        print(f"Cycle: {summary['generated']} generated, {summary['failed']} failed of {summary['due']} due, "
+              f"{summary['tokens']:,} tokens (stopped: {summary['stopped']})")
+        if args.once:
+            return 0 if summary["failed"] == 0 else 1
+        time.sleep(args.interval)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,71 @@
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict
+
+SECTION_RETRIES = 2
+RETRY_DELAY_SECONDS = 1.0
+
+
+class SectionError(Exception):
+    def __init__(self, section: str, cause: Exception):
+        super().__init__(f"Section '{section}' failed: {cause}")
+        self.section = section
+        self.cause = cause
+
+
+def _fetch_with_retry(section: str, prompt: str, fetch: Callable[[str], dict], retries: int) -> dict:
+    for attempt in range(retries + 1):
+        try:
+            return fetch(prompt)
+        except Exception as e:
+            if attempt == retries:
+                raise SectionError(section, e) from e
+            time.sleep(RETRY_DELAY_SECONDS * (attempt + 1))
+
+
+def generate_sections(
+    prompts: Dict[str, str],
+    fetch: Callable[[str], dict],
+    retries: int = SECTION_RETRIES,
+    initializer: Callable[[], None] = None,
+) -> Dict[str, dict]:
+    """Run every section prompt concurrently; each section retries on its own."""
+    with ThreadPoolExecutor(max_workers=len(prompts), initializer=initializer) as pool:
+        futures = {
+            name: pool.submit(_fetch_with_retry, name, prompt, fetch, retries)
+            for name, prompt in prompts.items()
+        }
+        return {name: fut.result() for name, fut in futures.items()}
+
+
+def _question_fingerprint(q: dict) -> str:
+    return re.sub(r"[^a-z0-9]+", " ", str(q.get("question", "")).lower()).strip()
+
+
+def dedupe_questions(questions: list) -> list:
+    seen, unique = set(), []
+    for q in questions:
+        if not isinstance(q, dict) or not q.get("question"):
+            continue
+        fp = _question_fingerprint(q)
+        if fp in seen:
+            continue
+        seen.add(fp)
+        unique.append(q)
+    for i, q in enumerate(unique, 1):
+        q["id"] = i
+    return unique
+
+
+def merge_sections(role: str, level: str, parts: Dict[str, dict]) -> dict:
+    kit = {"role": role, "level": level}
+    for part in parts.values():
+        for key, value in part.items():
+            if key not in ("role", "level"):
+                kit[key] = value
+    for key in ("technical_questions", "behavioral_questions"):
+        kit[key] = dedupe_questions(kit.get(key, []))
+    kit.setdefault("evaluation_rubric", [])
+    kit.setdefault("interview_tips", [])
+    return kit
@@ -0,0 +1,139 @@
+"""Compare token use and latency of the standard and compact prompt modes.
+
+Usage:
+    python prompt_compare.py [--roles "Backend Engineer,Data Scientist"] [--levels Junior,Senior]
+    python prompt_compare.py --api-key KEY [--json report.json]
+
+Without an API key only the prompts are compared, using the local token
+estimate. With a key every role/level combination is generated once per
+mode (uncached) and the report adds the prompt/output tokens and latency
+reported by the model, plus whether each kit passed schema validation.
+"""
+import argparse
+import json
+import os
+import sys
+from typing import List, Optional
+
+from gemini_client import GeminiClientPool
+from kit_core import (
+    DEFAULT_N_BEH, DEFAULT_N_TECH, EXAMPLE_ROLES, LEVELS, build_compact_prompt, build_prompt,
+    call_gemini_json, system_instruction,
+)
+from kit_schema import validate_kit
+from rate_limit import DEFAULT_RPM, RateLimiter, estimate_tokens
+from token_usage import UsageLedger
+
+MODES = ("standard", "compact")
+METRICS = ("estimated_prompt_tokens", "prompt_tokens", "output_tokens", "total_tokens", "seconds")
+
+
+def build_for_mode(mode: str, role: str, level: str, focus: str, n_tech: int, n_beh: int) -> str:
+    build = build_compact_prompt if mode == "compact" else build_prompt
+    return build(role, level, focus, n_tech, n_beh)
+
+
+def measure(
+    mode: str,
+    role: str,
+    level: str,
+    focus: str = "",
+    n_tech: int = DEFAULT_N_TECH,
+    n_beh: int = DEFAULT_N_BEH,
+    api_key: Optional[str] = None,
+    pool: Optional[GeminiClientPool] = None,
+    limiter: Optional[RateLimiter] = None,
+) -> dict:
+    compact = mode == "compact"
+    prompt = build_for_mode(mode, role, level, focus, n_tech, n_beh)
+    result = {
+        "mode": mode, "role": role, "level": level,
+        "estimated_prompt_tokens": estimate_tokens(system_instruction(compact) + prompt),
+    }
+    if not api_key:
+        return result
+
+    ledger = UsageLedger()
+    try:
+        kit = call_gemini_json(prompt, api_key, pool, None, limiter, ledger, compact)
+    except Exception as e:
+        return dict(result, error=f"{type(e).__name__}: {e}")
+    usage = ledger.records()[-1]
+    return dict(
+        result,
+        prompt_tokens=usage.prompt_tokens, output_tokens=usage.output_tokens,
+        total_tokens=usage.total_tokens, seconds=round(usage.seconds, 3),
+        issues=[str(i) for i in validate_kit(kit, n_tech, n_beh)],
+    )
+
+
+def _totals(rows: List[dict]) -> dict:
+    ok = [r for r in rows if "error" not in r]
+    totals = {"runs": len(rows), "errors": len(rows) - len(ok)}
+    for metric in METRICS:
+        values = [r[metric] for r in ok if metric in r]
+        if values:
+            totals[metric] = round(sum(values), 3)
+    if any("issues" in r for r in ok):
+        totals["valid_kits"] = sum(1 for r in ok if not r.get("issues"))
+    return totals
+
+
+def compare(
+    roles: List[str],
+    levels: List[str],
+    api_key: Optional[str] = None,
+    rpm: float = DEFAULT_RPM,
+    log=print,
+    pool: Optional[GeminiClientPool] = None,
+) -> dict:
+    if pool is None and api_key:
+        pool = GeminiClientPool()
+    limiter = RateLimiter(rpm, max_wait=float("inf")) if api_key else None
+    runs = []
+    for role in roles:
+        for level in levels:
+            for mode in MODES:
+                run = measure(mode, role, level, api_key=api_key, pool=pool, limiter=limiter)
+                runs.append(run)
+                log(f"{mode:>8}  {role} ({level}): "
+                    + ", ".join(f"{m}={run[m]}" for m in METRICS if m in run)
+                    + (f" error={run['error']}" if "error" in run else ""))
+
+    totals = {mode: _totals([r for r in runs if r["mode"] == mode]) for mode in MODES}
+    savings = {}
+    for metric in METRICS:
+        before, after = totals["standard"].get(metric), totals["compact"].get(metric)
+        # A mode whose runs all failed has no totals to compare.
+        if before and after is not None:
+            savings[metric] = round(100.0 * (before - after) / before, 1)
+    return {"runs": runs, "totals": totals, "savings_percent": savings}
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Compare standard and compact prompt modes.")
+    parser.add_argument("--roles", default=",".join(EXAMPLE_ROLES))
+    parser.add_argument("--levels", default=",".join(LEVELS))
+    parser.add_argument("--api-key", default=os.environ.get("GEMINI_API_KEY"),
+                        help="measure real calls with this key (default: $GEMINI_API_KEY; none = estimate only)")
+    parser.add_argument("--rpm", type=float, default=DEFAULT_RPM)
+    parser.add_argument("--json", dest="json_path", help="write the full report to this file")
+    args = parser.parse_args(argv)
+
+    roles = [r.strip() for r in args.roles.split(",") if r.strip()]
+    levels = [lv.strip() for lv in args.levels.split(",") if lv.strip()]
+    unknown = [lv for lv in levels if lv not in LEVELS]
+    if unknown:
+        parser.error(f"unknown level(s): {', '.join(unknown)}")
+
+    report = compare(roles, levels, args.api_key, args.rpm)
+    if args.json_path:
+        with open(args.json_path, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    print("Savings (compact vs standard): "
+          + ", ".join(f"{m} {p:.1f}% saved" for m, p in report["savings_percent"].items()))
+    return 0 if all(t["errors"] == 0 for t in report["totals"].values()) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
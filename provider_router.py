@@ -0,0 +1,401 @@
+import itertools
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from typing import Iterator, List, Optional
+
+from rate_limit import RateLimiter, estimate_tokens
+from telemetry import METRICS, inc
+
+DEFAULT_WINDOW = 50
+MIN_SAMPLES = 5
+MAX_ERROR_RATE = 0.5
+FAILURE_STREAK = 3
+COOLDOWN_SECONDS = 30.0
+EXPLORE_EVERY = 20
+HEDGE_QUANTILE = 0.95
+MAX_HEDGE_SECONDS = 10.0
+MIN_HEDGE_SECONDS = 1.0
+HEDGE_WORKERS = 8
+
+
+CALLER_ERROR_CODES = (400, 401, 403)
+CALLER_ERROR_MARKERS = (
+    "api_key_invalid", "api key not valid", "invalid api key", "invalidargument", "invalid argument",
+    "permissiondenied", "permission denied", "unauthenticated", "authenticationerror",
+)
+
+
+def is_caller_error(exc: Exception) -> bool:
+    """Auth and invalid-argument failures: the request is at fault, not the provider."""
+    for attr in ("code", "status_code"):
+        code = getattr(exc, attr, None)
+        if isinstance(code, int) and code in CALLER_ERROR_CODES:
+            return True
+    text = f"{type(exc).__name__} {exc}".lower()
+    return any(marker in text for marker in CALLER_ERROR_MARKERS)
+
+
+class ProviderConfigError(ValueError):
+    """``KIT_PROVIDERS`` names a provider that is unknown or missing its settings."""
+
+
+@dataclass
+class Provider:
+    """One backend pool. ``api_key``/``model_name`` override the caller's when set.
+
+    Responses from a provider that is not ``persistent`` (the offline
+    stand-in) are never cached or stored.
+    """
+    name: str
+    pool: object
+    api_key: Optional[str] = None
+    model_name: Optional[str] = None
+    persistent: bool = True
+
+    def cache_scope(self, model_name: str) -> str:
+        return f"{self.name}/{self.model_name or model_name}"
+
+
+class ProviderStats:
+    """Rolling latency and outcome window for one provider."""
+
+    def __init__(self, window: int = DEFAULT_WINDOW):
+        self._samples: "deque[tuple]" = deque(maxlen=window)
+        self._lock = threading.Lock()
+        self.streak = 0
+        self.cooldown_until = 0.0
+
+    def record(self, seconds: float, ok: bool) -> None:
+        with self._lock:
+            self._samples.append((seconds, ok))
+            self.streak = 0 if ok else self.streak + 1
+            if self.streak >= FAILURE_STREAK:
+                self.cooldown_until = time.monotonic() + COOLDOWN_SECONDS
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            samples = list(self._samples)
+            cooldown = max(0.0, self.cooldown_until - time.monotonic())
+        latencies = sorted(s for s, ok in samples if ok)
+        errors = sum(1 for _, ok in samples if not ok)
+
+        def quantile(q: float) -> Optional[float]:
+            if not latencies:
+                return None
+            return latencies[min(len(latencies) - 1, int(q * len(latencies)))]
+
+        error_rate = errors / len(samples) if samples else 0.0
+        return {
+            "samples": len(samples), "p50": quantile(0.5), "p95": quantile(HEDGE_QUANTILE),
+            "error_rate": error_rate, "cooldown": cooldown,
+            "healthy": cooldown == 0.0 and (len(samples) < MIN_SAMPLES or error_rate < MAX_ERROR_RATE),
+        }
+
+
+class RoutedResponse:
+    """A provider's response, tagged with the provider and model that served it.
+
+    For streams the first chunk has already arrived; iterating yields it and
+    then the rest of the provider's stream.
+    """
+
+    def __init__(self, response, provider: Provider, model_name: str, chunks: Optional[Iterator] = None):
+        self._response = response
+        self._chunks = chunks
+        self.provider = provider.name
+        self.cache_scope = provider.cache_scope(model_name)
+        self.persistent = provider.persistent
+
+    @property
+    def text(self) -> str:
+        return self._response.text
+
+    @property
+    def usage_metadata(self):
+        # Streams only know their usage once fully read.
+        return getattr(self._response, "usage_metadata", None)
+
+    def __iter__(self):
+        return self._chunks if self._chunks is not None else iter(self._response)
+
+
+class RoutedModel:
+    def __init__(self, router: "ProviderRouter", api_key: str, model_name: str, system_instruction: str):
+        self._router = router
+        self._api_key = api_key
+        self._model_name = model_name
+        self._system_instruction = system_instruction
+
+    def generate_content(self, prompt: str, stream: bool = False, generation_config=None):
+        return self._router.generate(
+            self._api_key, self._model_name, self._system_instruction, prompt, stream, generation_config,
+        )
+
+
+class ProviderRouter:
+    """Routes each request to the fastest healthy provider, with failover and hedging.
+
+    Has the ``GeminiClientPool`` interface, so it can be passed anywhere the
+    core expects a pool. Providers are ranked by rolling p50 latency among
+    the healthy ones; a provider with fewer than ``MIN_SAMPLES`` results
+    ranks first, and every ``EXPLORE_EVERY``-th request goes to the
+    runner-up, so a slow start or stale numbers never lock a provider out. A
+    provider is unhealthy while its recent error rate is at or above
+    ``MAX_ERROR_RATE`` or after ``FAILURE_STREAK`` failures in a row, for
+    ``COOLDOWN_SECONDS``. A failed request moves on to the next provider,
+    unless ``is_caller_error`` says the request itself was at fault (a bad
+    API key, a denied permission, an invalid argument): that is raised
+    as-is and does not count against the provider's health.
+    Non-persistent providers (the offline stand-in) are a last resort: they
+    rank after every real provider whatever their latency.
+    With ``hedge`` on, a non-streamed request still running after the
+    primary's p95 latency (capped at ``MAX_HEDGE_SECONDS``) is raced
+    against the next provider and the first answer wins. The extra request
+    is only sent when ``limiter`` has room for it right away, and the loser
+    is cancelled if it has not started (an HTTP call already in flight runs
+    to completion and its answer is dropped). Streams are timed to their
+    first chunk and fail over until one arrives, but are not hedged.
+    """
+
+    def __init__(
+        self,
+        providers: List[Provider],
+        hedge: bool = False,
+        window: int = DEFAULT_WINDOW,
+        limiter: Optional[RateLimiter] = None,
+    ):
+        if not providers:
+            raise ValueError("at least one provider is required")
+        self.providers = providers
+        self.hedge = hedge
+        self.limiter = limiter
+        self._stats = {p.name: ProviderStats(window) for p in providers}
+        self._executor = ThreadPoolExecutor(max_workers=HEDGE_WORKERS, thread_name_prefix="kit-hedge")
+        self._requests = 0
+        self._lock = threading.Lock()
+
+    # ── Pool interface ──────────────────────
+    def model(self, api_key: str, model_name: str, system_instruction: str) -> RoutedModel:
+        return RoutedModel(self, api_key, model_name, system_instruction)
+
+    def invalidate(self, api_key: str) -> None:
+        for p in self.providers:
+            if p.api_key is None:
+                p.pool.invalidate(api_key)
+
+    def __len__(self) -> int:
+        return sum(len(p.pool) for p in self.providers)
+
+    def cache_scopes(self, model_name: str) -> List[str]:
+        """Cache namespaces of the persistent providers, in routing order."""
+        return [p.cache_scope(model_name) for p in self.ranked() if p.persistent]
+
+    # ── Routing ─────────────────────────────
+    def ranked(self) -> List[Provider]:
+        """Providers in the order to try them.
+
+        Non-persistent providers always follow the real ones, and only move
+        ahead while every real provider is in cooldown.
+        """
+        snaps = {p.name: self._stats[p.name].snapshot() for p in self.providers}
+        real_down = all(snaps[p.name]["cooldown"] > 0 for p in self.providers if p.persistent)
+
+        def key(p: Provider):
+            s = snaps[p.name]
+            measured = s["samples"] >= MIN_SAMPLES and s["p50"] is not None
+            return (p.persistent == real_down, not s["healthy"], s["cooldown"], s["p50"] if measured else 0.0)
+
+        return sorted(self.providers, key=key)
+
+    def _route(self) -> List[Provider]:
+        order = self.ranked()
+        with self._lock:
+            self._requests += 1
+            explore = self._requests % EXPLORE_EVERY == 0
+        if (explore and len(order) > 1 and order[1].persistent == order[0].persistent
+                and self._stats[order[1].name].snapshot()["healthy"]):
+            order[0], order[1] = order[1], order[0]
+        return order
+
+    def hedge_delay(self, provider: Provider) -> float:
+        snap = self._stats[provider.name].snapshot()
+        if snap["samples"] < MIN_SAMPLES or snap["p95"] is None:
+            return MAX_HEDGE_SECONDS
+        return min(MAX_HEDGE_SECONDS, max(MIN_HEDGE_SECONDS, snap["p95"]))
+
+    def health(self) -> List[dict]:
+        return [dict(self._stats[p.name].snapshot(), provider=p.name) for p in self.ranked()]
+
+    def _call(self, provider: Provider, api_key, model_name, instruction, prompt, stream, config):
+        started = time.monotonic()
+        model_name = provider.model_name or model_name
+        chunks = None
+        try:
+            model = provider.pool.model(provider.api_key or api_key, model_name, instruction)
+            response = model.generate_content(prompt, stream=stream, generation_config=config)
+            if stream:
+                # Streams are lazy: the provider has only answered once the
+                # first chunk is in, so that is what is timed and failed over.
+                chunks = iter(response)
+                first = next(chunks, None)
+                chunks = self._read_stream(provider, itertools.chain([first] if first is not None else [], chunks))
+        except Exception as e:
+            if is_caller_error(e):
+                # One caller's bad key or request says nothing about the provider.
+                inc("provider_calls", provider=provider.name, outcome="rejected", error=type(e).__name__)
+            else:
+                self._failed(provider, time.monotonic() - started, e)
+            raise
+        seconds = time.monotonic() - started
+        self._stats[provider.name].record(seconds, True)
+        METRICS.observe("provider_call", seconds, provider=provider.name)
+        inc("provider_calls", provider=provider.name, outcome="ok")
+        return RoutedResponse(response, provider, model_name, chunks)
+
+    def _read_stream(self, provider: Provider, chunks: Iterator) -> Iterator:
+        started = time.monotonic()
+        try:
+            yield from chunks
+        except Exception as e:
+            # Too late to fail over; count it against the provider and surface it.
+            if not is_caller_error(e):
+                self._failed(provider, time.monotonic() - started, e)
+            raise
+
+    def _failed(self, provider: Provider, seconds: float, error: Exception) -> None:
+        self._stats[provider.name].record(seconds, False)
+        inc("provider_calls", provider=provider.name, outcome="failed", error=type(error).__name__)
+
+    def _failover(self, order: List[Provider], *request, cancelled: Optional[threading.Event] = None):
+        error = None
+        for provider in order:
+            if cancelled is not None and cancelled.is_set():
+                break
+            try:
+                return self._call(provider, *request)
+            except Exception as e:
+                if is_caller_error(e):
+                    # Another provider would fail the same request, or serve it on the operator's key.
+                    raise
+                error = e
+        raise error or RuntimeError("hedged request cancelled")
+
+    def _after_primary(self, primary, order: List[Provider], *request):
+        """Result of a finished primary, failing over unless the caller was at fault."""
+        error = primary.exception()
+        if error is None:
+            return primary.result()
+        if is_caller_error(error):
+            raise error
+        return self._failover(order[1:], *request)
+
+    def _admit_hedge(self, api_key: str, instruction: str, prompt: str) -> bool:
+        """Reserve rate-limit capacity for a hedge; never waits for it."""
+        if self.limiter is None:
+            return True
+        return self.limiter.try_acquire(api_key, estimate_tokens(instruction + prompt))
+
+    def generate(self, api_key, model_name, instruction, prompt, stream=False, config=None):
+        order = self._route()
+        request = (api_key, model_name, instruction, prompt, stream, config)
+        # Only ever hedge against another real provider.
+        if not self.hedge or stream or len(order) < 2 or not order[1].persistent:
+            return self._failover(order, *request)
+
+        primary = self._executor.submit(self._call, order[0], *request)
+        done, _ = wait([primary], timeout=self.hedge_delay(order[0]))
+        if done:
+            return self._after_primary(primary, order, *request)
+        if not self._admit_hedge(api_key, instruction, prompt):
+            inc("hedges_skipped", provider=order[0].name)
+            wait([primary])
+            return self._after_primary(primary, order, *request)
+
+        # The primary is slower than its own p95: race the rest of the order.
+        inc("hedges", provider=order[0].name)
+        cancelled = threading.Event()
+        backup = self._executor.submit(self._failover, order[1:], *request, cancelled=cancelled)
+        pending, error = {primary, backup}, None
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for fut in done:
+                if fut.exception() is None:
+                    cancelled.set()
+                    for loser in pending:
+                        loser.cancel()
+                    inc("hedge_wins", winner="primary" if fut is primary else "backup")
+                    return fut.result()
+                error = fut.exception()
+                if is_caller_error(error):
+                    cancelled.set()
+                    raise error
+        raise error
+
+
+class TrackingPool:
+    """Wraps a pool for one unit of work and notes whether its answers may be kept.
+
+    ``persistent`` turns False once any response comes from a provider that
+    is not persistent, so the caller can keep the result out of the cache,
+    the question bank, the catalog and history.
+    """
+
+    def __init__(self, pool):
+        self.pool = pool
+        self.persistent = True
+
+    def model(self, api_key: str, model_name: str, system_instruction: str) -> "_TrackedModel":
+        return _TrackedModel(self, self.pool.model(api_key, model_name, system_instruction))
+
+    def invalidate(self, api_key: str) -> None:
+        self.pool.invalidate(api_key)
+
+    def __len__(self) -> int:
+        return len(self.pool)
+
+    def cache_scopes(self, model_name: str) -> List[str]:
+        scopes = getattr(self.pool, "cache_scopes", None)
+        return scopes(model_name) if scopes is not None else [model_name]
+
+
+class _TrackedModel:
+    def __init__(self, tracker: TrackingPool, model):
+        self._tracker = tracker
+        self._model = model
+
+    def generate_content(self, prompt: str, stream: bool = False, generation_config=None):
+        response = self._model.generate_content(prompt, stream=stream, generation_config=generation_config)
+        if not getattr(response, "persistent", True):
+            self._tracker.persistent = False
+        return response
+
+
+def router_from_env(gemini_pool, limiter: Optional[RateLimiter] = None) -> ProviderRouter:
+    """Providers from ``KIT_PROVIDERS`` (comma-separated: gemini, anthropic, local).
+
+    ``anthropic`` needs ``ANTHROPIC_API_KEY``; ``local`` is the offline
+    stand-in from ``fake_gemini`` and is never cached or stored.
+    ``KIT_HEDGE=1`` turns hedging on; hedges draw on ``limiter``.
+    """
+    providers = []
+    for name in [n.strip() for n in os.environ.get("KIT_PROVIDERS", "gemini").split(",") if n.strip()]:
+        if name == "gemini":
+            providers.append(Provider("gemini", gemini_pool))
+        elif name == "anthropic":
+            api_key = os.environ.get("ANTHROPIC_API_KEY", "").strip()
+            if not api_key:
+                raise ProviderConfigError("KIT_PROVIDERS includes anthropic but ANTHROPIC_API_KEY is not set")
+            from anthropic_client import AnthropicClientPool
+            pool = AnthropicClientPool()
+            providers.append(Provider("anthropic", pool, api_key=api_key, model_name=pool.model_name))
+        elif name == "local":
+            from fake_gemini import FakeBackend, FakeGeminiPool
+            providers.append(Provider("local", FakeGeminiPool(FakeBackend()), persistent=False))
+        else:
+            raise ProviderConfigError(f"unknown provider '{name}' in KIT_PROVIDERS")
+    hedge = os.environ.get("KIT_HEDGE", "").lower() in ("1", "true", "yes")
+    return ProviderRouter(providers, hedge=hedge, limiter=limiter)
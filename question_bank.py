@@ -0,0 +1,255 @@
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from typing import Callable, List, Optional
+
+import numpy as np
+
+DEFAULT_BANK_PATH = os.environ.get("QUESTION_BANK_PATH", os.path.join(".cache", "question_bank.sqlite3"))
+EMBED_DIM = 256
+DUPLICATE_THRESHOLD = 0.9
+ROLE_MATCH_THRESHOLD = 0.6
+FOCUS_MATCH_THRESHOLD = 0.3
+SECTIONS = ("technical_questions", "behavioral_questions")
+
+_TOKEN = re.compile(r"[a-z0-9+#]+")
+_STOPWORDS = frozenset(
+    "a an and are as at be by can do does for from how i in is it of on or "
+    "that the this to was what when where which who why will with you your".split()
+)
+
+
+def embed_text(text: str, dim: int = EMBED_DIM) -> np.ndarray:
+    """Signed feature-hashing of word unigrams and bigrams, L2-normalised."""
+    tokens = [t for t in _TOKEN.findall(text.lower()) if t not in _STOPWORDS]
+    vec = np.zeros(dim, dtype=np.float32)
+    for feature in tokens + [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]:
+        h = int.from_bytes(hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest(), "little")
+        vec[h % dim] += -1.0 if h >> 63 else 1.0
+    norm = float(np.linalg.norm(vec))
+    return vec / norm if norm else vec
+
+
+def _question_text(section: str, q: dict) -> str:
+    if section == "technical_questions":
+        extra = q.get("expected_topics") or []
+    else:
+        extra = [q.get("competency") or ""]
+    return " ".join([q["question"], *map(str, extra)])
+
+
+def _norm(text: str) -> str:
+    return " ".join(text.lower().split())
+
+
+def _grow(array: np.ndarray, size: int) -> np.ndarray:
+    grown = np.zeros((size,) + array.shape[1:], dtype=array.dtype)
+    grown[:len(array)] = array
+    return grown
+
+
+class QuestionBank:
+    """Local store of every generated question with a brute-force vector index.
+
+    Vectors live in SQLite next to the question and are mirrored in one
+    in-memory matrix, so a lookup is a single matrix-vector product.
+    """
+
+    def __init__(self, path: str = DEFAULT_BANK_PATH, embed: Callable[[str], np.ndarray] = embed_text):
+        self.path = path
+        self.embed = embed
+        self._lock = threading.Lock()
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.executescript("""
+            CREATE TABLE IF NOT EXISTS questions (
+                id         INTEGER PRIMARY KEY,
+                section    TEXT NOT NULL,
+                role       TEXT NOT NULL,
+                level      TEXT NOT NULL,
+                focus      TEXT NOT NULL,
+                competency TEXT,
+                difficulty TEXT,
+                topics     TEXT,
+                payload    TEXT NOT NULL,
+                vector     BLOB NOT NULL,
+                created    REAL NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS rubrics (
+                role    TEXT NOT NULL,
+                level   TEXT NOT NULL,
+                focus   TEXT NOT NULL,
+                rubric  TEXT NOT NULL,
+                tips    TEXT NOT NULL,
+                created REAL NOT NULL,
+                PRIMARY KEY (role, level, focus)
+            );
+        """)
+        self._buffer = np.zeros((0, EMBED_DIM), dtype=np.float32)
+        # Per-row index columns, grown with the vector buffer: question id,
+        # section, level code, and role/focus as ids into the label matrix.
+        self._ids = np.zeros(0, dtype=np.int64)
+        self._sections = np.zeros(0, dtype=np.int8)
+        self._levels = np.zeros(0, dtype=np.int32)
+        self._roles = np.zeros(0, dtype=np.int32)
+        self._foci = np.zeros(0, dtype=np.int32)
+        self._size = 0
+        self._level_codes: dict = {}
+        self._label_ids: dict = {}
+        self._labels = np.zeros((0, EMBED_DIM), dtype=np.float32)
+        self._load_index()
+
+    # ── Index ───────────────────────────────
+    def _load_index(self) -> None:
+        rows = self._db.execute(
+            "SELECT id, section, role, level, focus, vector FROM questions ORDER BY id"
+        ).fetchall()
+        for r in rows:
+            self._append(np.frombuffer(r[5], dtype=np.float32), r[:5])
+
+    @property
+    def _vectors(self) -> np.ndarray:
+        return self._buffer[:self._size]
+
+    def _append(self, vec: np.ndarray, meta: tuple) -> None:
+        n = self._size
+        if n == len(self._buffer):
+            size = max(64, 2 * n)
+            self._buffer = _grow(self._buffer, size)
+            self._ids, self._sections, self._levels, self._roles, self._foci = (
+                _grow(a, size) for a in (self._ids, self._sections, self._levels, self._roles, self._foci)
+            )
+        row_id, section, role, level, focus = meta
+        self._buffer[n] = vec
+        self._ids[n] = row_id
+        self._sections[n] = SECTIONS.index(section)
+        self._levels[n] = self._level_codes.setdefault(level, len(self._level_codes))
+        self._roles[n] = self._label_id(role)
+        self._foci[n] = self._label_id(focus)
+        self._size = n + 1
+
+    def _label_id(self, label: str) -> int:
+        """Row of ``label``'s embedding in the label matrix; each distinct role or focus is embedded once."""
+        i = self._label_ids.get(label)
+        if i is None:
+            i = self._label_ids[label] = len(self._label_ids)
+            if i == len(self._labels):
+                self._labels = _grow(self._labels, max(16, 2 * i))
+            self._labels[i] = self.embed(label)
+        return i
+
+    def _mask(self, section: str, level: Optional[str] = None) -> np.ndarray:
+        mask = self._sections[:self._size] == SECTIONS.index(section)
+        if level is not None:
+            mask &= self._levels[:self._size] == self._level_codes.get(level, -1)
+        return mask
+
+    # ── Writes ──────────────────────────────
+    def add_kit(self, kit: dict, focus: str = "") -> int:
+        """Store every question of ``kit`` that is not a near-duplicate. Returns the count added."""
+        role, level, now = kit.get("role", ""), kit.get("level", ""), time.time()
+        added = 0
+        with self._lock:
+            for section in SECTIONS:
+                # One mask per section and kit; questions added from this kit
+                # are checked separately, so duplicates within it are caught too.
+                existing = self._vectors[self._mask(section)]
+                fresh: List[np.ndarray] = []
+                for q in kit.get(section) or []:
+                    if not isinstance(q, dict) or not q.get("question"):
+                        continue
+                    vec = self.embed(_question_text(section, q))
+                    if len(existing) and float((existing @ vec).max()) >= DUPLICATE_THRESHOLD:
+                        continue
+                    if fresh and float((np.stack(fresh) @ vec).max()) >= DUPLICATE_THRESHOLD:
+                        continue
+                    payload = {k: v for k, v in q.items() if k != "id"}
+                    cur = self._db.execute(
+                        "INSERT INTO questions (section, role, level, focus, competency, difficulty, "
+                        "topics, payload, vector, created) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                        (section, role, level, focus, q.get("competency"), q.get("difficulty"),
+                         json.dumps(q.get("expected_topics") or []), json.dumps(payload),
+                         vec.astype(np.float32).tobytes(), now),
+                    )
+                    self._append(vec, (cur.lastrowid, section, role, level, focus))
+                    fresh.append(vec)
+                    added += 1
+
+            if kit.get("evaluation_rubric") and kit.get("interview_tips"):
+                self._db.execute(
+                    "INSERT OR REPLACE INTO rubrics (role, level, focus, rubric, tips, created) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    (_norm(role), level, _norm(focus), json.dumps(kit["evaluation_rubric"]),
+                     json.dumps(kit["interview_tips"]), now),
+                )
+        return added
+
+    # ── Lookup ──────────────────────────────
+    def find(self, section: str, role: str, level: str, focus: str, n: int) -> List[dict]:
+        """Best ``n`` distinct banked questions for this role/level/focus."""
+        if n <= 0:
+            return []
+        with self._lock:
+            mask = self._mask(section, level)
+            if not mask.any():
+                return []
+            rows = np.flatnonzero(mask)
+            labels = self._labels[:len(self._label_ids)]
+            role_sim = (labels @ self.embed(role))[self._roles[rows]]
+            score = role_sim
+            keep = role_sim >= ROLE_MATCH_THRESHOLD
+            if focus.strip():
+                focus_vec = self.embed(focus)
+                focus_sim = np.maximum(self._vectors[rows] @ focus_vec, (labels @ focus_vec)[self._foci[rows]])
+                keep &= focus_sim >= FOCUS_MATCH_THRESHOLD
+                score = role_sim * (0.5 + 0.5 * focus_sim)
+
+            picked: List[int] = []
+            for j in np.argsort(-score):
+                if not keep[j]:
+                    continue
+                row = rows[j]
+                if picked and float((self._vectors[picked] @ self._vectors[row]).max()) >= DUPLICATE_THRESHOLD:
+                    continue
+                picked.append(row)
+                if len(picked) == n:
+                    break
+            ids = [int(self._ids[i]) for i in picked]
+            if not ids:
+                return []
+            marks = ",".join("?" * len(ids))
+            payloads = dict(self._db.execute(
+                f"SELECT id, payload FROM questions WHERE id IN ({marks})", ids
+            ).fetchall())
+        return [json.loads(payloads[i]) for i in ids]
+
+    def assemble(self, role: str, level: str, focus: str, n_tech: int, n_beh: int) -> Optional[dict]:
+        """Partial kit built from the bank, or None when nothing matches."""
+        tech = self.find("technical_questions", role, level, focus, n_tech)
+        beh = self.find("behavioral_questions", role, level, focus, n_beh)
+        with self._lock:
+            row = self._db.execute(
+                "SELECT rubric, tips FROM rubrics WHERE role = ? AND level = ? AND focus = ?",
+                (_norm(role), level, _norm(focus)),
+            ).fetchone()
+        if not tech and not beh and row is None:
+            return None
+        kit = {
+            "role": role, "level": level,
+            "technical_questions": [dict(q, id=i) for i, q in enumerate(tech, 1)],
+            "behavioral_questions": [dict(q, id=i) for i, q in enumerate(beh, 1)],
+        }
+        if row is not None:
+            kit["evaluation_rubric"], kit["interview_tips"] = json.loads(row[0]), json.loads(row[1])
+        return kit
+
+    def stats(self) -> dict:
+        with self._lock:
+            counts = {s: int(self._mask(s).sum()) for s in SECTIONS}
+        return dict(counts, total=sum(counts.values()))
@@ -0,0 +1,156 @@
+import random
+import re
+import threading
+import time
+from typing import Callable, Optional
+
+DEFAULT_RPM = 15
+DEFAULT_TPM = 1_000_000
+DEFAULT_BURST = 3
+DEFAULT_MAX_WAIT_SECONDS = 60.0
+DEFAULT_RETRIES = 4
+BASE_BACKOFF_SECONDS = 1.0
+MAX_BACKOFF_SECONDS = 30.0
+
+RETRYABLE_MARKERS = (
+    "429", "resource exhausted", "resourceexhausted", "quota", "rate limit",
+    "500", "502", "503", "504", "internal server error", "internalservererror",
+    "unavailable", "deadline exceeded", "overloaded",
+)
+RETRY_HINT_PATTERNS = (
+    re.compile(r"retry_delay\s*\{\s*seconds:\s*(\d+)", re.IGNORECASE),
+    re.compile(r"retry in ([\d.]+)\s*s", re.IGNORECASE),
+    re.compile(r"retry-after:?\s*([\d.]+)", re.IGNORECASE),
+)
+
+
+class RateLimitExceeded(Exception):
+    pass
+
+
+def estimate_tokens(text: str) -> int:
+    return max(1, len(text) // 4)
+
+
+class RateLimiter:
+    """Per-key token buckets for requests/min and tokens/min.
+
+    ``acquire`` reserves capacity in both buckets and sleeps until it is
+    due, which queues concurrent callers on the same key behind each other
+    instead of letting them burst into quota errors. A caller whose turn
+    would come more than ``max_wait`` seconds out is rejected up front.
+    """
+
+    def __init__(
+        self,
+        requests_per_minute: float = DEFAULT_RPM,
+        tokens_per_minute: Optional[float] = DEFAULT_TPM,
+        burst: int = DEFAULT_BURST,
+        max_wait: float = DEFAULT_MAX_WAIT_SECONDS,
+    ):
+        self.rate = requests_per_minute / 60.0
+        self.token_rate = tokens_per_minute / 60.0 if tokens_per_minute else None
+        self.burst = burst
+        self.token_burst = tokens_per_minute or 0
+        self.max_wait = max_wait
+        self._buckets: dict = {}
+        self._lock = threading.Lock()
+
+    def _refill(self, key: str, now: float) -> list:
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            bucket = self._buckets[key] = [float(self.burst), float(self.token_burst), now]
+        elapsed = now - bucket[2]
+        bucket[0] = min(float(self.burst), bucket[0] + elapsed * self.rate)
+        if self.token_rate:
+            bucket[1] = min(float(self.token_burst), bucket[1] + elapsed * self.token_rate)
+        bucket[2] = now
+        return bucket
+
+    def _reserve(self, key: str, tokens: int, max_wait: float) -> float:
+        with self._lock:
+            bucket = self._refill(key, time.monotonic())
+            requests_left = bucket[0] - 1.0
+            tokens_left = bucket[1] - tokens
+            wait = -requests_left / self.rate if requests_left < 0 else 0.0
+            if self.token_rate and tokens_left < 0:
+                wait = max(wait, -tokens_left / self.token_rate)
+            if wait > max_wait:
+                raise RateLimitExceeded(
+                    f"Too many queued requests for this API key; retry in {wait:.0f}s."
+                )
+            bucket[0] = requests_left
+            if self.token_rate:
+                bucket[1] = tokens_left
+        return wait
+
+    def acquire(self, key: str, tokens: int = 0) -> float:
+        wait = self._reserve(key, tokens, self.max_wait)
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+    def try_acquire(self, key: str, tokens: int = 0) -> bool:
+        """Reserve capacity only if it is available now; never sleeps."""
+        try:
+            self._reserve(key, tokens, 0.0)
+        except RateLimitExceeded:
+            return False
+        return True
+
+    def settle(self, key: str, extra_tokens: int) -> None:
+        """Charge (or refund, if negative) the difference from an estimate."""
+        if not self.token_rate or not extra_tokens:
+            return
+        with self._lock:
+            bucket = self._refill(key, time.monotonic())
+            bucket[1] = min(float(self.token_burst), bucket[1] - extra_tokens)
+
+
+def is_retryable(exc: Exception) -> bool:
+    if isinstance(exc, RateLimitExceeded):
+        return False
+    code = getattr(exc, "code", None)
+    if isinstance(code, int):
+        return code == 429 or 500 <= code < 600
+    text = f"{type(exc).__name__} {exc}".lower()
+    if "api_key_invalid" in text or "per day" in text:
+        return False
+    return any(marker in text for marker in RETRYABLE_MARKERS)
+
+
+def retry_hint(exc: Exception) -> Optional[float]:
+    delay = getattr(exc, "retry_after", None)
+    if isinstance(delay, (int, float)):
+        return float(delay)
+    text = str(exc)
+    for pattern in RETRY_HINT_PATTERNS:
+        match = pattern.search(text)
+        if match:
+            return float(match.group(1))
+    return None
+
+
+def call_with_retry(
+    fn: Callable[[], object],
+    retries: int = DEFAULT_RETRIES,
+    base_delay: float = BASE_BACKOFF_SECONDS,
+    max_delay: float = MAX_BACKOFF_SECONDS,
+    sleep: Callable[[float], None] = time.sleep,
+):
+    """Call ``fn`` and retry 429/5xx failures with full-jitter exponential backoff.
+
+    A server-provided retry hint, when present, is used as the lower bound
+    for the delay.
+    """
+    for attempt in range(retries + 1):
+        try:
+            return fn()
+        except Exception as e:
+            if attempt == retries or not is_retryable(e):
+                raise
+            delay = random.uniform(0, min(max_delay, base_delay * 2 ** attempt))
+            hint = retry_hint(e)
+            if hint is not None:
+                delay = max(delay, min(hint, max_delay))
+            sleep(delay)
@@ -0,0 +1,444 @@
+"""Candidate scorecards against a kit's evaluation rubric, and panel reports.
+
+Usage:
+    python scorecards.py [--kit-id ID] [--since 2026-07-01] [--until 2026-10-01] [--csv candidates.csv]
+
+Prints every candidate's weighted total across the panel (mean, variance,
+range and recommendations) and each interviewer's calibration drift, for
+the scorecards recorded in ``KIT_SCORES_PATH`` within the date range.
+Scorecards belong to a kit's lineage (every version regenerated from it in
+the kit history), so ``--kit-id`` may name any of its versions.
+"""
+import argparse
+import csv
+import json
+import os
+import sqlite3
+import sys
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from kit_history import DEFAULT_HISTORY_PATH, KitHistory
+from kit_schema import parse_weight
+
+DEFAULT_SCORES_PATH = os.environ.get("KIT_SCORES_PATH", os.path.join(".cache", "scorecards.sqlite3"))
+SCORE_RANGE = (1, 5)
+RECOMMENDATIONS = ("Strong Hire", "Hire", "No Hire", "Strong No Hire")
+
+
+# ─────────────────────────────────────────────
+# Rubrics
+# ─────────────────────────────────────────────
+@dataclass
+class Rubric:
+    lineage: str  # the kit history lineage the rubric was registered for
+    role: str
+    level: str
+    criteria: Tuple[str, ...]
+    weights: np.ndarray  # float64, sums to 1
+
+
+def rubric_weights(rubric: list) -> np.ndarray:
+    """Numeric weights for the ``evaluation_rubric`` entries, normalised to sum to 1.
+
+    A criterion whose weight has no number gets the mean of the others, and
+    equal weights are used when none has one.
+    """
+    parsed = np.array([parse_weight(r.get("weight")) for r in rubric], dtype=np.float64)
+    known = ~np.isnan(parsed) & (parsed > 0)
+    parsed[~known] = parsed[known].mean() if known.any() else 1.0
+    return parsed / parsed.sum()
+
+
+# ─────────────────────────────────────────────
+# Score matrix & aggregates
+# ─────────────────────────────────────────────
+@dataclass
+class ScoreMatrix:
+    """Scorecards as aligned arrays, one row per scorecard.
+
+    ``scores`` and ``weights`` are padded to the widest rubric: an unscored
+    or absent criterion is NaN in ``scores`` and 0 in ``weights``.
+    Candidates are per kit lineage; ``candidate_index`` points into
+    ``candidates`` and ``candidate_lineages``.
+    """
+    card_ids: np.ndarray
+    lineages: np.ndarray  # object array of lineage ids
+    created: np.ndarray
+    candidate_index: np.ndarray
+    candidates: List[str]
+    candidate_lineages: List[str]
+    interviewer_index: np.ndarray
+    interviewers: List[str]
+    recommendation_index: np.ndarray  # into RECOMMENDATIONS, -1 when none
+    scores: np.ndarray
+    weights: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.card_ids)
+
+    @property
+    def totals(self) -> np.ndarray:
+        return weighted_totals(self.scores, self.weights)
+
+
+def weighted_totals(scores: np.ndarray, weights: np.ndarray) -> np.ndarray:
+    """Weighted mean score per row over the criteria it scored (same 1-5 scale)."""
+    scored = ~np.isnan(scores)
+    w = np.where(scored, weights, 0.0)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return (np.where(scored, scores, 0.0) * w).sum(axis=1) / w.sum(axis=1)
+
+
+@dataclass
+class CandidateSummary:
+    lineage: str
+    candidate: str
+    interviewers: int
+    mean: float
+    variance: float
+    low: float
+    high: float
+    recommendations: Dict[str, int]
+
+
+@dataclass
+class InterviewerDrift:
+    interviewer: str
+    scorecards: int  # scorecards on candidates someone else also scored
+    drift: float     # mean of (own total - the other interviewers' mean); > 0 is lenient
+    spread: float    # standard deviation of those differences
+
+
+def panel_summary(m: ScoreMatrix) -> List[CandidateSummary]:
+    """Per-candidate mean, population variance and range of the weighted totals."""
+    totals, cand, n_cand = m.totals, m.candidate_index, len(m.candidates)
+    counts = np.bincount(cand, minlength=n_cand)
+    mean = np.bincount(cand, totals, n_cand) / np.maximum(counts, 1)
+    variance = np.maximum(np.bincount(cand, totals * totals, n_cand) / np.maximum(counts, 1) - mean * mean, 0.0)
+    low = np.full(n_cand, np.inf)
+    high = np.full(n_cand, -np.inf)
+    np.minimum.at(low, cand, totals)
+    np.maximum.at(high, cand, totals)
+    has = m.recommendation_index >= 0
+    votes = np.bincount(
+        cand[has] * len(RECOMMENDATIONS) + m.recommendation_index[has], minlength=n_cand * len(RECOMMENDATIONS),
+    ).reshape(n_cand, len(RECOMMENDATIONS))
+    return [
+        CandidateSummary(
+            m.candidate_lineages[c], m.candidates[c], int(counts[c]), float(mean[c]), float(variance[c]),
+            float(low[c]), float(high[c]),
+            {r: int(votes[c, i]) for i, r in enumerate(RECOMMENDATIONS) if votes[c, i]},
+        )
+        for c in range(n_cand) if counts[c]
+    ]
+
+
+def criterion_means(m: ScoreMatrix) -> np.ndarray:
+    """Mean score per candidate and criterion position, NaN where nobody scored it."""
+    scored = ~np.isnan(m.scores)
+    sums = np.zeros((len(m.candidates), m.scores.shape[1]))
+    counts = np.zeros_like(sums)
+    np.add.at(sums, m.candidate_index, np.where(scored, m.scores, 0.0))
+    np.add.at(counts, m.candidate_index, scored)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return sums / counts
+
+
+def interviewer_drift(m: ScoreMatrix) -> List[InterviewerDrift]:
+    """How far each interviewer's totals sit from the rest of the panel.
+
+    Each scorecard is compared with the mean of the other scorecards for the
+    same candidate, so a lenient or harsh interviewer does not pull their own
+    baseline. Candidates scored by one interviewer only are left out.
+    """
+    totals, cand, who = m.totals, m.candidate_index, m.interviewer_index
+    n_cand, n_who = len(m.candidates), len(m.interviewers)
+    counts = np.bincount(cand, minlength=n_cand)[cand]
+    sums = np.bincount(cand, totals, n_cand)[cand]
+    panel = counts > 1
+    others = (sums[panel] - totals[panel]) / (counts[panel] - 1)
+    diff = totals[panel] - others
+    n = np.bincount(who[panel], minlength=n_who)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        drift = np.bincount(who[panel], diff, n_who) / n
+        spread = np.sqrt(np.maximum(np.bincount(who[panel], diff * diff, n_who) / n - drift * drift, 0.0))
+    return [
+        InterviewerDrift(m.interviewers[i], int(n[i]), float(drift[i]), float(spread[i]))
+        for i in range(n_who)
+    ]
+
+
+# ─────────────────────────────────────────────
+# Store
+# ─────────────────────────────────────────────
+def _key(name: str) -> str:
+    return " ".join(name.lower().split())
+
+
+class ScoreStore:
+    """Rubric weights and per-criterion candidate scores, in SQLite.
+
+    Everything is keyed by the kit's history lineage rather than a version
+    id, so regenerating questions mid-loop keeps the whole panel together.
+    A lineage's rubric is registered once: its weight strings are parsed
+    then and stored as numbers, so scoring and reports never parse them
+    again. Each interviewer has one scorecard per candidate and lineage;
+    recording it again replaces it. Scores are stored as one float32 row per scorecard
+    aligned with the rubric's criteria, and ``matrix`` loads them into
+    arrays for the aggregates above.
+    """
+
+    def __init__(self, path: str = DEFAULT_SCORES_PATH):
+        self.path = path
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._lock = threading.Lock()
+        self._rubrics: Dict[str, Rubric] = {}
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.executescript("""
+            CREATE TABLE IF NOT EXISTS rubrics (
+                lineage  TEXT PRIMARY KEY,
+                role     TEXT NOT NULL,
+                level    TEXT NOT NULL,
+                criteria TEXT NOT NULL,
+                weights  BLOB NOT NULL,
+                created  REAL NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS scorecards (
+                id              INTEGER PRIMARY KEY,
+                lineage         TEXT NOT NULL,
+                candidate       TEXT NOT NULL,
+                candidate_key   TEXT NOT NULL,
+                interviewer     TEXT NOT NULL,
+                interviewer_key TEXT NOT NULL,
+                scores          BLOB NOT NULL,
+                recommendation  TEXT NOT NULL,
+                notes           TEXT NOT NULL,
+                created         REAL NOT NULL,
+                updated         REAL NOT NULL,
+                UNIQUE (lineage, candidate_key, interviewer_key)
+            );
+            CREATE INDEX IF NOT EXISTS scorecards_created ON scorecards(created);
+        """)
+
+    # ── Rubrics ─────────────────────────────
+    def register(self, lineage: str, kit: dict) -> Rubric:
+        """The stored rubric for ``lineage``, parsing ``kit``'s weights the first time."""
+        rubric = self.rubric(lineage)
+        if rubric is not None:
+            return rubric
+        entries = kit.get("evaluation_rubric") or []
+        if not entries:
+            raise ValueError("This kit has no evaluation rubric to score against.")
+        criteria = [str(r.get("criterion", "")) for r in entries]
+        with self._lock:
+            self._db.execute(
+                "INSERT OR IGNORE INTO rubrics (lineage, role, level, criteria, weights, created) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (lineage, str(kit.get("role", "")), str(kit.get("level", "")),
+                 json.dumps(criteria, ensure_ascii=False), rubric_weights(entries).tobytes(), time.time()),
+            )
+        return self.rubric(lineage)
+
+    def rubric(self, lineage: str) -> Optional[Rubric]:
+        rubric = self._rubrics.get(lineage)
+        if rubric is not None:
+            return rubric
+        with self._lock:
+            row = self._db.execute(
+                "SELECT role, level, criteria, weights FROM rubrics WHERE lineage = ?", (lineage,)
+            ).fetchone()
+        if row is None:
+            return None
+        rubric = Rubric(lineage, row[0], row[1], tuple(json.loads(row[2])), np.frombuffer(row[3], dtype=np.float64))
+        self._rubrics[lineage] = rubric
+        return rubric
+
+    # ── Scorecards ──────────────────────────
+    def record(
+        self,
+        lineage: str,
+        candidate: str,
+        interviewer: str,
+        scores: Dict[str, float],
+        recommendation: str = "",
+        notes: str = "",
+    ) -> int:
+        """Save one interviewer's scores for a candidate; returns the scorecard id.
+
+        ``scores`` maps criterion names to 1-5; criteria left out are unscored
+        and the weighted total is taken over the rest.
+        """
+        rubric = self.rubric(lineage)
+        if rubric is None:
+            raise ValueError(f"No rubric registered for kit lineage {lineage}.")
+        if not candidate.strip() or not interviewer.strip():
+            raise ValueError("Enter both the candidate's and the interviewer's name.")
+        unknown = set(scores) - set(rubric.criteria)
+        if unknown:
+            raise ValueError(f"Not in this rubric: {', '.join(sorted(unknown))}")
+        if not scores:
+            raise ValueError("Score at least one criterion.")
+        low, high = SCORE_RANGE
+        if any(not low <= s <= high for s in scores.values()):
+            raise ValueError(f"Scores must be between {low} and {high}.")
+        if recommendation and recommendation not in RECOMMENDATIONS:
+            raise ValueError(f"Recommendation must be one of {', '.join(RECOMMENDATIONS)}.")
+        row = np.array([scores.get(c, np.nan) for c in rubric.criteria], dtype=np.float32)
+        now = time.time()
+        with self._lock:
+            self._db.execute(
+                "INSERT INTO scorecards (lineage, candidate, candidate_key, interviewer, interviewer_key, scores, "
+                "recommendation, notes, created, updated) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT (lineage, candidate_key, interviewer_key) DO UPDATE SET "
+                "candidate = excluded.candidate, interviewer = excluded.interviewer, scores = excluded.scores, "
+                "recommendation = excluded.recommendation, notes = excluded.notes, updated = excluded.updated",
+                (lineage, candidate.strip(), _key(candidate), interviewer.strip(), _key(interviewer),
+                 row.tobytes(), recommendation, notes, now, now),
+            )
+            return self._db.execute(
+                "SELECT id FROM scorecards WHERE lineage = ? AND candidate_key = ? AND interviewer_key = ?",
+                (lineage, _key(candidate), _key(interviewer)),
+            ).fetchone()[0]
+
+    def matrix(
+        self, lineage: Optional[str] = None, since: Optional[float] = None, until: Optional[float] = None,
+    ) -> ScoreMatrix:
+        """Scorecards for one kit lineage, or for every one, first recorded in ``[since, until)``."""
+        where, params = [], []
+        if lineage is not None:
+            where.append("lineage = ?")
+            params.append(lineage)
+        if since is not None:
+            where.append("created >= ?")
+            params.append(since)
+        if until is not None:
+            where.append("created < ?")
+            params.append(until)
+        sql = ("SELECT id, lineage, created, candidate, candidate_key, interviewer, interviewer_key, "
+               "recommendation, scores FROM scorecards")
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        with self._lock:
+            rows = self._db.execute(sql + " ORDER BY id", params).fetchall()
+
+        n = len(rows)
+        lineages = np.array([r[1] for r in rows], dtype=object)
+        rubrics = {k: self.rubric(k) for k in set(lineages)}
+        width = max((len(r.criteria) for r in rubrics.values()), default=0)
+        scores = np.full((n, width), np.nan, dtype=np.float64)
+        weights = np.zeros((n, width), dtype=np.float64)
+        for k, rubric in rubrics.items():
+            # One frombuffer per lineage: every row of it has the rubric's width.
+            rows_k = np.flatnonzero(lineages == k)
+            k_width = len(rubric.criteria)
+            block = np.frombuffer(b"".join(rows[i][8] for i in rows_k), dtype=np.float32).reshape(-1, k_width)
+            scores[rows_k, :k_width] = block
+            weights[rows_k, :k_width] = rubric.weights
+
+        cand_keys = np.array([f"{r[1]}\x1f{r[4]}" for r in rows], dtype=object)
+        cand_labels, cand_first, cand_index = np.unique(cand_keys, return_index=True, return_inverse=True)
+        who_labels, who_first, who_index = np.unique(
+            np.array([r[6] for r in rows], dtype=object), return_index=True, return_inverse=True,
+        )
+        rec_codes = {r: i for i, r in enumerate(RECOMMENDATIONS)}
+        return ScoreMatrix(
+            card_ids=np.fromiter((r[0] for r in rows), dtype=np.int64, count=n),
+            lineages=lineages,
+            created=np.fromiter((r[2] for r in rows), dtype=np.float64, count=n),
+            candidate_index=cand_index.reshape(-1),
+            candidates=[rows[i][3] for i in cand_first],
+            candidate_lineages=[rows[i][1] for i in cand_first],
+            interviewer_index=who_index.reshape(-1),
+            interviewers=[rows[i][5] for i in who_first],
+            recommendation_index=np.fromiter((rec_codes.get(r[7], -1) for r in rows), dtype=np.int64, count=n),
+            scores=scores,
+            weights=weights,
+        )
+
+    def stats(self) -> dict:
+        with self._lock:
+            cards, candidates = self._db.execute(
+                "SELECT COUNT(*), COUNT(DISTINCT lineage || ':' || candidate_key) FROM scorecards"
+            ).fetchone()
+        return {"scorecards": cards, "candidates": candidates}
+
+    def close(self) -> None:
+        self._db.close()
+
+
+# ─────────────────────────────────────────────
+# Committee report
+# ─────────────────────────────────────────────
+REPORT_COLUMNS = ["role", "level", "lineage", "candidate", "interviewers", "mean", "variance", "low", "high",
+                  "recommendations"]
+
+
+def _timestamp(day: Optional[str]) -> Optional[float]:
+    return datetime.strptime(day, "%Y-%m-%d").timestamp() if day else None
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Panel report over recorded candidate scorecards.")
+    parser.add_argument("--store", default=DEFAULT_SCORES_PATH)
+    parser.add_argument("--kit-id", type=int, help="only candidates for this kit (any version of it)")
+    parser.add_argument("--history", default=DEFAULT_HISTORY_PATH, help="kit history used to resolve --kit-id")
+    parser.add_argument("--since", help="first day to include (YYYY-MM-DD)")
+    parser.add_argument("--until", help="first day to leave out (YYYY-MM-DD)")
+    parser.add_argument("--csv", help="also write the candidate table to this CSV file")
+    args = parser.parse_args(argv)
+
+    lineage = None
+    if args.kit_id is not None:
+        history = KitHistory(args.history)
+        summary = history.summary(args.kit_id)
+        history.close()
+        if summary is None:
+            parser.error(f"kit {args.kit_id} is not in the kit history")
+        lineage = summary.lineage
+
+    store = ScoreStore(args.store)
+    started = time.perf_counter()
+    m = store.matrix(lineage, _timestamp(args.since), _timestamp(args.until))
+    if not len(m):
+        print("No scorecards in that range.")
+        return 1
+    summaries = sorted(panel_summary(m), key=lambda s: (s.lineage, -s.mean))
+    drift = sorted(interviewer_drift(m), key=lambda d: -abs(d.drift) if d.scorecards else 0.0)
+    elapsed = time.perf_counter() - started
+
+    rows = []
+    for s in summaries:
+        rubric = store.rubric(s.lineage)
+        votes = ", ".join(f"{n} {r}" for r, n in s.recommendations.items())
+        rows.append([rubric.role, rubric.level, s.lineage, s.candidate, s.interviewers,
+                     f"{s.mean:.2f}", f"{s.variance:.3f}", f"{s.low:.2f}", f"{s.high:.2f}", votes])
+    print(f"{len(m):,} scorecards · {len(summaries):,} candidates · {len(m.interviewers):,} interviewers "
+          f"({elapsed * 1000:.0f} ms)\n")
+    print(f"{'Role':<28} {'Level':<10} {'Candidate':<24} {'Panel':>5} {'Mean':>5} {'Var':>6} {'Range':>11}  Votes")
+    for row in rows:
+        print(f"{row[0][:28]:<28} {row[1]:<10} {row[3][:24]:<24} {row[4]:>5} {row[5]:>5} {row[6]:>6} "
+              f"{row[7] + '-' + row[8]:>11}  {row[9]}")
+    print(f"\n{'Interviewer':<24} {'Compared':>8} {'Drift':>7} {'Spread':>7}")
+    for d in drift:
+        if d.scorecards:
+            print(f"{d.interviewer[:24]:<24} {d.scorecards:>8} {d.drift:>+7.2f} {d.spread:>7.2f}")
+
+    if args.csv:
+        with open(args.csv, "w", newline="", encoding="utf-8") as f:
+            writer = csv.writer(f)
+            writer.writerow(REPORT_COLUMNS)
+            writer.writerows(rows)
+        print(f"\nWrote {len(rows):,} candidates to {args.csv}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,323 @@
+"""HTTP API for kit generation, served by uvicorn.
+
+Usage:
+    python server.py [--host 0.0.0.0] [--port 8000] [--workers 32] [--max-pending 256] [--rpm 15]
+
+Endpoints:
+    POST /v1/kits                       generate one kit
+    POST /v1/kits/stream                the same, as NDJSON: one line per question, then the kit
+    POST /v1/kits/batch                 {"requests": [...]}, NDJSON: one line per kit as it finishes
+    GET  /v1/kits                       search history (text, role, level, difficulty, competency, cursor, limit)
+    GET  /v1/kits/{id}                  a stored kit
+    POST /v1/kits/{id}/regenerate       {"q_type": "technical", "indices": [0, 2]}: the next version
+    GET  /v1/kits/{id}/export/{format}  markdown, json, csv, pdf or docx
+    GET  /healthz, GET /metrics
+
+A kit request takes the fields of ``kit_service.KitRequest``; only ``role``
+and ``level`` are required. The Gemini key comes from the ``X-Api-Key``
+header, or ``GEMINI_API_KEY`` when the header is absent. Model calls run on
+a ``JobQueue`` so the event loop never blocks on them, and identical
+requests in flight share one job. Bad input is a 400, a full queue or an
+exhausted rate limit a 429, and a failed generation a 502.
+"""
+import argparse
+import asyncio
+import contextlib
+import json
+import os
+import sys
+from dataclasses import asdict
+from typing import AsyncIterator, List
+
+import uvicorn
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse, PlainTextResponse, Response, StreamingResponse
+from starlette.routing import Route
+
+from gemini_client import GeminiClientPool
+from job_queue import Job, JobQueue, QueueFull
+from kit_cache import KitCache
+from kit_history import DEFAULT_PAGE_SIZE, KitHistory
+from kit_service import InvalidRequest, KitRequest, KitService, check_regenerate, regenerate_key
+from kit_stream import STREAMED_SECTIONS, KitStreamParser
+from kit_warmup import CatalogStore
+from provider_router import ProviderConfigError, router_from_env
+from question_bank import QuestionBank
+from rate_limit import DEFAULT_RPM, RateLimitExceeded, RateLimiter
+from telemetry import METRICS, inc
+from token_usage import UsageLedger
+
+DEFAULT_SERVER_WORKERS = int(os.environ.get("KIT_SERVER_WORKERS", "32"))
+DEFAULT_SERVER_PENDING = int(os.environ.get("KIT_SERVER_PENDING", "256"))
+STREAM_POLL_SECONDS = 0.05
+MAX_BATCH = 50
+MAX_PAGE_SIZE = 100
+NDJSON = "application/x-ndjson"
+
+
+def build_service(rpm: float = DEFAULT_RPM) -> KitService:
+    """A service over the same on-disk cache, bank, history and catalog as the app."""
+    limiter = RateLimiter(rpm)
+    return KitService(
+        router_from_env(GeminiClientPool(), limiter), KitCache(), limiter, UsageLedger(),
+        QuestionBank(), KitHistory(), CatalogStore(),
+    )
+
+
+def ndjson(obj: dict) -> bytes:
+    return (json.dumps(obj, ensure_ascii=False) + "\n").encode("utf-8")
+
+
+def error_body(e: BaseException) -> dict:
+    return {"error": type(e).__name__, "message": str(e)}
+
+
+def error_status(e: BaseException) -> int:
+    if isinstance(e, InvalidRequest):
+        return 400
+    if isinstance(e, (QueueFull, RateLimitExceeded)):
+        return 429
+    return 502
+
+
+def error_response(e: BaseException) -> JSONResponse:
+    return JSONResponse(error_body(e), status_code=error_status(e))
+
+
+async def job_finished(job: Job) -> Job:
+    """Await a job from the event loop without tying up a thread."""
+    loop = asyncio.get_running_loop()
+    finished = loop.create_future()
+
+    def wake(_job: Job) -> None:
+        try:
+            loop.call_soon_threadsafe(lambda: finished.done() or finished.set_result(None))
+        except RuntimeError:  # the loop is gone; nobody is waiting any more
+            pass
+
+    job.add_done_callback(wake)
+    await finished
+    return job
+
+
+def generate_job(job: Job, service: KitService, request: KitRequest, api_key: str) -> dict:
+    return service.generate(request, api_key, on_chunk=job.append_progress).to_dict()
+
+
+def regenerate_job(job: Job, service: KitService, kit: dict, kit_id: int, q_type: str, indices: List[int],
+                   api_key: str) -> dict:
+    return service.regenerate(kit, q_type, indices, api_key, parent_id=kit_id).to_dict()
+
+
+# ─────────────────────────────────────────────
+# Application
+# ─────────────────────────────────────────────
+class KitAPI:
+    def __init__(self, service: KitService, jobs: JobQueue):
+        self.service = service
+        self.jobs = jobs
+
+    def api_key(self, request: Request) -> str:
+        key = request.headers.get("x-api-key") or os.environ.get("GEMINI_API_KEY", "")
+        if not key:
+            raise InvalidRequest("no Gemini API key: send an X-Api-Key header")
+        return key
+
+    async def json_body(self, request: Request):
+        try:
+            return await request.json()
+        except ValueError:
+            raise InvalidRequest("the request body must be JSON") from None
+
+    def submit(self, kit_request: KitRequest, api_key: str) -> Job:
+        return self.jobs.submit(kit_request.key(api_key), generate_job, self.service, kit_request, api_key, kind="generate")
+
+    async def result(self, job: Job) -> dict:
+        await job_finished(job)
+        if job.error is not None:
+            raise job.error
+        return job.result
+
+    def load(self, request: Request) -> tuple:
+        kit_id = request.path_params["kit_id"]
+        kit = self.service.history.load(kit_id) if self.service.history is not None else None
+        return kit_id, kit
+
+    # ── Generate ────────────────────────────
+    async def create_kit(self, request: Request) -> Response:
+        try:
+            kit_request = KitRequest.from_dict(await self.json_body(request))
+            return JSONResponse(await self.result(self.submit(kit_request, self.api_key(request))))
+        except Exception as e:
+            return error_response(e)
+
+    async def stream_kit(self, request: Request) -> Response:
+        try:
+            body = await self.json_body(request)
+            if isinstance(body, dict):
+                body.setdefault("mode", "stream")
+            kit_request = KitRequest.from_dict(body)
+            job = self.submit(kit_request, self.api_key(request))
+        except Exception as e:
+            return error_response(e)
+        return StreamingResponse(self._question_events(job), media_type=NDJSON)
+
+    async def _question_events(self, job: Job) -> AsyncIterator[bytes]:
+        parser, seen, sent = KitStreamParser(), 0, 0
+        while True:
+            finished = job.done
+            text = job.progress_text()
+            for section, question in parser.feed(text[seen:]):
+                sent += 1
+                yield ndjson({"event": "question", "section": section, "question": question})
+            seen = len(text)
+            if finished:
+                break
+            await asyncio.sleep(STREAM_POLL_SECONDS)
+        if job.error is not None:
+            yield ndjson(dict(error_body(job.error), event="error", status=error_status(job.error)))
+            return
+        if not sent:
+            # Bank, catalog and non-streamed kits arrive whole; list their questions first.
+            for section in STREAMED_SECTIONS:
+                for question in job.result["kit"].get(section, []):
+                    yield ndjson({"event": "question", "section": section, "question": question})
+        yield ndjson(dict(job.result, event="kit"))
+
+    async def batch(self, request: Request) -> Response:
+        try:
+            body = await self.json_body(request)
+            items = body.get("requests") if isinstance(body, dict) else None
+            if not isinstance(items, list) or not 1 <= len(items) <= MAX_BATCH:
+                raise InvalidRequest(f"requests must be a list of 1 to {MAX_BATCH} kit requests")
+            kit_requests = []
+            for index, item in enumerate(items):
+                try:
+                    kit_requests.append(KitRequest.from_dict(item))
+                except InvalidRequest as e:
+                    raise InvalidRequest(f"requests[{index}]: {e}") from None
+            api_key = self.api_key(request)
+        except Exception as e:
+            return error_response(e)
+        inc("batch_requests")
+        inc("batch_kits", len(kit_requests))
+        return StreamingResponse(self._batch_events(kit_requests, api_key), media_type=NDJSON)
+
+    async def _batch_events(self, kit_requests: List[KitRequest], api_key: str) -> AsyncIterator[bytes]:
+        async def run(index: int, kit_request: KitRequest) -> dict:
+            try:
+                return dict(await self.result(self.submit(kit_request, api_key)), index=index)
+            except Exception as e:
+                return dict(error_body(e), index=index, status=error_status(e))
+
+        # Duplicates inside a batch (or across batches) coalesce into one job.
+        for finished in asyncio.as_completed([run(i, r) for i, r in enumerate(kit_requests)]):
+            yield ndjson(await finished)
+
+    # ── Stored kits ─────────────────────────
+    async def search(self, request: Request) -> Response:
+        q = request.query_params
+        try:
+            limit = min(MAX_PAGE_SIZE, int(q.get("limit", DEFAULT_PAGE_SIZE)))
+            cursor = int(q["cursor"]) if q.get("cursor") else None
+        except ValueError:
+            return error_response(InvalidRequest("limit and cursor must be integers"))
+        page = self.service.history.search(
+            q.get("text", ""), q.get("role"), q.get("level"), q.get("difficulty"), q.get("competency"),
+            latest_only=q.get("all_versions", "") not in ("1", "true"), cursor=cursor, limit=max(1, limit),
+        )
+        return JSONResponse({"items": [asdict(s) for s in page.items], "next_cursor": page.next_cursor})
+
+    async def get_kit(self, request: Request) -> Response:
+        kit_id, kit = self.load(request)
+        if kit is None:
+            return JSONResponse({"error": "NotFound", "message": f"no kit {kit_id}"}, status_code=404)
+        summary = self.service.history.summary(kit_id)
+        return JSONResponse({
+            "kit_id": kit_id, "kit": {k: v for k, v in kit.items() if not k.startswith("_")},
+            "focus": kit.get("_focus", ""), "lineage": summary.lineage, "version": summary.version,
+        })
+
+    async def regenerate(self, request: Request) -> Response:
+        kit_id, kit = self.load(request)
+        if kit is None:
+            return JSONResponse({"error": "NotFound", "message": f"no kit {kit_id}"}, status_code=404)
+        try:
+            body = await self.json_body(request)
+            if not isinstance(body, dict):
+                raise InvalidRequest("the request body must be a JSON object")
+            q_type, indices = body.get("q_type"), body.get("indices")
+            check_regenerate(kit, q_type, indices)
+            api_key = self.api_key(request)
+            job = self.jobs.submit(
+                regenerate_key(kit_id, q_type, indices, api_key),
+                regenerate_job, self.service, kit, kit_id, q_type, indices, api_key,
+                kind="regenerate",
+            )
+            return JSONResponse(await self.result(job))
+        except Exception as e:
+            return error_response(e)
+
+    async def export(self, request: Request) -> Response:
+        kit_id, kit = self.load(request)
+        if kit is None:
+            return JSONResponse({"error": "NotFound", "message": f"no kit {kit_id}"}, status_code=404)
+        try:
+            data, filename, mime = self.service.export(kit, request.path_params["fmt"])
+        except InvalidRequest as e:
+            return error_response(e)
+        return Response(data, media_type=mime, headers={"Content-Disposition": f'attachment; filename="{filename}"'})
+
+    # ── Operations ──────────────────────────
+    @contextlib.asynccontextmanager
+    async def lifespan(self, app: Starlette) -> AsyncIterator[None]:
+        yield
+        self.jobs.shutdown(wait=False)
+
+    async def healthz(self, request: Request) -> Response:
+        return JSONResponse({"status": "ok", "jobs": self.jobs.stats()})
+
+    async def metrics(self, request: Request) -> Response:
+        return PlainTextResponse(METRICS.prometheus(), media_type="text/plain; version=0.0.4")
+
+
+def create_app(service: KitService = None, jobs: JobQueue = None) -> Starlette:
+    api = KitAPI(
+        service or build_service(),
+        jobs or JobQueue(max_workers=DEFAULT_SERVER_WORKERS, max_pending=DEFAULT_SERVER_PENDING),
+    )
+    return Starlette(routes=[
+        Route("/healthz", api.healthz),
+        Route("/metrics", api.metrics),
+        Route("/v1/kits", api.create_kit, methods=["POST"]),
+        Route("/v1/kits", api.search, methods=["GET"]),
+        Route("/v1/kits/stream", api.stream_kit, methods=["POST"]),
+        Route("/v1/kits/batch", api.batch, methods=["POST"]),
+        Route("/v1/kits/{kit_id:int}", api.get_kit),
+        Route("/v1/kits/{kit_id:int}/regenerate", api.regenerate, methods=["POST"]),
+        Route("/v1/kits/{kit_id:int}/export/{fmt}", api.export),
+    ], lifespan=api.lifespan)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Serve kit generation over HTTP.")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=int(os.environ.get("PORT", "8000")))
+    parser.add_argument("--workers", type=int, default=DEFAULT_SERVER_WORKERS,
+                        help="generations running at once")
+    parser.add_argument("--max-pending", type=int, default=DEFAULT_SERVER_PENDING,
+                        help="generations queued or running before requests get a 429")
+    parser.add_argument("--rpm", type=float, default=DEFAULT_RPM, help="requests per minute per API key")
+    args = parser.parse_args(argv)
+    try:
+        service = build_service(args.rpm)
+    except ProviderConfigError as e:
+        parser.error(str(e))
+    app = create_app(service, JobQueue(max_workers=args.workers, max_pending=args.max_pending))
+    uvicorn.run(app, host=args.host, port=args.port, log_level="info")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
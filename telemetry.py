@@ -0,0 +1,220 @@
+import functools
+import json
+import logging
+import os
+import sys
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Iterator, List, Tuple
+
+METRIC_PREFIX = "interview_kit"
+SPAN_BUCKETS = (0.001, 0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+RECENT_SAMPLES = 2048
+JSON_LOGS_ENV = "KIT_JSON_LOGS"
+
+_log = logging.getLogger("interview_kit.telemetry")
+
+LabelKey = Tuple[str, Tuple[Tuple[str, str], ...]]
+
+
+def _key(name: str, labels: dict) -> LabelKey:
+    return name, tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _percentile(ordered: List[float], q: float) -> float:
+    if not ordered:
+        return 0.0
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+class _Series:
+    __slots__ = ("count", "total", "buckets", "recent")
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.buckets = [0] * len(SPAN_BUCKETS)
+        self.recent: "deque[float]" = deque(maxlen=RECENT_SAMPLES)
+
+    def add(self, seconds: float) -> None:
+        self.count += 1
+        self.total += seconds
+        self.recent.append(seconds)
+        for i, bound in enumerate(SPAN_BUCKETS):
+            if seconds <= bound:
+                self.buckets[i] += 1
+                break
+
+
+class Metrics:
+    """In-process counters and latency histograms for the hot paths.
+
+    Spans keep a histogram for Prometheus and the most recent samples for
+    p50/p95; failures are counted by exception class.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters: Dict[LabelKey, float] = {}
+        self._spans: Dict[LabelKey, _Series] = {}
+
+    # ── Recording ───────────────────────────
+    def inc(self, name: str, value: float = 1.0, **labels) -> None:
+        key = _key(name, labels)
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0.0) + value
+
+    def observe(self, name: str, seconds: float, **labels) -> None:
+        key = _key(name, labels)
+        with self._lock:
+            series = self._spans.get(key)
+            if series is None:
+                series = self._spans[key] = _Series()
+            series.add(seconds)
+
+    @contextmanager
+    def span(self, name: str, **labels) -> Iterator[None]:
+        started = time.perf_counter()
+        error = None
+        try:
+            yield
+        except Exception as e:
+            error = type(e).__name__
+            self.inc("span_errors", span=name, error=error, **labels)
+            raise
+        finally:
+            seconds = time.perf_counter() - started
+            self.observe(name, seconds, **labels)
+            if _log.isEnabledFor(logging.INFO):
+                _log.info(json.dumps({
+                    "ts": round(time.time(), 3), "event": "span", "span": name,
+                    "seconds": round(seconds, 6), "ok": error is None, "error": error, **labels,
+                }))
+
+    def timed(self, name: str, **labels):
+        """Decorator form of ``span``."""
+        def decorate(fn):
+            @functools.wraps(fn)
+            def wrapper(*args, **kwargs):
+                with self.span(name, **labels):
+                    return fn(*args, **kwargs)
+            return wrapper
+        return decorate
+
+    def reset(self) -> None:
+        with self._lock:
+            self._counters.clear()
+            self._spans.clear()
+
+    # ── Reading ─────────────────────────────
+    def snapshot(self) -> dict:
+        with self._lock:
+            counters = dict(self._counters)
+            spans = {k: (s.count, s.total, sorted(s.recent)) for k, s in self._spans.items()}
+        return {
+            "spans": [
+                {
+                    "span": name, "labels": dict(labels), "count": count,
+                    "mean_ms": 1000 * total / count if count else 0.0,
+                    "p50_ms": 1000 * _percentile(recent, 0.50),
+                    "p95_ms": 1000 * _percentile(recent, 0.95),
+                }
+                for (name, labels), (count, total, recent) in sorted(spans.items())
+            ],
+            "counters": [
+                {"counter": name, "labels": dict(labels), "value": value}
+                for (name, labels), value in sorted(counters.items())
+            ],
+        }
+
+    def prometheus(self) -> str:
+        """Text exposition format (version 0.0.4)."""
+        with self._lock:
+            counters = sorted(self._counters.items())
+            spans = sorted((k, (s.count, s.total, list(s.buckets))) for k, s in self._spans.items())
+
+        def fmt(labels) -> str:
+            if not labels:
+                return ""
+            return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in labels) + "}"
+
+        lines = []
+        seen = set()
+        for (name, labels), value in counters:
+            metric = f"{METRIC_PREFIX}_{name}_total"
+            if metric not in seen:
+                seen.add(metric)
+                lines.append(f"# TYPE {metric} counter")
+            lines.append(f"{metric}{fmt(labels)} {value:g}")
+
+        metric = f"{METRIC_PREFIX}_span_seconds"
+        if spans:
+            lines.append(f"# TYPE {metric} histogram")
+        for (name, labels), (count, total, buckets) in spans:
+            base = (("span", name),) + labels
+            cumulative = 0
+            for bound, hits in zip(SPAN_BUCKETS, buckets):
+                cumulative += hits
+                lines.append(f"{metric}_bucket{fmt(base + (('le', f'{bound:g}'),))} {cumulative}")
+            lines.append(f"{metric}_bucket{fmt(base + (('le', '+Inf'),))} {count}")
+            lines.append(f"{metric}_sum{fmt(base)} {total:.6f}")
+            lines.append(f"{metric}_count{fmt(base)} {count}")
+        return "\n".join(lines) + "\n"
+
+
+METRICS = Metrics()
+span = METRICS.span
+timed = METRICS.timed
+inc = METRICS.inc
+
+
+# ─────────────────────────────────────────────
+# Structured logs
+# ─────────────────────────────────────────────
+def configure_json_logs(stream=None) -> None:
+    """Emit one JSON object per span on ``stream`` (stderr by default)."""
+    if any(getattr(h, "_kit_json", False) for h in _log.handlers):
+        return
+    handler = logging.StreamHandler(stream or sys.stderr)
+    handler.setFormatter(logging.Formatter("%(message)s"))
+    handler._kit_json = True
+    _log.addHandler(handler)
+    _log.setLevel(logging.INFO)
+    _log.propagate = False
+
+
+if os.environ.get(JSON_LOGS_ENV, "").lower() in ("1", "true", "yes"):
+    configure_json_logs()
+
+
+# ─────────────────────────────────────────────
+# Prometheus endpoint
+# ─────────────────────────────────────────────
+def serve_metrics(port: int, host: str = "0.0.0.0", metrics: Metrics = METRICS) -> ThreadingHTTPServer:
+    """Serve ``GET /metrics`` from a daemon thread and return the server."""
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split("?", 1)[0] != "/metrics":
+                self.send_error(404)
+                return
+            body = metrics.prometheus().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    threading.Thread(target=server.serve_forever, name="metrics-server", daemon=True).start()
+    return server
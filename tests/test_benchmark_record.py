@@ -0,0 +1,17 @@
+from benchmark import record_responses, run_benchmarks
+from fake_gemini import FakeBackend, FakeConfig, FakeGeminiPool, load_recordings
+
+
+def test_recorded_responses_replay_in_benchmarks(tmp_path):
+    path = str(tmp_path / "responses.jsonl")
+    recorded = record_responses(FakeGeminiPool(FakeBackend()), path, "test", runs=2, log=lambda _: None)
+    assert recorded["generate"]["single"]["failures"] == 0
+
+    recordings = load_recordings(path)
+    assert {"kit", "technical", "behavioral", "regen"} <= set(recordings)
+
+    report = run_benchmarks(FakeConfig(), ("generate", "regenerate"), runs=2, workers=2,
+                            recordings=recordings, log=lambda _: None)
+    assert report["config"]["recordings"] is True
+    assert report["fake_backend"]["replayed"] == report["fake_backend"]["calls"] > 0
+    assert report["results"]["generate"]["single"]["failures"] == 0
@@ -0,0 +1,39 @@
+from fake_gemini import FakeBackend, FakeConfig, FakeGeminiPool
+from kit_core import COMPACT_SYSTEM_INSTRUCTION
+from prompt_compare import compare
+
+
+class CompactFailsPool:
+    """Standard prompts succeed; every compact call fails with a non-retryable error."""
+
+    def __init__(self):
+        self.ok = FakeGeminiPool(FakeBackend())
+        self.failing = FakeGeminiPool(FakeBackend(FakeConfig(error_rate=1.0, error_code=400)))
+
+    def model(self, api_key, model_name, system_instruction):
+        pool = self.failing if system_instruction == COMPACT_SYSTEM_INSTRUCTION else self.ok
+        return pool.model(api_key, model_name, system_instruction)
+
+    def invalidate(self, api_key):
+        pass
+
+    def __len__(self):
+        return 1
+
+
+def test_savings_skip_metrics_when_every_compact_run_errors():
+    report = compare(["Backend Engineer"], ["Senior"], api_key="test", rpm=6000,
+                     log=lambda _: None, pool=CompactFailsPool())
+
+    assert report["totals"]["compact"]["errors"] == 1
+    assert "prompt_tokens" in report["totals"]["standard"]
+    assert "prompt_tokens" not in report["totals"]["compact"]
+    # The compact side has no totals at all, so no saving can be computed.
+    assert report["savings_percent"] == {}
+
+
+def test_savings_without_api_key_compare_estimates():
+    report = compare(["Backend Engineer"], ["Junior"], log=lambda _: None)
+
+    assert report["totals"]["standard"]["errors"] == 0
+    assert set(report["savings_percent"]) == {"estimated_prompt_tokens"}
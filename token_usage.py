@@ -0,0 +1,73 @@
+import threading
+from collections import deque
+from dataclasses import asdict, dataclass
+from typing import List, Optional
+
+DEFAULT_LEDGER_SIZE = 1000
+
+
+@dataclass
+class CallUsage:
+    prompt_tokens: int
+    output_tokens: int
+    total_tokens: int
+    seconds: float
+    compact: bool = False
+    streamed: bool = False
+    cached: bool = False
+    first_chunk_seconds: Optional[float] = None
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+
+def usage_from_response(response, seconds: float, **flags) -> CallUsage:
+    """Read token counts from a response's ``usage_metadata`` (zeros when absent)."""
+    meta = getattr(response, "usage_metadata", None)
+    prompt = getattr(meta, "prompt_token_count", 0) or 0
+    output = getattr(meta, "candidates_token_count", 0) or 0
+    total = getattr(meta, "total_token_count", 0) or prompt + output
+    return CallUsage(prompt, output, total, seconds, **flags)
+
+
+class UsageLedger:
+    """Recent per-call token counts and latencies, plus running totals.
+
+    Shared across threads; only the last ``max_records`` calls are kept
+    individually, the totals cover every call since creation.
+    """
+
+    def __init__(self, max_records: int = DEFAULT_LEDGER_SIZE):
+        self._records: "deque[CallUsage]" = deque(maxlen=max_records)
+        self._lock = threading.Lock()
+        self._totals = {
+            "calls": 0, "cached_calls": 0,
+            "prompt_tokens": 0, "output_tokens": 0, "total_tokens": 0, "seconds": 0.0,
+        }
+
+    def record(self, usage: CallUsage) -> None:
+        with self._lock:
+            self._records.append(usage)
+            if usage.cached:
+                self._totals["cached_calls"] += 1
+                return
+            self._totals["calls"] += 1
+            self._totals["prompt_tokens"] += usage.prompt_tokens
+            self._totals["output_tokens"] += usage.output_tokens
+            self._totals["total_tokens"] += usage.total_tokens
+            self._totals["seconds"] += usage.seconds
+
+    def records(self) -> List[CallUsage]:
+        with self._lock:
+            return list(self._records)
+
+    def summary(self) -> dict:
+        with self._lock:
+            totals = dict(self._totals)
+        calls = totals["calls"]
+        totals.update(
+            avg_prompt_tokens=totals["prompt_tokens"] / calls if calls else 0.0,
+            avg_output_tokens=totals["output_tokens"] / calls if calls else 0.0,
+            avg_seconds=totals["seconds"] / calls if calls else 0.0,
+        )
+        return totals